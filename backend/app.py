@@ -1,117 +1,255 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
-import whisper
+from flask_sock import Sock
+from simple_websocket import ConnectionClosed
 import os
 import json
-from datetime import datetime, timedelta
-import requests
+import time
+import zlib
+import atexit
+import tempfile
+import threading
+import weakref
+import contextvars
+from datetime import date, datetime
 from dotenv import load_dotenv
-import torch
+from storage import create_store, doc_name, list_key
+from whisper_manager import WhisperManager, WHISPER_PRELOAD
+from transcription import TranscriptionScheduler, TranscriptionQueueFull
+from vad import NoSpeechDetected
+from voice_stream import StreamingTranscriber, pcm16_to_float
+from audio import AudioCache, decode_audio
+from metrics import (
+    LatencyStats, TracedStore, Histogram, span, timed, note, start_trace, end_trace,
+    stage_seconds, request_seconds, render_gauges
+)
+from profiler import SamplingProfiler
+from tts_pipeline import SentenceSplitter, TTSPipeline
+from tts_cache import TTSCache
+from http_client import HTTPClient
+from provider_router import Provider, ProviderRouter
+from journal_index import JournalIndex, JOURNAL_INDEX_FILE
+from semantic_memory import SemanticMemory, create_embedder, MEMORY_INDEX_DIR, MEMORY_TOKEN_BUDGET
+from prompt_builder import PromptBuilder
+from response_cache import ResponseCache, RESPONSE_CACHE_FILE
+from journal_analytics import JournalAnalytics, parse_range
+from events import EventBus
+from task_extraction import extract_tasks, dedupe
+from jobs import JobQueue, JobQueueFull
+from users import UserData, UserRegistry, CurrentUser, InvalidUser, resolve_user_id, DEFAULT_USER
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
 CORS(app)
+sock = Sock(app)
 
-# Initialize Whisper
-print("🎤 Loading Whisper model...")
-whisper_model = whisper.load_model("base")
-print("✅ Whisper loaded!")
+# Whisper loads lazily on first /voice (or at startup with WHISPER_PRELOAD=true, see create_app)
+whisper_manager = WhisperManager()
+
+# Concurrent /voice clips are transcribed together in small batches
+transcription_scheduler = TranscriptionScheduler(whisper_manager)
+
+# Synthesized replies live in memory, one clip per request, served from /audio/<id>
+audio_cache = AudioCache()
+
+# One pooled, retrying client for every provider call
+http_client = HTTPClient()
+
+# Repeated phrases are synthesized once and reused from disk
+tts_cache = TTSCache()
+
+# TTS and post-processing run here, after the text reply has been sent
+job_queue = JobQueue()
+
+# Time from request start to the first streamed token / first audio clip
+ttft_stats = LatencyStats()
+ttfa_stats = LatencyStats()
+
+# Samples slow requests into flamegraph files (PROFILE_SLOW_MS, off by default)
+profiler = SamplingProfiler()
+
+# pyttsx3 engines are not thread-safe
+pyttsx3_lock = threading.Lock()
 
 # File paths
 MEMORY_FILE = "memory.json"
 TASKS_FILE = "tasks.json"
 JOURNAL_FILE = "journal.json"
 
+# New tasks are checked for duplicates against this many recent tasks
+RECENT_TASKS_FOR_DEDUPE = 500
+
 # API Configuration
 AI_PROVIDER = os.getenv("AI_PROVIDER", "groq")
 
 # AI API Keys
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_API_URL = os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
 
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-ANTHROPIC_API_URL = "https://api.anthropic.com/v1/messages"
+ANTHROPIC_API_URL = os.getenv("ANTHROPIC_API_URL", "https://api.anthropic.com/v1/messages")
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-OPENAI_API_URL = "https://api.openai.com/v1/chat/completions"
+OPENAI_API_URL = os.getenv("OPENAI_API_URL", "https://api.openai.com/v1/chat/completions")
 
 # ElevenLabs Configuration
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
-ELEVENLABS_API_URL = "https://api.elevenlabs.io/v1"
+ELEVENLABS_API_URL = os.getenv("ELEVENLABS_API_URL", "https://api.elevenlabs.io/v1")
 ELEVENLABS_VOICE_ID = os.getenv("ELEVENLABS_VOICE_ID", "zSiMZcCo0oBh047sunsX")  # Default: Rachel
+ELEVENLABS_MODEL_ID = "eleven_turbo_v2_5"  # Free tier compatible model (fast & high quality)
+# Alternative models:
+# "eleven_turbo_v2" - Fast, lower latency
+# "eleven_multilingual_v2" - 29 languages support
+
+# Map emotions to ElevenLabs stability and similarity settings
+EMOTION_SETTINGS = {
+    "friendly": {"stability": 0.5, "similarity_boost": 0.75, "style": 0.0},
+    "excited": {"stability": 0.3, "similarity_boost": 0.8, "style": 0.5},
+    "calm": {"stability": 0.7, "similarity_boost": 0.6, "style": 0.0},
+    "serious": {"stability": 0.6, "similarity_boost": 0.7, "style": 0.2},
+    "empathetic": {"stability": 0.5, "similarity_boost": 0.75, "style": 0.3}
+}
+
+# Requests slower than this are logged with their per-stage breakdown (0 = off)
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "5000"))
+
+# Dev server (python app.py) debug mode and reloader
+FLASK_DEBUG = os.getenv("FLASK_DEBUG", "true").lower() == "true"
+
+# Longest a "wait_audio" request waits for its clip
+AUDIO_WAIT_TIMEOUT = float(os.getenv("AUDIO_WAIT_TIMEOUT", "30"))
+
+# /voice/stream gives up on a client that sends nothing for this long (seconds)
+VOICE_STREAM_IDLE_TIMEOUT = float(os.getenv("VOICE_STREAM_IDLE_TIMEOUT", "10"))
+
+# Pre-synthesize the journal prompts in the background at startup
+TTS_CACHE_PREWARM = os.getenv("TTS_CACHE_PREWARM", "false").lower() == "true"
+
+# One embedding model for every user's semantic memory and response cache
+embedder = create_embedder()
+
+def in_user_directory(directory, path):
+    """A per-user copy of a data file or directory (the shared one for the default user)"""
+    return os.path.join(directory, os.path.basename(os.path.normpath(path))) if directory and path else path
+
+# A user's event bus outlives their evicted data while an /events stream
+# (or a request still running) holds it, so reopening the user finds it again
+event_buses = weakref.WeakValueDictionary()
+event_buses_lock = threading.Lock()
+
+def event_bus_for(user_id):
+    with event_buses_lock:
+        bus = event_buses.get(user_id)
+        if bus is None:
+            bus = event_buses[user_id] = EventBus()
+        return bus
+
+def open_user_data(user_id, directory):
+    """Storage, indexes, memory, caches and event channel of one user (see users.py)"""
+    user = UserData(user_id, directory)
+    # Storage backend (SQLite by default, see storage.py)
+    user.store = TracedStore(create_store([MEMORY_FILE, TASKS_FILE, JOURNAL_FILE], directory=directory))
+    user.store.init()
+    # Full-text search over journal entries, built at startup (see create_app)
+    user.journal_index = JournalIndex(
+        user.store, JOURNAL_FILE, snapshot_path=in_user_directory(directory, JOURNAL_INDEX_FILE)
+    )
+    # Per-day journal rollups behind /journal/summary
+    user.journal_analytics = JournalAnalytics(user.store, JOURNAL_FILE)
+    # Embeddings of every conversation and journal entry, for relevant prompt context
+    user.semantic_memory = SemanticMemory(
+        directory=in_user_directory(directory, MEMORY_INDEX_DIR), embedder=embedder
+    )
+    # Repeated requests reuse recent replies (RESPONSE_CACHE=true, off by default)
+    user.response_cache = ResponseCache(
+        embedder=embedder, snapshot_path=in_user_directory(directory, RESPONSE_CACHE_FILE)
+    )
+    # Context sections are cached until memory changes, and trimmed to each provider's budget
+    user.prompt_builder = PromptBuilder(SYSTEM_PROMPTS, prompt_context, memory_version)
+    # Live updates for this user's /events subscribers
+    user.event_bus = event_bus_for(user_id)
+    # What GET /audio serves
+    user.latest_audio_id = None
+    return user
+
+def close_user_data(user):
+    """Snapshots of an evicted user (or of every user at shutdown)"""
+    user.journal_index.save()
+    user.response_cache.save()
+
+# Open users, selected per request from the token or X-User-Id header;
+# the names below always refer to the current user's data
+users = UserRegistry(open_user_data, close=close_user_data)
+
+def shutdown():
+    """Let queued jobs finish, then save what they changed"""
+    job_queue.shutdown()
+    users.close_all()
+
+atexit.register(shutdown)
+
+store = CurrentUser(users, "store")
+journal_index = CurrentUser(users, "journal_index")
+journal_analytics = CurrentUser(users, "journal_analytics")
+semantic_memory = CurrentUser(users, "semantic_memory")
+response_cache = CurrentUser(users, "response_cache")
+prompt_builder = CurrentUser(users, "prompt_builder")
+event_bus = CurrentUser(users, "event_bus")
 
 # Initialize files with error handling
 def init_files():
-    for file, default in [
-        (MEMORY_FILE, {"conversations": []}),
-        (TASKS_FILE, {"tasks": []}),
-        (JOURNAL_FILE, {"entries": []})
-    ]:
-        if not os.path.exists(file):
-            with open(file, 'w') as f:
-                json.dump(default, f)
+    store.init()
+
+def conversation_snippet(convo):
+    return f"User: {convo['user']}\nAssistant: {convo['assistant']}"
 
-init_files()
+def journal_snippet(entry):
+    return f"Journal ({entry.get('date', '')}, feeling {entry.get('mood', 'neutral')}): {entry['entry']}"
+
+def index_existing_memory():
+    """Embed conversations and journal entries that aren't in the semantic index yet"""
+    added = semantic_memory.add_many(
+        [(f"memory:{c['timestamp']}", conversation_snippet(c), {"source": "memory"})
+         for c in store.items(MEMORY_FILE) if c.get("timestamp")] +
+        [(f"journal:{e.get('id') or e.get('timestamp')}", journal_snippet(e), {"source": "journal"})
+         for e in store.items(JOURNAL_FILE)]
+    )
+    if added:
+        print(f"🧠 Indexed {added} memories")
 
 # File operations with error handling
 def load_json(filepath):
-    """Load JSON with auto-fix for corrupted files"""
-    try:
-        with open(filepath, 'r') as f:
-            content = f.read().strip()
-            if not content:
-                return get_default_content(filepath)
-            return json.loads(content)
-    except (json.JSONDecodeError, FileNotFoundError) as e:
-        print(f"⚠️ Fixing {filepath}...")
-        default = get_default_content(filepath)
-        save_json(filepath, default)
-        return default
-
-def get_default_content(filepath):
-    """Get default content based on filename"""
-    if 'memory' in filepath:
-        return {"conversations": []}
-    elif 'tasks' in filepath:
-        return {"tasks": []}
-    elif 'journal' in filepath:
-        return {"entries": []}
-    return {}
+    """Load a whole document, e.g. {"tasks": [...]}"""
+    return store.load(filepath)
 
 def save_json(filepath, data):
-    """Save JSON with error handling"""
-    try:
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
-    except Exception as e:
-        print(f"❌ Error saving {filepath}: {e}")
+    """Replace a whole document"""
+    store.save(filepath, data)
 
 # ElevenLabs TTS with emotion support
-def text_to_speech_elevenlabs(text, output_path="output.wav", emotion="friendly"):
+def text_to_speech_elevenlabs(text, emotion="friendly"):
     """
-    Generate speech using ElevenLabs API
+    Generate speech using ElevenLabs API, returns an audio cache id
     
     Emotions: friendly, excited, calm, serious, empathetic
     """
     if not ELEVENLABS_API_KEY:
         print("⚠️ ElevenLabs API key not found, using fallback...")
-        return text_to_speech_fallback(text, output_path, emotion)
+        return text_to_speech_fallback(text, emotion)
     
     try:
-        print(f"🎵 Generating ElevenLabs speech with emotion: {emotion}...")
+        settings = EMOTION_SETTINGS.get(emotion, EMOTION_SETTINGS["friendly"])
         
-        # Map emotions to ElevenLabs stability and similarity settings
-        emotion_settings = {
-            "friendly": {"stability": 0.5, "similarity_boost": 0.75, "style": 0.0},
-            "excited": {"stability": 0.3, "similarity_boost": 0.8, "style": 0.5},
-            "calm": {"stability": 0.7, "similarity_boost": 0.6, "style": 0.0},
-            "serious": {"stability": 0.6, "similarity_boost": 0.7, "style": 0.2},
-            "empathetic": {"stability": 0.5, "similarity_boost": 0.75, "style": 0.3}
-        }
+        # Same text + voice + settings + model always produces the same audio
+        cache_key = tts_cache.key(text, ELEVENLABS_VOICE_ID, settings, ELEVENLABS_MODEL_ID)
+        cached = tts_cache.get(cache_key)
+        if cached:
+            print("♻️ Using cached ElevenLabs speech")
+            return audio_cache.put(*cached)
         
-        settings = emotion_settings.get(emotion, emotion_settings["friendly"])
+        print(f"🎵 Generating ElevenLabs speech with emotion: {emotion}...")
         
         # ElevenLabs API endpoint
         url = f"{ELEVENLABS_API_URL}/text-to-speech/{ELEVENLABS_VOICE_ID}"
@@ -124,10 +262,7 @@ def text_to_speech_elevenlabs(text, output_path="output.wav", emotion="friendly"
         
         payload = {
             "text": text,
-            "model_id": "eleven_turbo_v2_5",  # Free tier compatible model (fast & high quality)
-            # Alternative models:
-            # "eleven_turbo_v2" - Fast, lower latency
-            # "eleven_multilingual_v2" - 29 languages support
+            "model_id": ELEVENLABS_MODEL_ID,
             "voice_settings": {
                 "stability": settings["stability"],
                 "similarity_boost": settings["similarity_boost"],
@@ -139,83 +274,79 @@ def text_to_speech_elevenlabs(text, output_path="output.wav", emotion="friendly"
         print(f"⚙️ Settings: stability={settings['stability']}, similarity_boost={settings['similarity_boost']}")
         
         # Make API request
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
+        response = http_client.post(url, json=payload, headers=headers, timeout=(http_client.timeout[0], 30))
         
         if response.status_code == 200:
-            # Save audio file
-            with open(output_path, 'wb') as f:
-                f.write(response.content)
+            tts_cache.put(cache_key, response.content, "audio/mpeg")
+            audio_id = audio_cache.put(response.content, "audio/mpeg")
             
             print(f"✅ ElevenLabs TTS generated with {emotion} emotion")
-            return output_path
+            return audio_id
         else:
             print(f"⚠️ ElevenLabs API error: {response.status_code} - {response.text}")
-            return text_to_speech_fallback(text, output_path, emotion)
+            return text_to_speech_fallback(text, emotion)
             
     except Exception as e:
         print(f"⚠️ ElevenLabs failed: {e}")
-        return text_to_speech_fallback(text, output_path, emotion)
+        return text_to_speech_fallback(text, emotion)
 
 # Fallback TTS (pyttsx3)
-def text_to_speech_fallback(text, output_path="output.wav", emotion="friendly"):
+def text_to_speech_fallback(text, emotion="friendly"):
     """Fallback to pyttsx3 if ElevenLabs fails"""
     try:
         print("🔄 Using pyttsx3 fallback...")
-        import pyttsx3
-        engine = pyttsx3.init()
-        
-        # Configure voice
-        voices = engine.getProperty('voices')
-        for voice in voices:
-            if 'zira' in voice.name.lower() or 'female' in voice.name.lower():
-                engine.setProperty('voice', voice.id)
-                break
-        
-        # Adjust rate based on emotion
-        rates = {
-            "excited": 180,
-            "calm": 140,
-            "serious": 150,
-            "friendly": 160,
-            "empathetic": 145
-        }
-        engine.setProperty('rate', rates.get(emotion, 160))
-        engine.setProperty('volume', 0.95)
-        
-        engine.save_to_file(text, output_path)
-        engine.runAndWait()
-        
-        print(f"✅ pyttsx3 TTS generated")
-        return output_path
-        
+        with pyttsx3_lock:
+            return _pyttsx3_to_cache(text, emotion)
     except Exception as e:
         print(f"❌ All TTS methods failed: {e}")
         return None
 
-# Main TTS function (uses ElevenLabs)
-def text_to_speech(text, output_path="output.wav", emotion="friendly"):
-    """Generate speech - uses ElevenLabs by default"""
-    return text_to_speech_elevenlabs(text, output_path, emotion)
-
-# Smart AI response with multiple provider support
-def get_ai_response(user_message, conversation_history, mode="planning"):
-    """
-    Get AI response from selected provider
-    mode: 'planning', 'journaling', 'general'
-    """
-    memory = load_json(MEMORY_FILE)
-    recent_context = ""
+def _pyttsx3_to_cache(text, emotion):
+    """Synthesize with pyttsx3 and store the WAV in the audio cache"""
+    import pyttsx3
+    engine = pyttsx3.init()
     
-    if memory["conversations"]:
-        recent_convos = memory["conversations"][-5:]
-        recent_context = "\n".join([
-            f"User: {c['user']}\nAssistant: {c['assistant']}" 
-            for c in recent_convos
-        ])
+    # Configure voice
+    voices = engine.getProperty('voices')
+    for voice in voices:
+        if 'zira' in voice.name.lower() or 'female' in voice.name.lower():
+            engine.setProperty('voice', voice.id)
+            break
     
-    # System prompts based on mode
-    prompts = {
-        "planning": f"""You are DayMind, an expert AI productivity coach and planning assistant.
+    # Adjust rate based on emotion
+    rates = {
+        "excited": 180,
+        "calm": 140,
+        "serious": 150,
+        "friendly": 160,
+        "empathetic": 145
+    }
+    engine.setProperty('rate', rates.get(emotion, 160))
+    engine.setProperty('volume', 0.95)
+    
+    # pyttsx3 can only write to a file, so use a private temp file
+    fd, output_path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    try:
+        engine.save_to_file(text, output_path)
+        engine.runAndWait()
+        with open(output_path, 'rb') as f:
+            audio_id = audio_cache.put(f.read(), "audio/wav")
+    finally:
+        os.remove(output_path)
+    
+    print(f"✅ pyttsx3 TTS generated")
+    return audio_id
+
+# Main TTS function (uses ElevenLabs)
+@timed("tts")
+def text_to_speech(text, emotion="friendly"):
+    """Generate speech - uses ElevenLabs by default. Returns an audio id or None"""
+    return text_to_speech_elevenlabs(text, emotion)
+
+# System prompts per mode, parsed once; {context} is filled by the prompt builder
+SYSTEM_PROMPTS = {
+    "planning": """You are DayMind, an expert AI productivity coach and planning assistant.
 
 Your personality:
 - Warm, encouraging, and highly detailed
@@ -238,12 +369,12 @@ Response style:
 - Keep concise but actionable
 
 Recent context:
-{recent_context}
+{context}
 
-Date: {datetime.now().strftime("%A, %B %d, %Y")}
-Time: {datetime.now().strftime("%I:%M %p")}""",
+Date: {date}
+Time: {time}""",
 
-        "journaling": f"""You are DayMind's empathetic journaling companion.
+    "journaling": """You are DayMind's empathetic journaling companion.
 
 Your role:
 - Listen with deep empathy and understanding
@@ -260,7 +391,7 @@ Response style:
 
 Remember: You're a supportive friend, not a therapist.""",
 
-        "general": f"""You are DayMind, a helpful AI assistant for daily life.
+    "general": """You are DayMind, a helpful AI assistant for daily life.
 
 Your personality:
 - Friendly and conversational
@@ -269,21 +400,66 @@ Your personality:
 - Adapt to user's needs
 
 Recent context:
-{recent_context}"""
-    }
+{context}"""
+}
+
+def prompt_context(user_message, budget):
+    """The last exchange (for follow-ups) plus the memories most relevant to this message"""
+    last_exchange = [conversation_snippet(c) for c in store.tail(MEMORY_FILE, 1)]
+    return semantic_memory.context_for(user_message, budget=min(budget, MEMORY_TOKEN_BUDGET), always=last_exchange)
+
+def memory_version():
+    return (store.version(MEMORY_FILE), semantic_memory.version())
+
+prompt_tokens = Histogram(
+    "daymind_prompt_tokens", "Estimated tokens per provider request (system prompt and message)",
+    ("mode",), buckets=(100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+)
+
+# Smart AI response with multiple provider support
+@timed("prompt_build")
+def build_prompt(mode="planning", user_message="", providers=None):
+    """Prompt for a mode ('planning', 'journaling', 'general') that fits every provider it may go to"""
+    if providers is None:
+        providers = [p.name for p in provider_router.available()]
+    now = datetime.now()
+    prompt = prompt_builder.build(
+        mode, user_message, budget=prompt_builder.budget_for(providers),
+        date=now.strftime("%A, %B %d, %Y"), time=now.strftime("%I:%M %p")
+    )
+    prompt_tokens.observe(prompt.tokens, mode if mode in SYSTEM_PROMPTS else "general")
+    note("prompt_tokens", prompt.tokens)
+    return prompt
+
+def build_system_prompt(mode="planning", user_message="", providers=None):
+    return build_prompt(mode, user_message, providers).text
+
+def get_ai_response(user_message, conversation_history, mode="planning"):
+    """
+    Get AI response from selected provider
+    mode: 'planning', 'journaling', 'general'
+    """
+    ai_response = response_cache.get(mode, user_message)
+    if ai_response is not None:
+        note("response_cache", "hit")
+    else:
+        system_prompt = build_system_prompt(mode, user_message)
+        
+        # The router hedges slow providers and skips failing ones
+        try:
+            with span("provider_call"):
+                provider, ai_response = provider_router.call(system_prompt, user_message)
+        except Exception as e:
+            return f"Sorry, I had trouble thinking. Error: {str(e)}"
+        response_cache.put(mode, user_message, ai_response)
     
-    system_prompt = prompts.get(mode, prompts["general"])
+    run_in_background("tasks", save_tasks_from_reply, ai_response)
     
-    # Call appropriate AI provider
-    if AI_PROVIDER == "anthropic":
-        return call_claude(system_prompt, user_message)
-    elif AI_PROVIDER == "openai":
-        return call_openai(system_prompt, user_message)
-    else:  # default to groq
-        return call_groq(system_prompt, user_message)
+    return ai_response
 
+# Provider calls: each returns the reply text or raises
 # Groq API
-def call_groq(system_prompt, user_message):
+def request_groq(system_prompt, user_message):
     headers = {
         "Authorization": f"Bearer {GROQ_API_KEY}",
         "Content-Type": "application/json"
@@ -299,24 +475,12 @@ def call_groq(system_prompt, user_message):
         "max_tokens": 1000
     }
     
-    try:
-        response = requests.post(GROQ_API_URL, json=payload, headers=headers)
-        response.raise_for_status()
-        ai_response = response.json()["choices"][0]["message"]["content"]
-        
-        tasks = extract_tasks(ai_response)
-        if tasks:
-            save_extracted_tasks(tasks)
-        
-        return ai_response
-    except Exception as e:
-        return f"Sorry, I had trouble thinking. Error: {str(e)}"
+    response = http_client.post(GROQ_API_URL, json=payload, headers=headers)
+    response.raise_for_status()
+    return response.json()["choices"][0]["message"]["content"]
 
 # Claude API
-def call_claude(system_prompt, user_message):
-    if not ANTHROPIC_API_KEY:
-        return call_groq(system_prompt, user_message)
-    
+def request_claude(system_prompt, user_message):
     headers = {
         "x-api-key": ANTHROPIC_API_KEY,
         "anthropic-version": "2023-06-01",
@@ -332,25 +496,12 @@ def call_claude(system_prompt, user_message):
         ]
     }
     
-    try:
-        response = requests.post(ANTHROPIC_API_URL, json=payload, headers=headers)
-        response.raise_for_status()
-        ai_response = response.json()["content"][0]["text"]
-        
-        tasks = extract_tasks(ai_response)
-        if tasks:
-            save_extracted_tasks(tasks)
-        
-        return ai_response
-    except Exception as e:
-        print(f"Claude error: {e}, falling back to Groq")
-        return call_groq(system_prompt, user_message)
+    response = http_client.post(ANTHROPIC_API_URL, json=payload, headers=headers)
+    response.raise_for_status()
+    return response.json()["content"][0]["text"]
 
 # OpenAI API
-def call_openai(system_prompt, user_message):
-    if not OPENAI_API_KEY:
-        return call_groq(system_prompt, user_message)
-    
+def request_openai(system_prompt, user_message):
     headers = {
         "Authorization": f"Bearer {OPENAI_API_KEY}",
         "Content-Type": "application/json"
@@ -366,68 +517,351 @@ def call_openai(system_prompt, user_message):
         "max_tokens": 1000
     }
     
-    try:
-        response = requests.post(OPENAI_API_URL, json=payload, headers=headers)
+    response = http_client.post(OPENAI_API_URL, json=payload, headers=headers)
+    response.raise_for_status()
+    return response.json()["choices"][0]["message"]["content"]
+
+def build_provider_router():
+    """
+    AI_PROVIDER goes first, Groq is the fallback, and any other provider
+    with an API key is a further backup
+    """
+    providers = {
+        "anthropic": Provider("anthropic", request_claude, enabled=bool(ANTHROPIC_API_KEY)),
+        "openai": Provider("openai", request_openai, enabled=bool(OPENAI_API_KEY)),
+        # Groq stays enabled even without a key so errors surface as before
+        "groq": Provider("groq", request_groq),
+    }
+    order = [AI_PROVIDER, "groq", "anthropic", "openai"]
+    ordered = []
+    for name in order:
+        if name in providers and providers[name] not in ordered:
+            ordered.append(providers[name])
+    return ProviderRouter(ordered)
+
+provider_router = build_provider_router()
+
+# Streaming variants: yield text chunks as the provider produces them
+def iter_sse_data(response):
+    """Yield the data payload of each server-sent event in a streaming response"""
+    for line in response.iter_lines(decode_unicode=True):
+        if line and line.startswith("data:"):
+            yield line[5:].strip()
+
+def stream_openai_compatible(url, api_key, model, system_prompt, user_message):
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+    
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_message}
+        ],
+        "temperature": 0.7,
+        "max_tokens": 1000,
+        "stream": True
+    }
+    
+    with http_client.post(url, json=payload, headers=headers, stream=True) as response:
         response.raise_for_status()
-        ai_response = response.json()["choices"][0]["message"]["content"]
-        
-        tasks = extract_tasks(ai_response)
-        if tasks:
-            save_extracted_tasks(tasks)
-        
-        return ai_response
-    except Exception as e:
-        print(f"OpenAI error: {e}, falling back to Groq")
-        return call_groq(system_prompt, user_message)
+        for data in iter_sse_data(response):
+            if data == "[DONE]":
+                break
+            delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+            if delta:
+                yield delta
 
-# Extract tasks from response
-def extract_tasks(text):
-    import re
-    tasks = []
+def stream_groq(system_prompt, user_message):
+    return stream_openai_compatible(
+        GROQ_API_URL, GROQ_API_KEY, "llama-3.3-70b-versatile", system_prompt, user_message
+    )
+
+def stream_openai(system_prompt, user_message):
+    return stream_openai_compatible(
+        OPENAI_API_URL, OPENAI_API_KEY, "gpt-4-turbo-preview", system_prompt, user_message
+    )
+
+def stream_claude(system_prompt, user_message):
+    headers = {
+        "x-api-key": ANTHROPIC_API_KEY,
+        "anthropic-version": "2023-06-01",
+        "content-type": "application/json"
+    }
     
-    pattern_time = r'(\d{1,2}:\d{2}\s*(?:AM|PM|am|pm)?(?:\s*-\s*\d{1,2}:\d{2}\s*(?:AM|PM|am|pm)?)?)[:\-]\s*([^\n]{15,})'
-    matches_time = re.findall(pattern_time, text, re.IGNORECASE)
+    payload = {
+        "model": "claude-3-5-sonnet-20241022",
+        "max_tokens": 1000,
+        "system": system_prompt,
+        "messages": [
+            {"role": "user", "content": user_message}
+        ],
+        "stream": True
+    }
     
-    pattern_numbered = r'\d+[\.)]\s*([^\n]{15,}?)(?=(?:\d+[\.)]|\n\n|$))'
-    matches_numbered = re.findall(pattern_numbered, text, re.DOTALL)
+    with http_client.post(ANTHROPIC_API_URL, json=payload, headers=headers, stream=True) as response:
+        response.raise_for_status()
+        for data in iter_sse_data(response):
+            event = json.loads(data)
+            if event.get("type") == "content_block_delta":
+                text = event["delta"].get("text")
+                if text:
+                    yield text
+            elif event.get("type") == "message_stop":
+                break
+
+STREAMS = {"groq": stream_groq, "anthropic": stream_claude, "openai": stream_openai}
+
+def stream_ai_response(user_message, mode="planning", info=None):
+    """
+    Like get_ai_response, but yields the reply in chunks as it is generated.
+    Providers are tried in router order, skipping open circuit breakers;
+    the next one is used if a provider fails before its first chunk.
+    The prompt is built for each provider's token budget; its size is
+    put in info["prompt_tokens"]. A cached reply comes as one chunk.
+    """
+    cached = response_cache.get(mode, user_message)
+    if cached is not None:
+        if info is not None:
+            info["cached"] = True
+        yield cached
+        return
     
-    for time_part, task_part in matches_time:
-        full_task = f"{time_part}: {task_part.strip()}"
-        tasks.append(full_task)
+    error = "No AI provider available"
+    for provider in provider_router.available():
+        if not provider.breaker.allow():
+            continue
+        prompt = build_prompt(mode, user_message, providers=[provider.name])
+        system_prompt = prompt.text
+        if info is not None:
+            info["prompt_tokens"] = prompt.tokens
+        # Reported to the router like provider_router.call does, with the
+        # time to the first chunk as the latency
+        call_started = time.perf_counter()
+        ttft_ms = None
+        chunks = []
+        try:
+            with span("provider_stream"):
+                for chunk in STREAMS[provider.name](system_prompt, user_message):
+                    if ttft_ms is None:
+                        ttft_ms = (time.perf_counter() - call_started) * 1000
+                    chunks.append(chunk)
+                    yield chunk
+        except Exception as e:
+            provider.record(ttft_ms or (time.perf_counter() - call_started) * 1000, ok=False, stream=True)
+            if ttft_ms is not None:
+                yield f"Sorry, I had trouble thinking. Error: {str(e)}"
+                return
+            print(f"{provider.name} error: {e}, trying next provider")
+            error = str(e)
+            continue
+        provider.record(ttft_ms or (time.perf_counter() - call_started) * 1000, ok=True, stream=True)
+        response_cache.put(mode, user_message, "".join(chunks))
+        return
     
-    if not tasks:
-        for match in matches_numbered:
-            task = match.strip()
-            task = re.sub(r'\s+', ' ', task)
-            task = task.split('\n')[0]
-            if len(task) > 15:
-                tasks.append(task)
+    yield f"Sorry, I had trouble thinking. Error: {error}"
+
+def sse_event(event, data, event_id=None):
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def sse_response(events):
+    return Response(events, mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+def publish_audio_ready(audio_id, source, job_id=None):
+    if audio_id:
+        event_bus.publish("audio_ready", {"audio_id": audio_id, "source": source, "job_id": job_id})
+
+def run_in_background(kind, fn, *args, **kwargs):
+    """Queue work the response doesn't wait for; runs it inline if the queue is full so nothing is lost"""
+    try:
+        return job_queue.submit(kind, fn, *args, **kwargs)
+    except JobQueueFull:
+        fn(*args, **kwargs)
+        return None
+
+def remember_latest_audio(audio_id):
+    """The clip GET /audio returns to this user"""
+    if audio_id:
+        users.current().latest_audio_id = audio_id
+
+def synthesize(text, emotion):
+    """text_to_speech for the job queue: raises when every TTS method failed, so it's retried"""
+    audio_id = text_to_speech(text, emotion=emotion)
+    if audio_id is None:
+        raise RuntimeError("no TTS method produced audio")
+    remember_latest_audio(audio_id)
+    return audio_id
+
+def queue_speech(text, emotion, source):
+    """
+    Synthesize a reply in the background. Clients get an audio_ready (or
+    audio_failed) event carrying the job id, or can poll /jobs/<id>.
+    Returns the job, or None when the queue is full (the reply has no audio).
+    """
+    def on_done(job):
+        if job.state == "done":
+            publish_audio_ready(job.result, source, job.id)
+        else:
+            event_bus.publish("audio_failed", {"job_id": job.id, "source": source})
     
-    return tasks[:15]
+    try:
+        return job_queue.submit("tts", synthesize, text, emotion, on_done=on_done)
+    except JobQueueFull:
+        print("⚠️ Job queue full, reply sent without audio")
+        return None
+
+def audio_fields(job, wait=False):
+    """
+    Audio part of a JSON reply. By default audio follows the text; clients
+    that send "wait_audio": true get the finished clip like before.
+    """
+    if job and wait:
+        job.wait(timeout=AUDIO_WAIT_TIMEOUT)
+    audio_id = job.result if job and job.state == "done" else None
+    return {
+        "audio_available": audio_id is not None,
+        "audio_id": audio_id,
+        "audio_pending": bool(job) and job.state in ("queued", "running"),
+        "audio_job_id": job.id if job else None
+    }
+
+def wants_audio_wait(data=None):
+    if data and str(data.get("wait_audio", "")).lower() in ("1", "true"):
+        return True
+    return request.args.get("wait_audio") in ("1", "true")
+
+def wants_stream(data=None):
+    """Clients opt in with {"stream": true}, ?stream=1 or Accept: text/event-stream"""
+    if data and data.get("stream"):
+        return True
+    if request.args.get("stream") in ("1", "true"):
+        return True
+    return request.accept_mimetypes.best == "text/event-stream"
+
+def stream_reply(user_message, mode, emotion, started_at, memory_extra=None, first_events=()):
+    """SSE generator over reply_events, bound to the requesting user"""
+    user = users.current()
+    def events():
+        users.use(user)
+        for event, data in reply_events(user_message, mode, emotion, started_at, memory_extra, first_events):
+            yield sse_event(event, data)
+    return events()
+
+def reply_events(user_message, mode, emotion, started_at, memory_extra=None, first_events=()):
+    """
+    (event, data) generator: proxies provider tokens to the client while
+    finished sentences are synthesized in parallel and sent as ordered
+    audio events. Tasks and the conversation are saved once the stream ends.
+    """
+    yield from first_events
+    
+    splitter = SentenceSplitter()
+    pipeline = TTSPipeline(lambda sentence: text_to_speech(sentence, emotion=emotion))
+    audio_ids = []
+    
+    def audio_events(clips):
+        for index, audio_id in clips:
+            if audio_id is None:
+                continue
+            if not audio_ids:
+                ttfa_stats.observe(round((time.perf_counter() - started_at) * 1000, 1))
+            audio_ids.append(audio_id)
+            remember_latest_audio(audio_id)
+            yield "audio", {"index": index, "audio_id": audio_id}
+    
+    chunks = []
+    ttft_ms = None
+    info = {}
+    replies = stream_ai_response(user_message, mode=mode, info=info)
+    finished = False
+    try:
+        for chunk in replies:
+            if ttft_ms is None:
+                ttft_ms = round((time.perf_counter() - started_at) * 1000, 1)
+                ttft_stats.observe(ttft_ms)
+            chunks.append(chunk)
+            yield "token", {"text": chunk}
+            
+            for sentence in splitter.feed(chunk):
+                pipeline.submit(sentence)
+            yield from audio_events(pipeline.ready())
+        finished = True
+    finally:
+        if not finished:
+            # The client went away mid-reply: nobody hears the audio, but the
+            # reply is still finished and saved like a non-streamed one
+            pipeline.executor.shutdown(wait=False, cancel_futures=True)
+            run_in_background("reply", finish_reply, replies, chunks, user_message, memory_extra)
+    
+    for sentence in splitter.flush():
+        pipeline.submit(sentence)
+    
+    ai_response = "".join(chunks)
+    run_in_background("tasks", save_tasks_from_reply, ai_response)
+    run_in_background("memory", remember_conversation, user_message, ai_response, **(memory_extra or {}))
+    
+    yield from audio_events(pipeline.drain())
+    
+    yield "done", {
+        "response": ai_response,
+        "audio_available": bool(audio_ids),
+        "audio_ids": audio_ids,
+        "ttft_ms": ttft_ms,
+        "prompt_tokens": info.get("prompt_tokens"),
+        "cached": info.get("cached", False)
+    }
+
+def finish_reply(replies, chunks, user_message, memory_extra=None):
+    """Read the rest of a streamed reply whose client disconnected, then save its tasks and memory"""
+    chunks.extend(replies)
+    ai_response = "".join(chunks)
+    save_tasks_from_reply(ai_response)
+    remember_conversation(user_message, ai_response, **(memory_extra or {}))
+
+# Extract tasks from response
+def save_tasks_from_reply(ai_response):
+    with span("task_extraction"):
+        tasks = extract_tasks(ai_response)
+    if tasks:
+        save_extracted_tasks(tasks)
 
 def save_extracted_tasks(new_tasks):
-    tasks_data = load_json(TASKS_FILE)
+    """Save tasks from extract_tasks, skipping ones already open among the recent tasks"""
+    new_tasks = dedupe(new_tasks, store.tail(TASKS_FILE, RECENT_TASKS_FOR_DEDUPE))
+    if not new_tasks:
+        return
     timestamp = datetime.now().isoformat()
-    for task in new_tasks:
-        tasks_data["tasks"].append({
-            "task": task,
+    tasks = [
+        {
+            **task,
             "created": timestamp,
             "completed": False
-        })
-    save_json(TASKS_FILE, tasks_data)
+        }
+        for task in new_tasks
+    ]
+    store.extend(TASKS_FILE, tasks)
+    event_bus.publish("task_added", {"tasks": tasks})
 
 # Journal functions
+JOURNAL_PROMPTS = [
+    "What went well today?",
+    "What challenged you today?",
+    "What are you grateful for?",
+    "What did you learn today?",
+    "How did you feel throughout the day?",
+    "What could you improve tomorrow?",
+    "What made you smile today?",
+    "What's weighing on your mind?"
+]
+
 def get_daily_prompts():
-    prompts = [
-        "What went well today?",
-        "What challenged you today?",
-        "What are you grateful for?",
-        "What did you learn today?",
-        "How did you feel throughout the day?",
-        "What could you improve tomorrow?",
-        "What made you smile today?",
-        "What's weighing on your mind?"
-    ]
+    prompts = JOURNAL_PROMPTS
     day_index = datetime.now().weekday()
     return [
         prompts[day_index], 
@@ -435,55 +869,101 @@ def get_daily_prompts():
         prompts[(day_index + 2) % len(prompts)]
     ]
 
-def generate_weekly_summary():
-    journal = load_json(JOURNAL_FILE)
-    seven_days_ago = datetime.now() - timedelta(days=7)
-    
-    recent_entries = [
-        e for e in journal["entries"]
-        if datetime.fromisoformat(e["timestamp"]) > seven_days_ago
-    ]
-    
-    if not recent_entries:
-        return {
-            "summary": "No journal entries this week. Start journaling to see insights!",
-            "stats": {"total_entries": 0, "most_common_mood": "neutral", "days_journaled": 0}
-        }
+def generate_summary(start, end):
+    """Stats and AI summary of the journal between two dates (inclusive)"""
+    stats, excerpts, fingerprint = journal_analytics.stats(start, end)
+    days = (end - start).days + 1
+    if end == date.today():
+        period = "the past week" if days == 7 else f"the past {days} days"
+    else:
+        period = f"{start.isoformat()} to {end.isoformat()}"
+    result = {"from": start.isoformat(), "to": end.isoformat(), "stats": stats}
     
-    moods = [e["mood"] for e in recent_entries if "mood" in e]
-    most_common_mood = max(set(moods), key=moods.count) if moods else "neutral"
+    if not stats["total_entries"]:
+        if days == 7 and end == date.today():
+            result["summary"] = "No journal entries this week. Start journaling to see insights!"
+        else:
+            result["summary"] = f"No journal entries from {period}."
+        return result
     
-    entries_text = "\n".join([f"- {e['entry'][:100]}..." for e in recent_entries[-5:]])
+    entries_text = "\n".join([f"- {excerpt}..." for excerpt in excerpts])
     
-    prompt = f"""Analyze these journal entries from the past week:
+    prompt = f"""Analyze these journal entries from {period}:
 
 {entries_text}
 
-Most common mood: {most_common_mood}
-Total entries: {len(recent_entries)}
+Most common mood: {stats['most_common_mood']}
+Total entries: {stats['total_entries']}
 
 Provide a supportive 3-4 sentence summary highlighting:
 1. Positive patterns or achievements
 2. Any recurring themes
 3. One actionable insight for growth"""
-
-    summary = get_ai_response(prompt, [], mode="journaling")
     
-    return {
-        "summary": summary,
-        "stats": {
-            "total_entries": len(recent_entries),
-            "most_common_mood": most_common_mood,
-            "days_journaled": len(set([
-                datetime.fromisoformat(e["timestamp"]).date().isoformat() 
-                for e in recent_entries
-            ]))
-        }
+    def generate():
+        system_prompt = build_system_prompt("journaling")
+        with span("provider_call"):
+            _, text = provider_router.call(system_prompt, prompt)
+        return text
+    
+    # Only regenerated when entries in the range change; failures aren't cached
+    try:
+        result["summary"] = journal_analytics.cached_summary(start, end, fingerprint, generate)
+    except Exception as e:
+        result["summary"] = f"Sorry, I had trouble thinking. Error: {str(e)}"
+    return result
+
+def remember_conversation(user_message, ai_response, **extra):
+    """Append an exchange to memory, keeping the last 50 (all of them stay in the semantic index)"""
+    convo = {
+        "user": user_message,
+        "assistant": ai_response,
+        "timestamp": datetime.now().isoformat(),
+        **extra
     }
+    store.append(MEMORY_FILE, convo)
+    store.trim(MEMORY_FILE, 50)
+    semantic_memory.add(f"memory:{convo['timestamp']}", conversation_snippet(convo), source="memory")
+
+# Request tracing: every request gets a trace that span() calls add to
+@app.before_request
+def start_request_trace():
+    start_trace(request.endpoint)
+    profiler.start_request()
+
+# Every request works on the data of the user it identifies (see users.py)
+@app.before_request
+def select_user():
+    try:
+        user_id = resolve_user_id(request.headers, request.args)
+    except InvalidUser as e:
+        return jsonify({"error": str(e)}), 400
+    with span("user_open"):
+        users.activate(user_id)
+
+@app.after_request
+def finish_request_trace(response):
+    trace = end_trace()
+    if trace is None:
+        return response
+    seconds = trace.elapsed()
+    endpoint = request.endpoint or "unknown"
+    request_seconds.observe(seconds, endpoint, request.method, str(response.status_code))
+    response.headers["Server-Timing"] = trace.server_timing()
+    if "prompt_tokens" in trace.notes:
+        response.headers["X-Prompt-Tokens"] = str(trace.notes["prompt_tokens"])
+    
+    profile = profiler.end_request(endpoint, seconds)
+    if TRACE_SLOW_MS and seconds * 1000 >= TRACE_SLOW_MS:
+        print(f"🐢 {request.method} {request.path} took {seconds * 1000:.0f}ms: {trace.breakdown() or 'no spans'}")
+        if profile:
+            print(f"🔥 Profile written to {profile}")
+    return response
 
 # Routes
 @app.route('/chat', methods=['POST'])
 def chat():
+    started_at = time.perf_counter()
     data = request.json
     user_message = data.get('message', '')
     emotion = data.get('emotion', 'friendly')
@@ -491,93 +971,344 @@ def chat():
     if not user_message:
         return jsonify({"error": "No message provided"}), 400
     
+    if wants_stream(data):
+        return sse_response(stream_reply(user_message, "planning", emotion, started_at))
+    
     ai_response = get_ai_response(user_message, [], mode="planning")
     
-    memory = load_json(MEMORY_FILE)
-    memory["conversations"].append({
-        "user": user_message,
-        "assistant": ai_response,
-        "timestamp": datetime.now().isoformat()
-    })
-    memory["conversations"] = memory["conversations"][-50:]
-    save_json(MEMORY_FILE, memory)
+    run_in_background("memory", remember_conversation, user_message, ai_response)
     
-    audio_path = text_to_speech(ai_response, emotion=emotion)
+    job = queue_speech(ai_response, emotion, "chat")
     
     return jsonify({
         "response": ai_response,
-        "audio_available": audio_path is not None
+        **audio_fields(job, wait=wants_audio_wait(data))
     })
 
 @app.route('/voice', methods=['POST'])
 def voice():
+    started_at = time.perf_counter()
     if 'audio' not in request.files:
         return jsonify({"error": "No audio file"}), 400
     
-    audio_file = request.files['audio']
-    temp_path = "temp_audio.wav"
-    audio_file.save(temp_path)
-    
     try:
-        result = whisper_model.transcribe(temp_path)
+        with span("whisper_decode"):
+            audio = decode_audio(request.files['audio'].read())
+        with span("whisper_inference"):
+            result = transcription_scheduler.transcribe(audio)
         transcribed_text = result["text"]
-        os.remove(temp_path)
+        
+        if wants_stream(request.form):
+            return sse_response(stream_reply(
+                transcribed_text, "planning", "friendly", started_at,
+                memory_extra={"type": "voice"},
+                first_events=[("transcription", {"text": transcribed_text})]
+            ))
         
         ai_response = get_ai_response(transcribed_text, [], mode="planning")
         
-        memory = load_json(MEMORY_FILE)
-        memory["conversations"].append({
-            "user": transcribed_text,
-            "assistant": ai_response,
-            "timestamp": datetime.now().isoformat(),
-            "type": "voice"
-        })
-        memory["conversations"] = memory["conversations"][-50:]
-        save_json(MEMORY_FILE, memory)
+        run_in_background("memory", remember_conversation, transcribed_text, ai_response, type="voice")
         
-        audio_path = text_to_speech(ai_response, emotion="friendly")
+        job = queue_speech(ai_response, "friendly", "voice")
         
         return jsonify({
             "transcription": transcribed_text,
             "response": ai_response,
-            "audio_available": audio_path is not None
+            **audio_fields(job, wait=wants_audio_wait(request.form))
         })
+    except NoSpeechDetected as e:
+        return jsonify({"error": str(e), "no_speech": True}), 422
+    except TranscriptionQueueFull as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@sock.route('/voice/stream')
+def voice_stream(ws):
+    """
+    Voice input while the user is still talking. The client sends an
+    optional {"type": "start", "emotion": ...} message, then binary frames
+    of 16 kHz mono 16-bit PCM, and {"type": "stop"} when the button is
+    released. The server answers with JSON {"event", "data"} messages:
+    partial transcripts while audio arrives, a transcription once speech
+    ends (or on stop), then the same token/audio/done events as a streamed
+    /chat reply.
+    """
+    send_lock = threading.Lock()
+    
+    def send(event, data):
+        with send_lock:
+            ws.send(json.dumps({"event": event, "data": data}))
+    
+    session = StreamingTranscriber(transcription_scheduler, on_partial=lambda text: send("partial", {"text": text}))
+    emotion = "friendly"
+    try:
+        while not session.ended:
+            message = ws.receive(timeout=VOICE_STREAM_IDLE_TIMEOUT)
+            if message is None:
+                break
+            if isinstance(message, bytes):
+                session.feed(pcm16_to_float(message))
+                continue
+            control = json.loads(message)
+            if control.get("type") == "start":
+                emotion = control.get("emotion", emotion)
+            elif control.get("type") == "stop":
+                break
+        
+        started_at = time.perf_counter()
+        with span("whisper_inference"):
+            transcribed_text = session.finish()
+        if not transcribed_text:
+            send("no_speech", {"error": "No speech detected in the recording"})
+            return
+        
+        for event, data in reply_events(
+            transcribed_text, "planning", emotion, started_at,
+            memory_extra={"type": "voice"},
+            first_events=[("transcription", {"text": transcribed_text})]
+        ):
+            send(event, data)
+    except ConnectionClosed:
+        session.close()
+    except Exception as e:
+        session.close()
+        send("error", {"error": str(e)})
+
+def summed_status(components):
+    """
+    status() of a per-user component added up over this worker: counts
+    are summed, settings (max_*, rates, names) are taken from the first
+    """
+    total = {}
+    for component in components:
+        for key, value in component.status().items():
+            if key in total and type(value) is int and not key.startswith("max_"):
+                total[key] += value
+            else:
+                total.setdefault(key, value)
+    return total
+
+def worker_status(attribute):
+    """summed_status() of one part of every open user's data, e.g. journal_index"""
+    return summed_status(getattr(user, attribute) for user in users.open_users())
+
+def response_cache_status():
+    status = worker_status("response_cache")
+    lookups = status.get("hits", 0) + status.get("similar_hits", 0) + status.get("misses", 0)
+    status["hit_rate"] = round((status["hits"] + status["similar_hits"]) / lookups, 3) if lookups else None
+    return status
+
+def event_bus_status():
+    # Buses outlive their user's data while a stream is open, so not users.open_users()
+    with event_buses_lock:
+        buses = list(event_buses.values())
+    return summed_status(buses)
+
+@app.route('/metrics')
+def metrics():
+    """
+    Prometheus text format: request and per-stage latency histograms plus a
+    few gauges. Per-user gauges are totals over the users open in this worker.
+    """
+    jobs = job_queue.status()
+    audio = audio_cache.status()
+    vad = transcription_scheduler.vad.status()
+    responses = response_cache_status()
+    gauges = {
+        "daymind_jobs_queued": ("Background jobs waiting", jobs["queued"]),
+        "daymind_jobs_running": ("Background jobs running", jobs["running"]),
+        "daymind_jobs_failed": ("Background jobs that failed after retries", jobs["failed"]),
+        "daymind_event_subscribers": ("Clients connected to /events", event_bus_status()["subscribers"]),
+        "daymind_open_users": ("User data sets open in this worker", users.status()["open"]),
+        "daymind_audio_cache_bytes": ("Synthesized audio held in memory", audio["bytes"]),
+        "daymind_tts_cache_hits": ("TTS disk cache hits", tts_cache.status()["hits"]),
+        "daymind_whisper_loaded": ("1 when the Whisper model is loaded", int(whisper_manager.model is not None)),
+        "daymind_transcription_queued": ("Clips waiting for Whisper", transcription_scheduler.status()["queued"]),
+        "daymind_response_cache_hits": ("Replies served from the response cache",
+                                        responses["hits"] + responses["similar_hits"]),
+        "daymind_response_cache_misses": ("Response cache lookups that called a provider", responses["misses"]),
+        "daymind_response_cache_entries": ("Replies in the response cache", responses["entries"]),
+        "daymind_vad_rejected_clips": ("Silent clips rejected before Whisper", vad["rejected"]),
+        "daymind_vad_trimmed_seconds": ("Seconds of silence trimmed before Whisper",
+                                        round(vad["audio_seconds"] - vad["speech_seconds"], 1)),
+    }
+    body = "\n".join([
+        request_seconds.render(), stage_seconds.render(), prompt_tokens.render(), render_gauges(gauges)
+    ]) + "\n"
+    return Response(body, mimetype="text/plain; version=0.0.4")
+
+@app.route('/health')
+def health():
+    """Per-user components are reported as totals over the users open in this worker"""
+    return jsonify({
+        "status": "ok",
+        "ai_provider": AI_PROVIDER,
+        "whisper": whisper_manager.status(),
+        "transcription": transcription_scheduler.status(),
+        "audio_cache": audio_cache.status(),
+        "ttft_ms": ttft_stats.summary(),
+        "time_to_first_audio_ms": ttfa_stats.summary(),
+        "tts_cache": tts_cache.status(),
+        "journal_index": worker_status("journal_index"),
+        "semantic_memory": worker_status("semantic_memory"),
+        "prompt_builder": worker_status("prompt_builder"),
+        "response_cache": response_cache_status(),
+        "journal_analytics": worker_status("journal_analytics"),
+        "events": event_bus_status(),
+        "users": users.status(),
+        "jobs": job_queue.status(),
+        "profiler": profiler.status(),
+        "providers": provider_router.status()
+    })
+
+@app.route('/events')
+def events():
+    """
+    Push channel (server-sent events): task_added, task_updated,
+    tasks_cleared, journal_entry, audio_ready and audio_failed.
+    Reconnecting clients get missed events replayed from Last-Event-ID,
+    or a resync event if too many were missed.
+    """
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID', ''))
+    except ValueError:
+        last_event_id = None
+    subscription = event_bus.subscribe(last_event_id)
+    
+    def stream():
+        try:
+            # Sent right away, so the headers go out now rather than with
+            # the first event or keep-alive, and clients know they are subscribed
+            opening = ": connected\n\n"
+            if subscription.lagged:
+                subscription.lagged = False
+                opening += sse_event("resync", {})
+            yield opening
+            while True:
+                if subscription.lagged:
+                    subscription.lagged = False
+                    yield sse_event("resync", {})
+                message = subscription.get()
+                if message is None:
+                    # Keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                event_id, event, data = message
+                yield sse_event(event, data, event_id)
+        finally:
+            subscription.close()
+    
+    return sse_response(stream())
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    """State of a background job, e.g. the audio_job_id of a reply"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/audio/<audio_id>')
+def get_audio(audio_id):
+    clip = audio_cache.get(audio_id)
+    if clip is None:
+        return jsonify({"error": "Audio not found or expired"}), 404
+    data, mimetype = clip
+    return Response(data, mimetype=mimetype, headers={"Cache-Control": "private, max-age=3600"})
+
 @app.route('/audio')
-def get_audio():
-    return send_file("output.wav", mimetype="audio/wav")
+def get_latest_audio():
+    """The requesting user's most recent clip, kept for older clients; prefer /audio/<id>"""
+    latest_id = users.current().latest_audio_id
+    if latest_id is None:
+        return jsonify({"error": "No audio yet"}), 404
+    return get_audio(latest_id)
+
+def list_response(filepath):
+    """
+    GET handler shared by /tasks, /journal and /memory:
+    - no arguments: the whole document, as before
+    - ?limit=N&cursor=C (&order=desc): one page, with next_cursor
+    - ?since=V: only items added/changed and ids deleted after version V
+      ("reset": true means the client must reload everything)
+    Every response carries the document version and an ETag, so an
+    unchanged poll is answered with 304 Not Modified.
+    """
+    version = store.version(filepath)
+    etag = f"{doc_name(filepath)}-{version}-{zlib.crc32(request.query_string):x}"
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        if 'since' in request.args:
+            body = store.changes(filepath, request.args['since'])
+        elif 'limit' in request.args or 'cursor' in request.args:
+            try:
+                limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+                items, next_cursor = store.page(
+                    filepath, request.args.get('cursor'), limit,
+                    newest_first=request.args.get('order') == 'desc'
+                )
+            except ValueError:
+                return jsonify({"error": "limit and cursor must be integers"}), 400
+            body = {list_key(filepath): items, "next_cursor": next_cursor, "version": version}
+        else:
+            body = {**load_json(filepath), "version": version}
+        response = jsonify(body)
+    response.set_etag(etag)
+    # Let browsers keep the copy but always revalidate it
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/tasks')
 def get_tasks():
-    return jsonify(load_json(TASKS_FILE))
+    return list_response(TASKS_FILE)
 
 @app.route('/tasks/complete', methods=['POST'])
 def complete_task():
-    data = request.json
-    task_index = data.get('index')
+    """Body: {"id": 12} (or the legacy {"index": 0}), optional "completed": false to reopen"""
+    data = request.json or {}
+    completed = bool(data.get('completed', True))
+    
+    if 'id' in data:
+        task_id = data['id']
+        if not isinstance(task_id, int) or isinstance(task_id, bool):
+            return jsonify({"error": "Invalid task id"}), 400
+        task = store.update_item(TASKS_FILE, task_id, {"completed": completed})
+        if task is None:
+            return jsonify({"error": "Task not found"}), 404
+        event_bus.publish("task_updated", {"task": task})
+        return jsonify({"success": True, "task": task})
     
-    tasks = load_json(TASKS_FILE)
-    if 0 <= task_index < len(tasks["tasks"]):
-        tasks["tasks"][task_index]["completed"] = True
-        save_json(TASKS_FILE, tasks)
-        return jsonify({"success": True})
+    task_index = data.get('index')
+    task = store.get_at(TASKS_FILE, task_index) if isinstance(task_index, int) else None
+    if task is not None:
+        task["completed"] = completed
+        store.set_at(TASKS_FILE, task_index, task)
+        event_bus.publish("task_updated", {"task": task})
+        return jsonify({"success": True, "task": task})
     return jsonify({"error": "Invalid task index"}), 400
 
 @app.route('/tasks/clear', methods=['POST'])
 def clear_tasks():
     save_json(TASKS_FILE, {"tasks": []})
+    event_bus.publish("tasks_cleared", {})
     return jsonify({"success": True})
 
 @app.route('/memory')
 def get_memory():
-    return jsonify(load_json(MEMORY_FILE))
+    return list_response(MEMORY_FILE)
 
 # Journal Routes
 @app.route('/journal', methods=['GET'])
 def get_journal():
-    return jsonify(load_json(JOURNAL_FILE))
+    return list_response(JOURNAL_FILE)
+
+def index_journal_entry(entry):
+    """Search index, rollups and semantic memory; search and summaries catch up on their own too"""
+    journal_index.refresh()
+    journal_analytics.refresh()
+    semantic_memory.add(f"journal:{entry['id']}", journal_snippet(entry), source="journal")
 
 @app.route('/journal/entry', methods=['POST'])
 def create_journal_entry():
@@ -591,52 +1322,150 @@ def create_journal_entry():
     prompt = f"The user is feeling {mood} and shared: {entry_text}"
     ai_response = get_ai_response(prompt, [], mode="journaling")
     
-    journal = load_json(JOURNAL_FILE)
     new_entry = {
-        "id": len(journal["entries"]) + 1,
         "entry": entry_text,
         "mood": mood,
         "ai_response": ai_response,
         "timestamp": datetime.now().isoformat(),
         "date": datetime.now().strftime("%B %d, %Y")
     }
-    journal["entries"].append(new_entry)
-    save_json(JOURNAL_FILE, journal)
+    store.append(JOURNAL_FILE, new_entry)
+    event_bus.publish("journal_entry", {"entry": new_entry})
+    run_in_background("journal-index", index_journal_entry, new_entry)
     
-    audio_path = text_to_speech(ai_response, emotion="empathetic")
+    job = queue_speech(ai_response, "empathetic", "journal")
     
     return jsonify({
         **new_entry,
-        "audio_available": audio_path is not None
+        **audio_fields(job, wait=wants_audio_wait(data))
     })
 
 @app.route('/journal/prompts', methods=['GET'])
 def get_prompts():
-    return jsonify({"prompts": get_daily_prompts()})
+    prompts = get_daily_prompts()
+    if request.args.get('audio') in ('1', 'true'):
+        audio_ids = [text_to_speech(p, emotion="calm") for p in prompts]
+        for audio_id in audio_ids:
+            remember_latest_audio(audio_id)
+        return jsonify({"prompts": prompts, "audio_ids": audio_ids})
+    return jsonify({"prompts": prompts})
 
 @app.route('/journal/summary', methods=['GET'])
 def get_weekly_summary():
-    return jsonify(generate_weekly_summary())
+    """Past 7 days by default; ?days=30, or ?from=YYYY-MM-DD&to=YYYY-MM-DD"""
+    try:
+        start, end = parse_range(
+            request.args.get('days'), request.args.get('from'), request.args.get('to')
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(generate_summary(start, end))
 
 @app.route('/journal/search', methods=['POST'])
 def search_journal():
-    data = request.json
-    query = data.get('query', '').lower()
+    """
+    Ranked full-text search. Body: {"query", "mood", "from", "to", "limit", "cursor"};
+    dates are YYYY-MM-DD, pass the returned next_cursor to get the next page.
+    """
+    data = request.json or {}
+    try:
+        limit = min(max(int(data.get('limit', 20)), 1), 100)
+        cursor = max(int(data.get('cursor') or 0), 0)
+    except (TypeError, ValueError):
+        return jsonify({"error": "limit and cursor must be integers"}), 400
+    
+    results, total, next_cursor = journal_index.search(
+        data.get('query', ''),
+        mood=data.get('mood'),
+        date_from=data.get('from'),
+        date_to=data.get('to'),
+        limit=limit,
+        cursor=cursor
+    )
+    
+    return jsonify({
+        "results": results,
+        "total": total,
+        "next_cursor": str(next_cursor) if next_cursor is not None else None
+    })
+
+def prewarm_tts_cache():
+    """Synthesize every journal prompt once so the week's prompts are cache hits"""
+    if not ELEVENLABS_API_KEY:
+        return
+    for prompt in JOURNAL_PROMPTS:
+        text_to_speech(prompt, emotion="calm")
+    print(f"🔥 TTS cache warmed: {tts_cache.status()['clips']} clips")
+
+# App factory
+_started = False
+_start_lock = threading.Lock()
+
+def create_app(preload=False):
+    """
+    Initialize storage and warm up, then return the Flask app. Only the
+    first call does anything.
     
-    journal = load_json(JOURNAL_FILE)
-    results = [
-        e for e in journal["entries"]
-        if query in e["entry"].lower() or query in e.get("mood", "").lower()
+    By default the warm-up (journal index, rollups, memory index, Whisper
+    with WHISPER_PRELOAD, TTS prewarm) runs in background threads while
+    requests are served. preload=True runs it in the calling thread
+    instead: a pre-forking server (wsgi.py) does it once in the master
+    process and every worker shares the result copy-on-write. No threads
+    are left running before the fork.
+    """
+    global _started
+    if _started:
+        return app
+    with _start_lock:
+        if _started:
+            return app
+        _started = True
+    
+    # The warm-up is for the shared default user's data, whoever sent the
+    # request that started the app; it runs in a copy of the context so that
+    # request keeps its own user
+    default = users.get(DEFAULT_USER)
+    def as_default(fn):
+        def bound():
+            users.use(default)
+            fn()
+        return lambda: contextvars.copy_context().run(bound)
+    
+    as_default(init_files)()
+    warmups = [
+        ("journal-index", default.journal_index.refresh),
+        ("journal-analytics", default.journal_analytics.refresh),
+        ("memory-index", as_default(index_existing_memory)),
     ]
+    if TTS_CACHE_PREWARM:
+        warmups.append(("tts-prewarm", prewarm_tts_cache))
     
-    return jsonify({"results": results})
+    if preload:
+        started_at = time.perf_counter()
+        for _, warmup in warmups:
+            warmup()
+        if WHISPER_PRELOAD:
+            whisper_manager.load()
+        print(f"📦 Preloaded in {time.perf_counter() - started_at:.1f}s")
+    else:
+        for name, warmup in warmups:
+            threading.Thread(target=warmup, name=name, daemon=True).start()
+        if WHISPER_PRELOAD:
+            whisper_manager.start_loading()
+    return app
+
+@app.before_request
+def ensure_started():
+    # For servers that import `app` directly (flask run, gunicorn app:app)
+    create_app()
 
 if __name__ == '__main__':
     print("\n🚀 DayMind V2 Enhanced Starting...")
     print("📍 API: http://localhost:5000")
     print(f"🤖 AI Provider: {AI_PROVIDER.upper()}")
-    print("🎤 Whisper: Ready")
+    print(f"🎤 Whisper: {whisper_manager.status()['state']} ({whisper_manager.model_name})")
     print("🎵 TTS: ElevenLabs + fallback")
     print("📝 Journal: Enabled")
     print("💬 Ready to help!\n")
-    app.run(debug=True, port=5000, host='0.0.0.0')
\ No newline at end of file
+    # Development server; see wsgi.py / gunicorn.conf.py for production
+    create_app().run(debug=FLASK_DEBUG, port=int(os.getenv("PORT", "5000")), host='0.0.0.0', threaded=True)
\ No newline at end of file
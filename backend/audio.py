@@ -0,0 +1,98 @@
+"""
+In-memory audio helpers
+
+- decode_audio: uploaded bytes -> float32 mono 16 kHz NumPy buffer, without
+  temp files (soundfile for WAV/FLAC/OGG, ffmpeg over pipes for WebM/MP3/...)
+- AudioCache: synthesized replies kept per request in a size-bounded LRU,
+  served from /audio/<id>
+
+Environment:
+- AUDIO_CACHE_MB: max total size of cached replies, default 64
+"""
+import io
+import os
+import uuid
+import wave
+import threading
+import subprocess
+from collections import OrderedDict
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+AUDIO_CACHE_MB = float(os.getenv("AUDIO_CACHE_MB", "64"))
+
+
+def decode_audio(data, sample_rate=SAMPLE_RATE):
+    """Decode an uploaded clip into float32 mono samples at sample_rate"""
+    try:
+        import soundfile as sf
+        samples, rate = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+        samples = samples.mean(axis=1)
+        if rate != sample_rate:
+            # Linear resampling is plenty for speech recognition
+            duration = len(samples) / rate
+            target = np.linspace(0, duration, int(duration * sample_rate), endpoint=False)
+            samples = np.interp(target, np.arange(len(samples)) / rate, samples)
+        return samples.astype(np.float32)
+    except Exception:
+        # Browser recordings are usually WebM/Opus, which needs ffmpeg
+        return _decode_with_ffmpeg(data, sample_rate)
+
+
+def _decode_with_ffmpeg(data, sample_rate):
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", "pipe:0",
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "pipe:1"
+    ]
+    try:
+        out = subprocess.run(cmd, input=data, capture_output=True, check=True).stdout
+    except FileNotFoundError:
+        raise RuntimeError("Unsupported audio format (install ffmpeg to decode it)")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='ignore')[-200:]}")
+    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+
+
+def encode_wav(samples, sample_rate=SAMPLE_RATE):
+    """float32 samples -> 16-bit PCM WAV bytes"""
+    pcm = (np.clip(samples, -1, 1) * 32767).astype(np.int16)
+    buf = io.BytesIO()
+    with wave.open(buf, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+class AudioCache:
+    """Size-bounded LRU of synthesized audio clips keyed by a random id"""
+
+    def __init__(self, max_bytes=int(AUDIO_CACHE_MB * 1024 * 1024)):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._clips = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, data, mimetype):
+        """Store a clip and return its id; evicts the oldest clips when full"""
+        audio_id = uuid.uuid4().hex
+        with self._lock:
+            self._clips[audio_id] = (data, mimetype)
+            self.size += len(data)
+            while self.size > self.max_bytes and len(self._clips) > 1:
+                _, (old, _) = self._clips.popitem(last=False)
+                self.size -= len(old)
+        return audio_id
+
+    def get(self, audio_id):
+        """Return (bytes, mimetype) or None if unknown or evicted"""
+        with self._lock:
+            clip = self._clips.get(audio_id)
+            if clip:
+                self._clips.move_to_end(audio_id)
+            return clip
+
+    def status(self):
+        return {"clips": len(self._clips), "bytes": self.size, "max_bytes": self.max_bytes}
@@ -0,0 +1,73 @@
+"""
+Cold-start benchmark
+
+Starts the app in a fresh interpreter and reports time until the first /chat
+response and resident memory, for:
+- eager: model loaded before serving (the old import-time behaviour)
+- lazy: model loaded only when /voice needs it
+- preload: model loading in the background while /chat is served
+
+AI and TTS calls are replaced with instant stand-ins.
+
+Usage (from backend/):
+    python benchmarks/bench_cold_start.py --model base
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import os, sys, time, json
+start = time.perf_counter()
+sys.path.insert(0, {backend_dir!r})
+import app
+app.get_ai_response = lambda *args, **kwargs: "Sounds good."
+app.text_to_speech = lambda *args, **kwargs: None
+if {mode!r} == "eager":
+    app.whisper_manager.get_model()
+client = app.create_app().test_client()
+client.post("/chat", json={{"message": "hi"}})
+first_chat = time.perf_counter() - start
+print(json.dumps({{
+    "mode": {mode!r},
+    "first_chat_s": round(first_chat, 2),
+    "rss_mb": app.whisper_manager.status().get("rss_mb"),
+    "whisper_state": app.whisper_manager.status()["state"],
+}}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="base")
+    args = parser.parse_args()
+
+    results = []
+    for mode in ["eager", "lazy", "preload"]:
+        workdir = tempfile.mkdtemp(prefix="daymind-cold-")
+        env = dict(os.environ, WHISPER_MODEL=args.model,
+                   WHISPER_PRELOAD="true" if mode == "preload" else "false",
+                   DATABASE_FILE=os.path.join(workdir, "daymind.db"))
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD.format(backend_dir=BACKEND_DIR, mode=mode)],
+            cwd=workdir, env=env, capture_output=True, text=True
+        )
+        lines = [l for l in out.stdout.splitlines() if l.startswith("{")]
+        if not lines:
+            print(f"❌ {mode} failed:\n{out.stderr[-2000:]}")
+            continue
+        result = json.loads(lines[-1])
+        results.append(result)
+        print(f"📊 {mode:>8}: first /chat after {result['first_chat_s']}s, "
+              f"RSS {result['rss_mb']} MB, whisper {result['whisper_state']}")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,472 @@
+"""
+End-to-end benchmark: every route, local fakes for every external service
+
+Starts the fake LLM/TTS/Whisper services (fakes.py), seeds a data set of
+--size tasks and journal entries (fixtures.py), starts the app as a real
+server pointed at the fakes, and drives each route at every --concurrency
+level. Results (requests/s, latency percentiles, errors, time to first
+byte for streams) are written as JSON with the commit they were measured
+on, so runs can be compared between commits:
+
+    python benchmarks/bench_e2e.py --size 1k --out before.json
+    # ...change something...
+    python benchmarks/bench_e2e.py --size 1k --out after.json --compare before.json
+
+With --compare, scenarios whose p50 or throughput got worse by more than
+--threshold are listed and the exit code is 1.
+
+Usage (from backend/):
+    python benchmarks/bench_e2e.py --size 100k --concurrency 1,8,32 --out results.json
+    python benchmarks/bench_e2e.py --scenarios chat,voice,journal_search --server gunicorn
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import socket
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from datetime import date, timedelta
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from fakes import FakeConfig, FakeServices, TRANSCRIPTS
+from fixtures import WORDS, MOODS, seed_database, audio_fixture
+
+# Returning the whole list is only benchmarked while it is reasonably small
+FULL_LIST_MAX_ITEMS = 10_000
+
+
+# Scenarios: each makes one request and returns (ok, seconds to first byte or None)
+
+def _ok(response):
+    return response.status_code in (200, 304), None
+
+
+def _stream(response):
+    """Read a server-sent event response to the end; time to the first event"""
+    started = time.perf_counter()
+    first = None
+    for chunk in response.iter_content(chunk_size=None):
+        if first is None and chunk:
+            first = time.perf_counter() - started
+    return response.status_code == 200, first
+
+
+def scenario_health(s, rng, ctx):
+    return _ok(s.get(f"{ctx['url']}/health"))
+
+
+def scenario_metrics(s, rng, ctx):
+    return _ok(s.get(f"{ctx['url']}/metrics"))
+
+
+def scenario_chat(s, rng, ctx):
+    return _ok(s.post(f"{ctx['url']}/chat", json={"message": rng.choice(TRANSCRIPTS)}))
+
+
+def scenario_chat_wait_audio(s, rng, ctx):
+    return _ok(s.post(f"{ctx['url']}/chat", json={"message": rng.choice(TRANSCRIPTS), "wait_audio": True}))
+
+
+def scenario_chat_stream(s, rng, ctx):
+    with s.post(f"{ctx['url']}/chat", json={"message": rng.choice(TRANSCRIPTS), "stream": True},
+                stream=True) as response:
+        return _stream(response)
+
+
+def scenario_voice(s, rng, ctx):
+    files = {"audio": ("clip.wav", ctx["clip"], "audio/wav")}
+    return _ok(s.post(f"{ctx['url']}/voice", files=files))
+
+
+def scenario_voice_stream(s, rng, ctx):
+    files = {"audio": ("clip.wav", ctx["clip"], "audio/wav")}
+    with s.post(f"{ctx['url']}/voice", files=files, data={"stream": "1"}, stream=True) as response:
+        return _stream(response)
+
+
+def scenario_tasks_full(s, rng, ctx):
+    return _ok(s.get(f"{ctx['url']}/tasks"))
+
+
+def scenario_tasks_page(s, rng, ctx):
+    cursor = rng.randint(0, max(ctx["items"] - 50, 0))
+    return _ok(s.get(f"{ctx['url']}/tasks?limit=50&cursor={cursor}"))
+
+
+def scenario_tasks_not_modified(s, rng, ctx):
+    url = f"{ctx['url']}/tasks?limit=50"
+    etag = s.get(url).headers.get("ETag")
+    return _ok(s.get(url, headers={"If-None-Match": etag}))
+
+
+def scenario_tasks_since(s, rng, ctx):
+    version = int(s.get(f"{ctx['url']}/tasks?limit=1").json()["version"])
+    return _ok(s.get(f"{ctx['url']}/tasks?since={max(version - 10, 0)}"))
+
+
+def scenario_tasks_complete(s, rng, ctx):
+    task_id = rng.randint(1, ctx["items"])
+    return _ok(s.post(f"{ctx['url']}/tasks/complete", json={"id": task_id, "completed": rng.random() < 0.5}))
+
+
+def scenario_memory(s, rng, ctx):
+    return _ok(s.get(f"{ctx['url']}/memory"))
+
+
+def scenario_journal_page(s, rng, ctx):
+    return _ok(s.get(f"{ctx['url']}/journal?limit=5&order=desc"))
+
+
+def scenario_journal_entry(s, rng, ctx):
+    entry = " ".join(rng.choice(WORDS) for _ in range(30))
+    return _ok(s.post(f"{ctx['url']}/journal/entry", json={"entry": entry, "mood": rng.choice(MOODS)}))
+
+
+def scenario_journal_prompts(s, rng, ctx):
+    return _ok(s.get(f"{ctx['url']}/journal/prompts"))
+
+
+def scenario_journal_prompts_audio(s, rng, ctx):
+    return _ok(s.get(f"{ctx['url']}/journal/prompts?audio=1"))
+
+
+def scenario_journal_summary(s, rng, ctx):
+    # A month inside the seeded data (which starts on 2024-01-01), so the summary has work to do
+    start = date(2024, 1, 1) + timedelta(days=rng.randint(0, 300))
+    return _ok(s.get(f"{ctx['url']}/journal/summary?from={start}&to={start + timedelta(days=30)}"))
+
+
+def scenario_journal_search(s, rng, ctx):
+    query = " ".join(rng.sample(WORDS, rng.randint(1, 3)))
+    return _ok(s.post(f"{ctx['url']}/journal/search", json={"query": query, "limit": 20}))
+
+
+def scenario_audio(s, rng, ctx):
+    return _ok(s.get(f"{ctx['url']}/audio/{ctx['audio_id']}"))
+
+
+def scenario_audio_latest(s, rng, ctx):
+    return _ok(s.get(f"{ctx['url']}/audio"))
+
+
+def scenario_jobs(s, rng, ctx):
+    return _ok(s.get(f"{ctx['url']}/jobs/{ctx['job_id']}"))
+
+
+def scenario_events_push(s, rng, ctx):
+    """Time from completing a task to its task_updated event arriving on /events"""
+    task_id = rng.randint(1, ctx["items"])
+    stream = s.get(f"{ctx['url']}/events", stream=True, timeout=10)
+    try:
+        # chunk_size=None hands over each event as it arrives instead of
+        # waiting for a full buffer
+        lines = stream.iter_lines(chunk_size=None)
+        started = time.perf_counter()
+        requests.post(f"{ctx['url']}/tasks/complete", json={"id": task_id, "completed": True})
+        event = None
+        for line in lines:
+            if line.startswith(b"event:"):
+                event = line[6:].strip()
+            elif line.startswith(b"data:") and event == b"task_updated":
+                if json.loads(line[5:])["task"]["id"] == task_id:
+                    return True, time.perf_counter() - started
+            if time.perf_counter() - started > 10:
+                break
+        return False, None
+    finally:
+        stream.close()
+
+
+SCENARIOS = {
+    "health": scenario_health,
+    "metrics": scenario_metrics,
+    "chat": scenario_chat,
+    "chat_wait_audio": scenario_chat_wait_audio,
+    "chat_stream": scenario_chat_stream,
+    "voice": scenario_voice,
+    "voice_stream": scenario_voice_stream,
+    "tasks_full": scenario_tasks_full,
+    "tasks_page": scenario_tasks_page,
+    "tasks_not_modified": scenario_tasks_not_modified,
+    "tasks_since": scenario_tasks_since,
+    "tasks_complete": scenario_tasks_complete,
+    "memory": scenario_memory,
+    "journal_page": scenario_journal_page,
+    "journal_entry": scenario_journal_entry,
+    "journal_prompts": scenario_journal_prompts,
+    "journal_prompts_audio": scenario_journal_prompts_audio,
+    "journal_summary": scenario_journal_summary,
+    "journal_search": scenario_journal_search,
+    "audio": scenario_audio,
+    "audio_latest": scenario_audio_latest,
+    "jobs": scenario_jobs,
+    "events_push": scenario_events_push,
+}
+
+
+def percentile(ordered, p):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def run_scenario(fn, ctx, concurrency, per_client, seed):
+    latencies = []
+    first_bytes = []
+    errors = 0
+    lock = threading.Lock()
+
+    def client(n):
+        nonlocal errors
+        rng = random.Random(seed * 1000 + n)
+        session = requests.Session()
+        mine, firsts, failed = [], [], 0
+        for _ in range(per_client):
+            started = time.perf_counter()
+            try:
+                ok, first = fn(session, rng, ctx)
+            except requests.RequestException:
+                ok, first = False, None
+            mine.append(time.perf_counter() - started)
+            failed += not ok
+            if first is not None:
+                firsts.append(first)
+        with lock:
+            latencies.extend(mine)
+            first_bytes.extend(firsts)
+            errors += failed
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    first_bytes.sort()
+    ms = lambda v: round(v * 1000, 2) if v is not None else None
+    result = {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(latencies[-1] if latencies else None),
+    }
+    if first_bytes:
+        result["first_byte_p50_ms"] = ms(percentile(first_bytes, 50))
+        result["first_byte_p95_ms"] = ms(percentile(first_bytes, 95))
+    return result
+
+
+# Server lifecycle
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(kind, workdir, env, workers, threads):
+    if kind == "gunicorn":
+        if not shutil.which("gunicorn"):
+            raise SystemExit("gunicorn is not installed (pip install gunicorn)")
+        command = ["gunicorn", "-c", os.path.join(BACKEND_DIR, "gunicorn.conf.py"),
+                   "--pythonpath", BACKEND_DIR, "wsgi:application"]
+        env = dict(env, WEB_CONCURRENCY=str(workers), GUNICORN_THREADS=str(threads))
+    else:
+        command = [sys.executable, os.path.join(BACKEND_DIR, "app.py")]
+        env = dict(env, FLASK_DEBUG="false")
+    log = open(os.path.join(workdir, "server.log"), "w")
+    return subprocess.Popen(command, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+def wait_until_ready(url, process, items, timeout):
+    """Up, and done building the journal index for the seeded entries"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with {process.returncode} (see server.log)")
+        try:
+            health = requests.get(f"{url}/health", timeout=5).json()
+            if health["journal_index"]["entries"] >= items:
+                return time.monotonic() - (deadline - timeout)
+        except (requests.RequestException, ValueError, KeyError):
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("server was not ready in time")
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=BACKEND_DIR,
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    """Print per-scenario changes against a previous run; returns the regressions"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = []
+    print(f"\n📈 Compared with {baseline.get('commit')} ({baseline_path}):")
+    for name, levels in results["scenarios"].items():
+        for level, now in levels.items():
+            before = baseline.get("scenarios", {}).get(name, {}).get(level)
+            if not before or not before.get("p50_ms") or not now.get("p50_ms"):
+                continue
+            p50_change = now["p50_ms"] / before["p50_ms"] - 1
+            rps_change = now["rps"] / before["rps"] - 1 if before["rps"] else 0
+            flag = ""
+            if p50_change > threshold or rps_change < -threshold:
+                flag = "  ⚠️ regression"
+                regressions.append(f"{name}@{level}")
+            print(f"   {name:>22} c={level:<3} p50 {before['p50_ms']:>9} -> {now['p50_ms']:>9} ms "
+                  f"({p50_change:+.0%})  rps {before['rps']:>8} -> {now['rps']:>8} ({rps_change:+.0%}){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", default="1k", help="1k, 100k, 1m or a number of tasks and journal entries")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated client counts")
+    parser.add_argument("--requests-per-client", type=int, default=10)
+    parser.add_argument("--scenarios", default=None, help="comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--server", choices=["dev", "gunicorn"], default="dev")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--clip", default="command_3s", help="audio fixture sent to /voice")
+    parser.add_argument("--llm-first-token-ms", type=float, default=300)
+    parser.add_argument("--tokens-per-s", type=float, default=80)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--tts-base-ms", type=float, default=150)
+    parser.add_argument("--whisper-base-ms", type=float, default=100)
+    parser.add_argument("--ready-timeout", type=float, default=1800)
+    parser.add_argument("--out", default=None, help="write the JSON results here")
+    parser.add_argument("--compare", default=None, help="previous results JSON to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2, help="regression threshold for --compare")
+    args = parser.parse_args()
+
+    levels = [int(c) for c in args.concurrency.split(",")]
+    names = args.scenarios.split(",") if args.scenarios else list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"unknown scenarios: {', '.join(unknown)}")
+
+    fake_config = FakeConfig(
+        llm_first_token_ms=args.llm_first_token_ms, tokens_per_s=args.tokens_per_s,
+        llm_error_rate=args.llm_error_rate, tts_base_ms=args.tts_base_ms,
+        whisper_base_ms=args.whisper_base_ms, seed=args.seed
+    )
+    fakes = FakeServices(fake_config).start()
+
+    workdir = tempfile.mkdtemp(prefix="daymind-e2e-")
+    items = seed_database(os.path.join(workdir, "daymind.db"), args.size, args.seed)
+    if items > FULL_LIST_MAX_ITEMS and "tasks_full" in names and not args.scenarios:
+        names.remove("tasks_full")
+    # Events are published in-process, so with several workers the write and
+    # the stream usually land on different ones and the event never arrives
+    if args.server == "gunicorn" and args.workers > 1 and "events_push" in names:
+        print("⏭️  events_push skipped: needs --workers 1 with gunicorn")
+        names.remove("events_push")
+
+    port = free_port()
+    env = dict(
+        os.environ, **fakes.env(), PORT=str(port),
+        DATABASE_FILE=os.path.join(workdir, "daymind.db"),
+        MEMORY_INDEX_DIR=os.path.join(workdir, "memory_index"),
+        TTS_CACHE_DIR=os.path.join(workdir, "tts_cache"),
+        JOURNAL_INDEX_FILE=os.path.join(workdir, "journal_index.pkl"),
+        TRACE_SLOW_MS="0", PYTHONUNBUFFERED="1",
+    )
+    url = f"http://127.0.0.1:{port}"
+    process = start_server(args.server, workdir, env, args.workers, args.threads)
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "size": items,
+        "server": args.server,
+        "config": vars(args),
+        "fakes": fake_config.to_dict(),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "cpus": os.cpu_count()},
+        "scenarios": {},
+    }
+    try:
+        results["ready_s"] = round(wait_until_ready(url, process, items, args.ready_timeout), 2)
+        print(f"🚀 {args.server} server ready in {results['ready_s']}s with {items} tasks/entries")
+
+        # Ids that the audio and job scenarios fetch
+        reply = requests.post(f"{url}/chat", json={"message": "plan my day", "wait_audio": True}).json()
+        ctx = {
+            "url": url,
+            "items": items,
+            "clip": audio_fixture(args.clip),
+            "audio_id": reply.get("audio_id"),
+            "job_id": reply.get("audio_job_id"),
+        }
+
+        for name in names:
+            results["scenarios"][name] = {}
+            for level in levels:
+                # One warm-up request, then the measured run
+                SCENARIOS[name](requests.Session(), random.Random(args.seed), ctx)
+                result = run_scenario(SCENARIOS[name], ctx, level, args.requests_per_client, args.seed)
+                results["scenarios"][name][str(level)] = result
+                first = f"  first byte p50 {result['first_byte_p50_ms']}ms" if "first_byte_p50_ms" in result else ""
+                print(f"📊 {name:>22} c={level:<3} {result['rps']:>8} req/s  p50 {result['p50_ms']:>8}ms  "
+                      f"p95 {result['p95_ms']:>8}ms  errors {result['errors']}{first}")
+
+        # Destructive, so last and once
+        started = time.perf_counter()
+        status = requests.post(f"{url}/tasks/clear").status_code
+        results["scenarios"]["tasks_clear"] = {"1": {
+            "requests": 1, "errors": int(status != 200), "p50_ms": round((time.perf_counter() - started) * 1000, 2)
+        }}
+        results["fake_calls"] = fakes.calls
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        fakes.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results written to {args.out}")
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"❌ Regressions: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
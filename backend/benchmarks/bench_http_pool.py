@@ -0,0 +1,159 @@
+"""
+Outbound HTTP pooling benchmark
+
+Runs a local keep-alive stub server and measures per-call overhead of:
+- bare: requests.post per call (new connection every time, the old path)
+- pooled: the shared HTTPClient (keep-alive connection reuse)
+- async: an asyncio client with the same retries and --concurrency calls
+  in flight, to see what an async worker would gain (the app is synchronous,
+  so it only lives here)
+
+The stub answers instantly, so the numbers are pure client/connection cost.
+Against real providers the gap is larger because every bare call also pays
+a TLS handshake.
+
+Usage (from backend/):
+    python benchmarks/bench_http_pool.py --calls 500
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+import statistics
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from http_client import (
+    HTTPClient, backoff_delay, RETRY_STATUSES,
+    HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_RETRIES, HTTP_POOL_SIZE,
+)
+
+BODY = json.dumps({"choices": [{"message": {"content": "ok"}}]}).encode()
+
+
+class AsyncHTTPClient:
+    """
+    asyncio counterpart of HTTPClient. With httpx installed requests run on
+    one pooled httpx.AsyncClient; otherwise they run on the sync client in
+    worker threads.
+    """
+
+    def __init__(self, connect_timeout=HTTP_CONNECT_TIMEOUT, read_timeout=HTTP_READ_TIMEOUT,
+                 retries=HTTP_RETRIES, pool_size=HTTP_POOL_SIZE):
+        self.retries = retries
+        try:
+            import httpx
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                limits=httpx.Limits(max_keepalive_connections=pool_size),
+            )
+            self._sync = None
+        except ImportError:
+            self._client = None
+            self._sync = HTTPClient(connect_timeout, read_timeout, retries, pool_size)
+
+    async def request(self, method, url, **kwargs):
+        """Returns an httpx.Response (or requests.Response without httpx)"""
+        if self._client is None:
+            return await asyncio.to_thread(self._sync.request, method, url, **kwargs)
+        import httpx
+        attempt = 0
+        while True:
+            try:
+                response = await self._client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                if attempt >= self.retries:
+                    raise
+                await asyncio.sleep(backoff_delay(attempt))
+                attempt += 1
+                continue
+            if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                await asyncio.sleep(backoff_delay(attempt, response.headers.get("Retry-After")))
+                attempt += 1
+                continue
+            return response
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+
+
+def start_stub_server():
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(BODY)))
+            self.end_headers()
+            self.wfile.write(BODY)
+
+        def log_message(self, *args):
+            pass
+
+    ThreadingHTTPServer.request_queue_size = 128
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}/v1/chat/completions"
+
+
+def time_calls(call, n):
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {"p50_ms": round(statistics.median(latencies), 3),
+            "mean_ms": round(statistics.mean(latencies), 3)}
+
+
+async def time_async(url, n, concurrency):
+    client = AsyncHTTPClient()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await client.post(url, json={"messages": []})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(n)))
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+    return {"calls_per_s": round(n / elapsed, 1), "concurrency": concurrency}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    url = start_stub_server()
+    payload = {"messages": [{"role": "user", "content": "hi"}]}
+    pooled = HTTPClient()
+
+    results = {
+        "bare": time_calls(lambda: requests.post(url, json=payload), args.calls),
+        "pooled": time_calls(lambda: pooled.post(url, json=payload), args.calls),
+        "async": asyncio.run(time_async(url, args.calls, args.concurrency)),
+    }
+    print(f"🌐 bare requests.post: {results['bare']['mean_ms']} ms/call")
+    print(f"🌐 pooled HTTPClient:  {results['pooled']['mean_ms']} ms/call")
+    print(f"🌐 async x{args.concurrency}: {results['async']['calls_per_s']} calls/s")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
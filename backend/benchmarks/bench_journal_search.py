@@ -0,0 +1,119 @@
+"""
+Journal search benchmark: inverted index vs. the original linear scan
+
+Fills a journal with --entries synthetic entries, then times the original
+/journal/search implementation (load every entry, lowercase it, substring
+test) against JournalIndex.search for a few queries. Also reports the
+index build time and the time to reload it from its snapshot.
+
+Usage (from backend/):
+    python benchmarks/bench_journal_search.py --entries 100000
+"""
+import os
+import sys
+import time
+import json
+import random
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import SQLiteStore
+from journal_index import JournalIndex
+
+WORDS = """
+work meeting project deadline team coffee walk park run gym sleep tired
+happy anxious calm family friend dinner lunch breakfast book read write
+code bug release plan focus music rain sun morning evening weekend travel
+train bus call email garden cook bake movie podcast yoga stretch doctor
+""".split()
+MOODS = ["great", "good", "neutral", "bad", "terrible"]
+QUERIES = ["coffee", "project deadline", "gar", "anxious morning walk", "topic123", "zebra"]
+
+
+def make_entry(rng, i):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(15, 60))]
+    # A sprinkle of rare words so the vocabulary isn't tiny
+    words.append(f"topic{rng.randint(0, 5000)}")
+    day = 1 + i % 28
+    return {
+        "id": i + 1,
+        "entry": " ".join(words).capitalize() + ".",
+        "mood": rng.choice(MOODS),
+        "ai_response": "Thanks for sharing. " + " ".join(rng.choice(WORDS) for _ in range(20)),
+        "timestamp": f"2025-{1 + i % 12:02d}-{day:02d}T09:00:00",
+        "date": ""
+    }
+
+
+def linear_scan(store, journal_file, query):
+    """The original search_journal body"""
+    query = query.lower()
+    journal = store.load(journal_file)
+    return [
+        e for e in journal["entries"]
+        if query in e["entry"].lower() or query in e.get("mood", "").lower()
+    ]
+
+
+def time_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    workdir = tempfile.mkdtemp(prefix="daymind-search-")
+    journal_file = os.path.join(workdir, "journal.json")
+    snapshot = os.path.join(workdir, "journal_index.pkl")
+    store = SQLiteStore([journal_file], db_path=os.path.join(workdir, "daymind.db"))
+    store.init()
+    store.extend(journal_file, [make_entry(rng, i) for i in range(args.entries)])
+    print(f"📦 {args.entries} journal entries in {workdir}")
+
+    index = JournalIndex(store, journal_file, snapshot_path=snapshot)
+    start = time.perf_counter()
+    index.refresh()
+    build_ms = (time.perf_counter() - start) * 1000
+    index._save_snapshot()
+
+    reloaded = JournalIndex(store, journal_file, snapshot_path=snapshot)
+    start = time.perf_counter()
+    reloaded.refresh()
+    reload_ms = (time.perf_counter() - start) * 1000
+
+    print(f"🔎 index build {build_ms:.0f}ms, reload from snapshot {reload_ms:.0f}ms, "
+          f"{index.status()['terms']} terms")
+
+    results = {"entries": args.entries, "build_ms": round(build_ms), "reload_ms": round(reload_ms), "queries": []}
+    for query in QUERIES:
+        scan_ms = time_ms(lambda: linear_scan(store, journal_file, query), args.repeat)
+        index_ms = time_ms(lambda: index.search(query, limit=20), args.repeat)
+        filtered_ms = time_ms(
+            lambda: index.search(query, mood="good", date_from="2025-03-01", date_to="2025-06-30", limit=20),
+            args.repeat
+        )
+        _, total, _ = index.search(query, limit=20)
+        results["queries"].append({
+            "query": query, "matches": total,
+            "scan_ms": scan_ms, "index_ms": index_ms, "index_filtered_ms": filtered_ms,
+        })
+        print(f"📊 {query!r:>24}: scan={scan_ms}ms index={index_ms}ms "
+              f"filtered={filtered_ms}ms ({total} matches)")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
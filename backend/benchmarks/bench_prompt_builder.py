@@ -0,0 +1,124 @@
+"""
+Prompt size and latency with long conversation histories
+
+Seeds memory with --history conversations whose replies are --reply-chars
+long, then compares for a series of planning messages:
+- legacy: every call reloads memory.json, renders all three mode prompts
+  and inlines the last 5 conversations in full (the old get_ai_response)
+- builder: app.build_system_prompt (templates parsed once, cached context,
+  trimmed to the provider's token budget)
+
+Reports prompt tokens, build time, and end-to-end time of a non-streaming
+call to the fake LLM (fakes.py), whose time to first token grows with
+--ms-per-prompt-token like a real provider's prefill.
+
+Usage (from backend/):
+    python benchmarks/bench_prompt_builder.py --history 50 --reply-chars 4000
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fakes import FakeConfig, FakeServices, TRANSCRIPTS
+from fixtures import WORDS
+
+
+def legacy_prompt(app, user_message, mode="planning"):
+    """The prompt assembly get_ai_response used before the prompt builder"""
+    memory = app.load_json(app.MEMORY_FILE)
+    recent_context = ""
+    for convo in memory.get("conversations", [])[-5:]:
+        recent_context += f"User: {convo['user']}\nAssistant: {convo['assistant']}\n\n"
+    now = datetime.now()
+    prompts = {
+        name: template.replace("{context}", recent_context)
+        .replace("{date}", now.strftime("%A, %B %d, %Y")).replace("{time}", now.strftime("%I:%M %p"))
+        for name, template in app.SYSTEM_PROMPTS.items()
+    }
+    return prompts.get(mode, prompts["general"])
+
+
+def long_history(n, reply_chars, seed=0):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, 9)
+    for i in range(n):
+        reply = []
+        while sum(len(w) + 1 for w in reply) < reply_chars:
+            reply.append(rng.choice(WORDS))
+        yield {
+            "user": f"Help me plan {' '.join(rng.sample(WORDS, 4))}",
+            "assistant": " ".join(reply),
+            "timestamp": (start + timedelta(hours=i)).isoformat(),
+        }
+
+
+def measure(build, call, messages):
+    tokens, build_ms, total_ms = [], [], []
+    for message in messages:
+        started = time.perf_counter()
+        prompt = build(message)
+        built = time.perf_counter()
+        call(prompt, message)
+        tokens.append(len(prompt) // 4 + len(message) // 4)
+        build_ms.append((built - started) * 1000)
+        total_ms.append((time.perf_counter() - started) * 1000)
+    return {
+        "prompt_tokens_avg": round(statistics.mean(tokens)),
+        "prompt_tokens_max": max(tokens),
+        "build_ms_p50": round(statistics.median(build_ms), 3),
+        "end_to_end_ms_p50": round(statistics.median(total_ms), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--history", type=int, default=50, help="conversations in memory")
+    parser.add_argument("--reply-chars", type=int, default=4000, help="length of each remembered reply")
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--llm-first-token-ms", type=float, default=150)
+    parser.add_argument("--ms-per-prompt-token", type=float, default=0.2)
+    args = parser.parse_args()
+
+    fakes = FakeServices(FakeConfig(
+        llm_first_token_ms=args.llm_first_token_ms, tokens_per_s=10_000,
+        llm_ms_per_prompt_token=args.ms_per_prompt_token
+    )).start()
+    workdir = tempfile.mkdtemp(prefix="daymind-prompt-")
+    os.environ.update(fakes.env())
+    os.environ.pop("WHISPER_SERVER_URL")
+    os.chdir(workdir)
+    import app
+
+    app.store.extend(app.MEMORY_FILE, list(long_history(args.history, args.reply_chars)))
+    app.index_existing_memory()
+
+    # Repeated messages, like real users asking for their plan again
+    rng = random.Random(0)
+    messages = [rng.choice(TRANSCRIPTS) for _ in range(args.requests)]
+    call = lambda prompt, message: app.request_groq(prompt, message)
+
+    results = {
+        "legacy": measure(lambda m: legacy_prompt(app, m), call, messages),
+        "builder": measure(lambda m: app.build_system_prompt("planning", m), call, messages),
+    }
+    fakes.stop()
+
+    for name, result in results.items():
+        print(f"📊 {name:>8}: {result['prompt_tokens_avg']:>6} prompt tokens, build p50 "
+              f"{result['build_ms_p50']}ms, end-to-end p50 {result['end_to_end_ms_p50']}ms")
+    print(json.dumps({"config": vars(args), "results": results,
+                      "prompt_builder": app.prompt_builder.status()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
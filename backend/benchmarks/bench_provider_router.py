@@ -0,0 +1,83 @@
+"""
+Provider router benchmark with local fake providers
+
+Scenarios:
+- tail: the primary is usually fast but sometimes hangs; compares
+  fallback-only routing with hedged routing (p50/p99)
+- outage: the primary always fails; shows the circuit breaker skipping it
+  after a few calls instead of paying for a failed call every time
+
+Usage (from backend/):
+    python benchmarks/bench_provider_router.py --calls 200
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from provider_router import Provider, ProviderRouter
+
+
+def fake_provider(name, latency_ms, slow_ms=0, slow_rate=0.0, fail_rate=0.0, fail_ms=50):
+    def call(system_prompt, user_message):
+        if random.random() < fail_rate:
+            time.sleep(fail_ms / 1000)
+            raise RuntimeError(f"{name} injected fault")
+        slow = random.random() < slow_rate
+        time.sleep((slow_ms if slow else latency_ms) / 1000)
+        return f"reply from {name}"
+    return call
+
+
+def run(router, calls):
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        router.call("system", "plan my day")
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "p50_ms": round(latencies[len(latencies) // 2], 1),
+        "p99_ms": round(latencies[max(0, int(len(latencies) * 0.99) - 1)], 1),
+        "max_ms": round(latencies[-1], 1),
+        "providers": router.status(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    results = {}
+    # fallback_only pushes the hedge deadline out of reach
+    for mode, hedge_ms, hedge_min_ms in [("fallback_only", 10 ** 9, 10 ** 9), ("hedged", 400, 50)]:
+        random.seed(args.seed)
+        router = ProviderRouter([
+            Provider("primary", fake_provider("primary", 40, slow_ms=1500, slow_rate=0.02)),
+            Provider("secondary", fake_provider("secondary", 60)),
+        ], hedge_default_ms=hedge_ms, hedge_min_ms=hedge_min_ms)
+        results[f"tail_{mode}"] = run(router, args.calls)
+        print(f"📊 tail, {mode:>13}: p50={results[f'tail_{mode}']['p50_ms']}ms "
+              f"p99={results[f'tail_{mode}']['p99_ms']}ms max={results[f'tail_{mode}']['max_ms']}ms")
+
+    random.seed(args.seed)
+    router = ProviderRouter([
+        Provider("primary", fake_provider("primary", 40, fail_rate=1.0, fail_ms=300)),
+        Provider("secondary", fake_provider("secondary", 60)),
+    ])
+    results["outage"] = run(router, args.calls)
+    print(f"📊 outage: p50={results['outage']['p50_ms']}ms, primary called "
+          f"{results['outage']['providers']['primary']['calls']}x of {args.calls}, "
+          f"breaker {results['outage']['providers']['primary']['breaker']}")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Semantic memory benchmark
+
+Indexes --sizes synthetic conversation snippets with the configured
+embedder (hashing by default, EMBEDDING_MODEL for a local model) and
+reports embedding throughput, index size on disk and top-k retrieval
+latency, including the cold search that maps the matrix from disk.
+
+Usage (from backend/):
+    python benchmarks/bench_semantic_memory.py --sizes 10000 100000
+"""
+import os
+import sys
+import time
+import json
+import random
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from semantic_memory import SemanticMemory, create_embedder
+
+TOPICS = {
+    "taxes": "finish the quarterly tax report and send receipts to the accountant",
+    "garden": "water the tomato plants and weed the vegetable garden",
+    "fitness": "go for a morning run and stretch before the gym session",
+    "family": "call my sister about the birthday party on Saturday",
+    "work": "prepare slides for the project review meeting with the team",
+    "health": "book a dentist appointment and pick up the prescription",
+    "reading": "read two chapters of the novel before bed",
+    "travel": "pack the suitcase and check the train times to the airport",
+}
+QUERIES = [
+    "How should I handle my tax paperwork?",
+    "when is my sister's party",
+    "help me plan a workout",
+    "what do I need for the trip",
+]
+
+
+def make_snippet(rng, i):
+    topic = rng.choice(list(TOPICS))
+    filler = " ".join(rng.choice(["today", "later", "maybe", "quickly", "first", "again"]) for _ in range(5))
+    return (
+        f"memory:{i}",
+        f"User: I need to {TOPICS[topic]} {filler}\nAssistant: Sure, let's block time for {topic} #{i}.",
+        {"source": "memory"},
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    embedder = create_embedder()
+    results = []
+    for size in args.sizes:
+        directory = tempfile.mkdtemp(prefix="daymind-memory-")
+        memory = SemanticMemory(directory, embedder=embedder)
+        items = [make_snippet(rng, i) for i in range(size)]
+
+        start = time.perf_counter()
+        for batch in range(0, size, 1000):
+            memory.add_many(items[batch:batch + 1000])
+        index_s = time.perf_counter() - start
+
+        # A fresh instance maps the matrix from disk, like a restarted worker
+        reader = SemanticMemory(directory, embedder=embedder)
+        start = time.perf_counter()
+        reader.search(QUERIES[0])
+        cold_ms = (time.perf_counter() - start) * 1000
+
+        latencies = []
+        for i in range(args.queries):
+            start = time.perf_counter()
+            reader.search(QUERIES[i % len(QUERIES)], k=4)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        context = reader.context_for(QUERIES[0], budget=800)
+        result = {
+            "embedder": embedder.name,
+            "snippets": size,
+            "embed_per_s": round(size / index_s),
+            "index_mb": round(reader.status()["bytes"] / 1024 / 1024, 1),
+            "cold_search_ms": round(cold_ms, 1),
+            "search_p50_ms": round(statistics.median(latencies), 2),
+            "search_p95_ms": round(sorted(latencies)[int(len(latencies) * 0.95) - 1], 2),
+            "context_snippets": len(context),
+            "top_hit": context[0].split("\n")[0] if context else None,
+        }
+        results.append(result)
+        print(f"📊 {size:>8} snippets: {result['embed_per_s']}/s indexed, {result['index_mb']}MB, "
+              f"search p50={result['search_p50_ms']}ms p95={result['search_p95_ms']}ms "
+              f"(cold {result['cold_search_ms']}ms)")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
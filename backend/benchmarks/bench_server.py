@@ -0,0 +1,180 @@
+"""
+Server throughput benchmark: Flask dev server vs. gunicorn
+
+Starts the app under each server in a fresh directory seeded with --tasks
+tasks and --entries journal entries, then hammers it from --concurrency
+client threads for --seconds and reports requests/s and latency
+percentiles. The mix is read-heavy and never calls an AI provider:
+GET /tasks?limit=50, GET /journal?limit=5&order=desc, POST /journal/search
+and GET /health.
+
+- dev: `python app.py` (Flask's development server, FLASK_DEBUG as given)
+- gunicorn: `gunicorn -c gunicorn.conf.py wsgi:application` with
+  --workers processes and --threads threads each (skipped if gunicorn
+  isn't installed)
+
+Usage (from backend/):
+    python benchmarks/bench_server.py --seconds 10 --concurrency 32 --workers 4
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import random
+import argparse
+import tempfile
+import threading
+import subprocess
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+WORDS = "work meeting project coffee walk gym family friend book code plan focus music".split()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def seed(workdir, tasks, entries):
+    os.environ["DATABASE_FILE"] = os.path.join(workdir, "daymind.db")
+    from storage import SQLiteStore
+    store = SQLiteStore(["memory.json", "tasks.json", "journal.json"], os.environ["DATABASE_FILE"])
+    store.init()
+    rng = random.Random(1)
+    store.extend("tasks.json", [
+        {"task": f"Task {i}: {' '.join(rng.sample(WORDS, 4))}", "created": "2025-01-01T09:00:00", "completed": False}
+        for i in range(tasks)
+    ])
+    store.extend("journal.json", [
+        {"entry": " ".join(rng.choice(WORDS) for _ in range(30)), "mood": "good", "ai_response": "",
+         "timestamp": f"2025-01-{1 + i % 28:02d}T20:00:00", "date": ""}
+        for i in range(entries)
+    ])
+
+
+def wait_until_up(url, process, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with {process.returncode}")
+        try:
+            if requests.get(f"{url}/health", timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError("server did not come up")
+
+
+def hammer(url, seconds, concurrency):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def client(n):
+        nonlocal errors
+        session = requests.Session()
+        rng = random.Random(n)
+        mine = []
+        failed = 0
+        while time.monotonic() < deadline:
+            pick = rng.random()
+            start = time.perf_counter()
+            try:
+                if pick < 0.4:
+                    r = session.get(f"{url}/tasks?limit=50")
+                elif pick < 0.7:
+                    r = session.get(f"{url}/journal?limit=5&order=desc")
+                elif pick < 0.95:
+                    r = session.post(f"{url}/journal/search", json={"query": rng.choice(WORDS)})
+                else:
+                    r = session.get(f"{url}/health")
+                failed += r.status_code != 200
+            except requests.RequestException:
+                failed += 1
+            mine.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(mine)
+            errors += failed
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2], 2) if latencies else None,
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)], 2) if latencies else None,
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)], 2) if latencies else None,
+    }
+
+
+def run_server(name, command, env, args):
+    workdir = tempfile.mkdtemp(prefix=f"daymind-{name}-")
+    seed(workdir, args.tasks, args.entries)
+    port = free_port()
+    env = dict(os.environ, **env, PORT=str(port), DATABASE_FILE=os.path.join(workdir, "daymind.db"),
+               MEMORY_INDEX_DIR=os.path.join(workdir, "memory_index"), PYTHONUNBUFFERED="1")
+    process = subprocess.Popen(command, cwd=workdir, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_up(url, process)
+        hammer(url, 1, args.concurrency)  # warm-up
+        result = hammer(url, args.seconds, args.concurrency)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(f"📊 {name:>9}: {result['rps']:>8} req/s  p50 {result['p50_ms']}ms  "
+          f"p95 {result['p95_ms']}ms  p99 {result['p99_ms']}ms  errors {result['errors']}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--dev-debug", action="store_true",
+                        help="run the dev server with FLASK_DEBUG=true (the old default)")
+    args = parser.parse_args()
+
+    results = {"config": vars(args)}
+    results["dev"] = run_server(
+        "dev", [sys.executable, os.path.join(BACKEND_DIR, "app.py")],
+        {"FLASK_DEBUG": "true" if args.dev_debug else "false"}, args
+    )
+
+    if shutil.which("gunicorn"):
+        results["gunicorn"] = run_server(
+            "gunicorn",
+            ["gunicorn", "-c", os.path.join(BACKEND_DIR, "gunicorn.conf.py"),
+             "--pythonpath", BACKEND_DIR, "wsgi:application"],
+            {"WEB_CONCURRENCY": str(args.workers), "GUNICORN_THREADS": str(args.threads)}, args
+        )
+    else:
+        print("⚠️ gunicorn not installed, skipping (pip install gunicorn)")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
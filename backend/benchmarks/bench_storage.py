@@ -0,0 +1,84 @@
+"""
+Storage write-latency benchmark
+
+Grows a journal from 1k up to --max entries and, at each size, times a batch
+of single-entry appends. With the SQLite backend the latency stays flat; the
+legacy JSON backend grows linearly with the file size.
+
+Usage (from backend/):
+    python benchmarks/bench_storage.py --backend sqlite --max 1000000
+    python benchmarks/bench_storage.py --backend json --max 10000
+"""
+import os
+import sys
+import time
+import json
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import JSONStore, SQLiteStore
+
+
+def make_entry(i):
+    return {
+        "id": i + 1,
+        "entry": f"Journal entry number {i} about a pretty ordinary day",
+        "mood": "good",
+        "ai_response": "That sounds like a balanced day. Keep it up!",
+        "timestamp": "2025-01-01T09:00:00",
+        "date": "January 01, 2025"
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=["sqlite", "json"], default="sqlite")
+    parser.add_argument("--max", type=int, default=1_000_000)
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="daymind-bench-")
+    journal_file = os.path.join(workdir, "journal.json")
+    if args.backend == "json":
+        store = JSONStore([journal_file])
+    else:
+        store = SQLiteStore([journal_file], db_path=os.path.join(workdir, "daymind.db"))
+    store.init()
+
+    sizes = []
+    size = 1000
+    while size <= args.max:
+        sizes.append(size)
+        size *= 10
+
+    results = []
+    current = 0
+    for size in sizes:
+        # Bulk-fill up to the target size without timing it
+        store.extend(journal_file, [make_entry(i) for i in range(current, size)])
+        current = size
+
+        latencies = []
+        for i in range(args.samples):
+            start = time.perf_counter()
+            store.append(journal_file, make_entry(current + i))
+            latencies.append((time.perf_counter() - start) * 1000)
+        current += args.samples
+
+        result = {
+            "backend": args.backend,
+            "entries": size,
+            "p50_ms": round(statistics.median(latencies), 3),
+            "p99_ms": round(sorted(latencies)[int(len(latencies) * 0.99) - 1], 3),
+        }
+        results.append(result)
+        print(f"📊 {size:>9} entries: p50={result['p50_ms']}ms p99={result['p99_ms']}ms")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
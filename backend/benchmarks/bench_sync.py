@@ -0,0 +1,68 @@
+"""
+Task sync payload benchmark
+
+Seeds an account with --tasks tasks, then compares what a polling client
+downloads through GET /tasks: the full list, an unchanged poll answered
+with 304, one page, and a ?since= delta after one task is completed and
+one is added.
+
+Usage (from backend/):
+    python benchmarks/bench_sync.py --tasks 10000
+"""
+import os
+import sys
+import time
+import json
+import argparse
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def load_app(workdir):
+    os.chdir(workdir)
+    os.environ["DATABASE_FILE"] = os.path.join(workdir, "daymind.db")
+    import app
+    app.create_app()
+    return app
+
+
+def measure(client, url, headers=None):
+    start = time.perf_counter()
+    response = client.get(url, headers=headers or {})
+    ms = (time.perf_counter() - start) * 1000
+    return response, {"status": response.status_code, "bytes": len(response.data), "ms": round(ms, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=10_000)
+    args = parser.parse_args()
+
+    app = load_app(tempfile.mkdtemp(prefix="daymind-sync-"))
+    app.store.extend(app.TASKS_FILE, [
+        {"task": f"Task number {i}: review notes and follow up", "created": "2025-01-01T09:00:00", "completed": False}
+        for i in range(args.tasks)
+    ])
+    client = app.create_app().test_client()
+
+    results = {"tasks": args.tasks}
+    full, results["full"] = measure(client, "/tasks")
+    version = full.json["version"]
+    _, results["unchanged_304"] = measure(client, "/tasks", {"If-None-Match": full.headers["ETag"]})
+    _, results["page_50"] = measure(client, "/tasks?limit=50")
+
+    client.post("/tasks/complete", json={"id": full.json["tasks"][0]["id"]})
+    app.store.append(app.TASKS_FILE, {"task": "One new task", "created": "2025-01-01T10:00:00", "completed": False})
+    delta, results["delta_since"] = measure(client, f"/tasks?since={version}")
+    results["delta_since"]["changed"] = len(delta.json["tasks"])
+
+    for name in ("full", "unchanged_304", "page_50", "delta_since"):
+        r = results[name]
+        print(f"📊 {name:>14}: {r['status']} {r['bytes']:>9} bytes {r['ms']:>8}ms")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Task extraction benchmark: regression corpus, throughput and adversarial inputs
+
+Checks every recorded reply in task_corpus.json against its expected task
+titles (and start times where given), then times task_extraction.extract_tasks
+against the original regex implementation on the corpus and on adversarial
+replies (long whitespace runs, repeated "1.", one huge line, a 1 MB reply).
+Exits non-zero if any corpus reply extracts differently.
+
+Usage (from backend/):
+    python benchmarks/bench_task_extraction.py --repeat 200
+"""
+import os
+import re
+import sys
+import time
+import json
+import argparse
+from datetime import date
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from task_extraction import extract_tasks
+
+DAY = date(2025, 1, 6)
+
+
+def legacy_extract_tasks(text):
+    """The original app.extract_tasks, kept here for comparison"""
+    tasks = []
+    pattern_time = r'(\d{1,2}:\d{2}\s*(?:AM|PM|am|pm)?(?:\s*-\s*\d{1,2}:\d{2}\s*(?:AM|PM|am|pm)?)?)[:\-]\s*([^\n]{15,})'
+    matches_time = re.findall(pattern_time, text, re.IGNORECASE)
+    pattern_numbered = r'\d+[\.)]\s*([^\n]{15,}?)(?=(?:\d+[\.)]|\n\n|$))'
+    matches_numbered = re.findall(pattern_numbered, text, re.DOTALL)
+    for time_part, task_part in matches_time:
+        tasks.append(f"{time_part}: {task_part.strip()}")
+    if not tasks:
+        for match in matches_numbered:
+            task = re.sub(r'\s+', ' ', match.strip()).split('\n')[0]
+            if len(task) > 15:
+                tasks.append(task)
+    return tasks[:15]
+
+
+def adversarial_inputs(corpus):
+    plan = "\n".join(entry["reply"] for entry in corpus)
+    return {
+        "whitespace_run_50k": "1." + " " * 50_000 + "x",
+        "repeated_numbers_20k": "1." * 20_000,
+        "numbered_no_newlines_100k": "".join(f"{i}. item without a break " for i in range(4_000)),
+        "huge_single_line_200k": "9:00 - " + "a" * 200_000,
+        "reply_1mb": (plan + "\n\n") * (1_000_000 // (len(plan) + 2)),
+    }
+
+
+def check_corpus(corpus):
+    failures = []
+    for entry in corpus:
+        tasks = extract_tasks(entry["reply"], DAY)
+        titles = [task["title"] for task in tasks]
+        if titles != entry["expected"]:
+            failures.append(f"{entry['name']}: expected {entry['expected']}, got {titles}")
+        if "starts" in entry:
+            starts = [task["start"][11:16] if task["start"] else None for task in tasks]
+            if starts != entry["starts"]:
+                failures.append(f"{entry['name']}: expected starts {entry['starts']}, got {starts}")
+    return failures
+
+
+def time_calls(fn, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - start) * 1000 / (repeat * len(texts))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--skip-legacy-adversarial", action="store_true",
+                        help="don't run the original regexes on the adversarial inputs")
+    args = parser.parse_args()
+
+    with open(os.path.join(BENCH_DIR, "task_corpus.json"), encoding="utf-8") as f:
+        corpus = json.load(f)
+
+    failures = check_corpus(corpus)
+    for failure in failures:
+        print(f"❌ {failure}")
+    print(f"📊 corpus: {len(corpus) - len(failures)}/{len(corpus)} replies match")
+
+    replies = [entry["reply"] for entry in corpus]
+    results = {
+        "corpus_replies": len(corpus),
+        "corpus_failures": len(failures),
+        "corpus_ms_per_reply": {
+            "legacy": round(time_calls(legacy_extract_tasks, replies, args.repeat), 4),
+            "engine": round(time_calls(lambda t: extract_tasks(t, DAY), replies, args.repeat), 4),
+        },
+        "adversarial_ms": {},
+    }
+
+    for name, text in adversarial_inputs(corpus).items():
+        row = {"chars": len(text), "engine": round(time_calls(lambda t: extract_tasks(t, DAY), [text], 1), 2)}
+        if not args.skip_legacy_adversarial:
+            row["legacy"] = round(time_calls(legacy_extract_tasks, [text], 1), 2)
+        results["adversarial_ms"][name] = row
+        print(f"📊 {name:>26}: engine {row['engine']:>9}ms  legacy {row.get('legacy', '-'):>9}ms")
+
+    print(json.dumps(results, indent=2))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
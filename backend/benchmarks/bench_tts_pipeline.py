@@ -0,0 +1,102 @@
+"""
+Time-to-first-audio benchmark for sentence-pipelined TTS
+
+Runs a local stub ElevenLabs server whose latency grows with text length
+and a fake LLM that streams a reply word by word, then compares:
+- whole: wait for the full reply, synthesize it in one request (old path)
+- pipelined: /chat with stream=true, sentences synthesized while streaming
+
+Usage (from backend/):
+    python benchmarks/bench_tts_pipeline.py --tts-ms-per-char 8 --tokens-per-s 40
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import tempfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+REPLY = (
+    "Great, let's plan a focused morning for you. "
+    "9:00 AM - 10:30 AM: Deep work on the quarterly report draft. "
+    "10:30 AM - 10:45 AM: Short break, stretch and refill your water. "
+    "10:45 AM - 12:00 PM: Review pull requests and answer messages. "
+    "Remember to protect your first block from meetings, it's your best energy of the day!"
+)
+
+
+def start_stub_tts(base_ms, ms_per_char):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep((base_ms + ms_per_char * len(body["text"])) / 1000)
+            audio = b"ID3" + body["text"].encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/mpeg")
+            self.send_header("Content-Length", str(len(audio)))
+            self.end_headers()
+            self.wfile.write(audio)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tts-base-ms", type=float, default=150)
+    parser.add_argument("--tts-ms-per-char", type=float, default=8)
+    parser.add_argument("--tokens-per-s", type=float, default=40)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="daymind-tts-"))
+    import app
+
+    app.ELEVENLABS_API_URL = start_stub_tts(args.tts_base_ms, args.tts_ms_per_char)
+    app.ELEVENLABS_API_KEY = "stub"
+    words = [w + " " for w in REPLY.split(" ")]
+
+    def fake_stream(user_message, mode="planning", info=None):
+        for word in words:
+            time.sleep(1 / args.tokens_per_s)
+            yield word
+
+    def fake_response(user_message, history, mode="planning"):
+        return "".join(fake_stream(user_message, mode))
+
+    app.stream_ai_response = fake_stream
+    app.get_ai_response = fake_response
+    client = app.create_app().test_client()
+
+    results = {"whole": [], "pipelined": []}
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        client.post("/chat", json={"message": "plan my morning", "wait_audio": True})
+        results["whole"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        response = client.post("/chat", json={"message": "plan my morning", "stream": True},
+                               buffered=False)
+        first_audio = None
+        for chunk in response.response:
+            text = chunk.decode() if isinstance(chunk, bytes) else chunk
+            if first_audio is None and "event: audio" in text:
+                first_audio = time.perf_counter() - start
+        results["pipelined"].append(first_audio)
+
+    summary = {mode: round(1000 * sum(v) / len(v), 1) for mode, v in results.items()}
+    print(f"🎵 time to first audio, whole reply: {summary['whole']} ms")
+    print(f"🎵 time to first audio, pipelined:   {summary['pipelined']} ms")
+    print(json.dumps({"time_to_first_audio_ms": summary, **vars(args)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Silence trimming benchmark: transcription time per audio-minute
+
+Transcribes the audio fixtures (fixtures.py) with a real Whisper model,
+once with the whole clip (the old path) and once through the VAD, which
+trims silence, drops silent clips and batches the speech chunks of long
+recordings. Reports seconds of transcription per minute of audio, the
+share of audio that reached the model and the VAD's own cost.
+
+The fixtures are synthetic, so the transcripts are meaningless; pass real
+recordings with --audio to compare text as well.
+
+Usage (from backend/):
+    python benchmarks/bench_vad.py --model base
+    python benchmarks/bench_vad.py --model tiny --audio note.wav --audio quiet_start.webm
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from audio import SAMPLE_RATE, decode_audio
+from fixtures import AUDIO_FIXTURES
+from vad import VoiceActivityDetector, NoSpeechDetected
+from whisper_manager import WhisperManager
+from transcription import TranscriptionScheduler
+
+
+def timed_transcribe(scheduler, audio, repeats):
+    best = None
+    text = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        try:
+            text = scheduler.transcribe(audio)["text"]
+        except NoSpeechDetected:
+            text = None
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, text
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--device", default="auto")
+    parser.add_argument("--audio", action="append", default=[], help="extra recordings to include")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    clips = {name: make() for name, make in AUDIO_FIXTURES.items()}
+    for path in args.audio:
+        with open(path, "rb") as f:
+            clips[os.path.basename(path)] = decode_audio(f.read())
+
+    manager = WhisperManager(model_name=args.model, device=args.device, server_url=None)
+    manager.load()
+    whole = TranscriptionScheduler(manager, vad=VoiceActivityDetector(enabled=False))
+    trimmed = TranscriptionScheduler(manager, vad=VoiceActivityDetector(enabled=True))
+
+    # Warm up the model so the first clip doesn't pay for it
+    whole.transcribe(clips["command_3s"])
+
+    results = []
+    for name, audio in clips.items():
+        minutes = len(audio) / SAMPLE_RATE / 60
+        vad = VoiceActivityDetector()
+        started = time.perf_counter()
+        chunks = vad.speech_chunks(audio)
+        vad_ms = (time.perf_counter() - started) * 1000
+
+        whole_s, whole_text = timed_transcribe(whole, audio, args.repeats)
+        trimmed_s, trimmed_text = timed_transcribe(trimmed, audio, args.repeats)
+        result = {
+            "clip": name,
+            "audio_s": round(len(audio) / SAMPLE_RATE, 1),
+            "speech_s": round(sum(len(c) for c in chunks) / SAMPLE_RATE, 1),
+            "chunks": len(chunks),
+            "vad_ms": round(vad_ms, 2),
+            "whole_s_per_audio_min": round(whole_s / minutes, 2),
+            "vad_s_per_audio_min": round(trimmed_s / minutes, 2),
+            "speedup": round(whole_s / trimmed_s, 1) if trimmed_s else None,
+            "whole_text": whole_text,
+            "vad_text": trimmed_text,
+        }
+        results.append(result)
+        print(f"📊 {name:>18}: {result['audio_s']:>6}s audio, {result['speech_s']:>6}s speech in "
+              f"{result['chunks']} chunks (VAD {result['vad_ms']}ms) | "
+              f"{result['whole_s_per_audio_min']}s -> {result['vad_s_per_audio_min']}s per audio-minute")
+
+    print(json.dumps({"model": args.model, "device": manager.device, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
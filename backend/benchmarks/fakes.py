@@ -0,0 +1,243 @@
+"""
+Local stand-ins for every external service DayMind calls
+
+- LLM: OpenAI-compatible chat completions (Groq and OpenAI) and the
+  Anthropic messages API, both with and without streaming; time to the
+  first token can grow with prompt size (llm_ms_per_prompt_token)
+- TTS: ElevenLabs text-to-speech
+- Whisper: the whisper_server.py /transcribe and /health API, so /voice
+  works without loading a model (WHISPER_SERVER_URL)
+
+Latency is configurable per service. LLM replies are drawn from the
+recorded replies in task_corpus.json with a seeded RNG, so task extraction
+runs on realistic text and runs are reproducible.
+
+Run them on their own to point a manually started app at them:
+    python benchmarks/fakes.py --llm-first-token-ms 300 --tokens-per-s 80
+"""
+import os
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+FALLBACK_REPLY = "Sounds like a good plan. Take a short break between blocks and drink some water."
+TRANSCRIPTS = [
+    "Plan my morning, I have a report to write and two meetings",
+    "Help me organize the afternoon around the dentist appointment",
+    "What should I focus on today",
+    "I need to prepare slides for Friday and reply to emails",
+]
+
+
+class FakeConfig:
+    def __init__(self, llm_first_token_ms=300, tokens_per_s=80, llm_error_rate=0.0,
+                 tts_base_ms=150, tts_ms_per_char=2, tts_bytes_per_char=500,
+                 whisper_base_ms=100, whisper_ms_per_audio_s=50, llm_ms_per_prompt_token=0.0, seed=0):
+        self.llm_first_token_ms = llm_first_token_ms
+        # Prefill cost: longer prompts take longer to the first token
+        self.llm_ms_per_prompt_token = llm_ms_per_prompt_token
+        self.tokens_per_s = tokens_per_s
+        self.llm_error_rate = llm_error_rate
+        self.tts_base_ms = tts_base_ms
+        self.tts_ms_per_char = tts_ms_per_char
+        self.tts_bytes_per_char = tts_bytes_per_char
+        self.whisper_base_ms = whisper_base_ms
+        self.whisper_ms_per_audio_s = whisper_ms_per_audio_s
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+def load_replies():
+    try:
+        with open(os.path.join(BENCH_DIR, "task_corpus.json"), encoding="utf-8") as f:
+            return [entry["reply"] for entry in json.load(f)]
+    except OSError:
+        return [FALLBACK_REPLY]
+
+
+class FakeServices:
+    """One threaded HTTP server answering as LLM, TTS and Whisper"""
+
+    def __init__(self, config=None):
+        self.config = config or FakeConfig()
+        self.replies = load_replies()
+        self.rng = random.Random(self.config.seed)
+        self.rng_lock = threading.Lock()
+        self.calls = {"llm": 0, "llm_stream": 0, "tts": 0, "whisper": 0, "errors": 0}
+        self.server = None
+
+    def _pick(self, options):
+        with self.rng_lock:
+            return self.rng.choice(options)
+
+    def _fail(self):
+        if not self.config.llm_error_rate:
+            return False
+        with self.rng_lock:
+            return self.rng.random() < self.config.llm_error_rate
+
+    def start(self, host="127.0.0.1", port=0):
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _body(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+
+            def _send(self, status, body, content_type="application/json"):
+                if isinstance(body, (dict, list)):
+                    body = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == "/health":
+                    self._send(200, {"status": "ok", "whisper": {"state": "ready", "model": "fake"}})
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def do_POST(self):
+                if self.path.endswith("/chat/completions"):
+                    services.handle_llm(self, json.loads(self._body()), anthropic=False)
+                elif self.path.endswith("/messages"):
+                    services.handle_llm(self, json.loads(self._body()), anthropic=True)
+                elif "/text-to-speech/" in self.path:
+                    services.handle_tts(self, json.loads(self._body()))
+                elif self.path == "/transcribe":
+                    services.handle_whisper(self, self._body())
+                else:
+                    self._send(404, {"error": "not found"})
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="fake-services", daemon=True).start()
+        return self
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def env(self):
+        """Environment that points the app at these fakes"""
+        return {
+            "AI_PROVIDER": "groq",
+            "GROQ_API_KEY": "fake",
+            "GROQ_API_URL": f"{self.url}/openai/v1/chat/completions",
+            "ANTHROPIC_API_URL": f"{self.url}/v1/messages",
+            "OPENAI_API_URL": f"{self.url}/v1/chat/completions",
+            "ELEVENLABS_API_KEY": "fake",
+            "ELEVENLABS_API_URL": self.url,
+            "WHISPER_SERVER_URL": self.url,
+        }
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+    # Handlers
+
+    def handle_llm(self, handler, payload, anthropic):
+        config = self.config
+        if self._fail():
+            self.calls["errors"] += 1
+            handler._send(500, {"error": "fake provider error"})
+            return
+        reply = self._pick(self.replies)
+        prompt_chars = len(json.dumps(payload.get("messages", []))) + len(payload.get("system", ""))
+        prefill_ms = config.llm_ms_per_prompt_token * prompt_chars / 4
+        time.sleep((config.llm_first_token_ms + prefill_ms) / 1000)
+
+        if not payload.get("stream"):
+            self.calls["llm"] += 1
+            # The rest of the reply takes as long as streaming it would
+            time.sleep(len(reply.split()) / config.tokens_per_s)
+            if anthropic:
+                handler._send(200, {"content": [{"type": "text", "text": reply}]})
+            else:
+                handler._send(200, {"choices": [{"message": {"role": "assistant", "content": reply}}]})
+            return
+
+        self.calls["llm_stream"] += 1
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+
+        def send(data):
+            chunk = f"data: {data}\n\n".encode()
+            handler.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            handler.wfile.flush()
+
+        words = [w + " " for w in reply.split(" ")]
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(1 / config.tokens_per_s)
+            if anthropic:
+                send(json.dumps({"type": "content_block_delta", "delta": {"type": "text_delta", "text": word}}))
+            else:
+                send(json.dumps({"choices": [{"delta": {"content": word}}]}))
+        send(json.dumps({"type": "message_stop"}) if anthropic else "[DONE]")
+        handler.wfile.write(b"0\r\n\r\n")
+
+    def handle_tts(self, handler, payload):
+        self.calls["tts"] += 1
+        text = payload.get("text", "")
+        config = self.config
+        time.sleep((config.tts_base_ms + config.tts_ms_per_char * len(text)) / 1000)
+        # An MP3-ish payload sized like real speech for this text
+        audio = b"ID3" + os.urandom(min(len(text) * config.tts_bytes_per_char, 2_000_000))
+        handler._send(200, audio, "audio/mpeg")
+
+    def handle_whisper(self, handler, body):
+        self.calls["whisper"] += 1
+        # 16 kHz 16-bit mono: ~32 KB per second of audio
+        audio_seconds = len(body) / 32000
+        config = self.config
+        time.sleep((config.whisper_base_ms + config.whisper_ms_per_audio_s * audio_seconds) / 1000)
+        handler._send(200, {"text": self._pick(TRANSCRIPTS), "language": "en"})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--llm-first-token-ms", type=float, default=300)
+    parser.add_argument("--tokens-per-s", type=float, default=80)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--tts-base-ms", type=float, default=150)
+    parser.add_argument("--whisper-base-ms", type=float, default=100)
+    args = parser.parse_args()
+
+    config = FakeConfig(
+        llm_first_token_ms=args.llm_first_token_ms, tokens_per_s=args.tokens_per_s,
+        llm_error_rate=args.llm_error_rate, tts_base_ms=args.tts_base_ms,
+        whisper_base_ms=args.whisper_base_ms
+    )
+    services = FakeServices(config).start(port=args.port)
+    print(f"🧪 Fake LLM/TTS/Whisper on {services.url}; start the app with:")
+    for key, value in services.env().items():
+        print(f"   export {key}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        services.stop()
+
+
+if __name__ == "__main__":
+    main()
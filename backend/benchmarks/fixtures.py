@@ -0,0 +1,218 @@
+"""
+Seeded benchmark fixtures: synthetic audio and data sets
+
+- speech_like(seconds): 16 kHz float32 clip of voiced "syllables" (a
+  harmonic tone with a 4 Hz envelope) separated by pauses, over low noise.
+  Same seed, same samples. There are no words in it; it is meant for
+  decode/VAD/upload costs, and /voice benchmarks use the fake Whisper.
+- AUDIO_FIXTURES: named clips (short command, long rambling note, note
+  with long pauses, silence)
+- seed_database(path, size): a SQLite store with `size` tasks and journal
+  entries (plus a short conversation memory). Databases are cached in
+  DAYMIND_BENCH_CACHE (default ~/.cache/daymind-bench) per size and seed,
+  because building the 1M one takes a while.
+
+    python benchmarks/fixtures.py --size 100k      # build (or reuse) a data set
+    python benchmarks/fixtures.py --audio-dir clips # write the audio fixtures as WAV
+"""
+import os
+import sys
+import time
+import shutil
+import random
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from audio import SAMPLE_RATE, encode_wav
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+CACHE_DIR = os.getenv("DAYMIND_BENCH_CACHE", os.path.expanduser("~/.cache/daymind-bench"))
+
+# Bump when the generators change, so cached databases are rebuilt
+DATA_VERSION = 1
+
+WORDS = """
+work meeting project deadline team coffee walk park run gym sleep tired
+happy anxious calm family friend dinner lunch breakfast book read write
+code bug release plan focus music rain sun morning evening weekend travel
+train bus call email garden cook bake movie podcast yoga stretch doctor
+""".split()
+MOODS = ["amazing", "good", "neutral", "stressed", "sad"]
+TASK_VERBS = ["Write", "Review", "Plan", "Call", "Prepare", "Clean", "Book", "Finish", "Read", "Email"]
+
+
+# Audio
+
+def speech_like(seconds, seed=0, sample_rate=SAMPLE_RATE):
+    """Voiced segments and pauses over a low noise floor, like a spoken note"""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sample_rate)
+    samples = 0.003 * rng.standard_normal(n)
+    t = 0
+    while t < n:
+        voiced = int(rng.uniform(0.3, 1.5) * sample_rate)
+        end = min(n, t + voiced)
+        time_axis = np.arange(end - t) / sample_rate
+        pitch = rng.uniform(100, 250)
+        tone = sum(np.sin(2 * np.pi * pitch * k * time_axis) / k for k in range(1, 6))
+        envelope = 0.5 * (1 - np.cos(2 * np.pi * 4 * time_axis)) * 0.2
+        samples[t:end] += tone * envelope
+        t = end + int(rng.uniform(0.1, 0.8) * sample_rate)
+    return np.clip(samples, -1, 1).astype(np.float32)
+
+
+def silence(seconds, seed=0, sample_rate=SAMPLE_RATE):
+    rng = np.random.default_rng(seed)
+    return (0.003 * rng.standard_normal(int(seconds * sample_rate))).astype(np.float32)
+
+
+def padded(clip, lead_seconds, tail_seconds, seed=0, sample_rate=SAMPLE_RATE):
+    """A clip with silence before and after, like a hold-to-record button"""
+    return np.concatenate([
+        silence(lead_seconds, seed, sample_rate), clip, silence(tail_seconds, seed + 1, sample_rate)
+    ])
+
+
+def with_pauses(seconds, pause_seconds=(3, 8), seed=0, sample_rate=SAMPLE_RATE):
+    """Bursts of speech separated by long pauses, like thinking out loud"""
+    rng = np.random.default_rng(seed)
+    parts, total = [], 0
+    while total < seconds:
+        speech = speech_like(rng.uniform(2, 6), seed=seed + len(parts), sample_rate=sample_rate)
+        pause = silence(rng.uniform(*pause_seconds), seed=seed + len(parts) + 1, sample_rate=sample_rate)
+        parts += [speech, pause]
+        total += (len(speech) + len(pause)) / sample_rate
+    return np.concatenate(parts)[:int(seconds * sample_rate)]
+
+
+AUDIO_FIXTURES = {
+    "command_3s": lambda: speech_like(3, seed=1),
+    "note_30s": lambda: speech_like(30, seed=2),
+    "padded_command": lambda: padded(speech_like(3, seed=3), 1.5, 2.5, seed=3),
+    "silence_5s": lambda: silence(5, seed=4),
+    "paused_note_60s": lambda: with_pauses(60, seed=5),
+}
+
+
+def audio_fixture(name):
+    """WAV bytes of a named fixture"""
+    return encode_wav(AUDIO_FIXTURES[name]())
+
+
+# Data sets
+
+def generate_tasks(n, seed=0):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, 8)
+    for i in range(n):
+        hour = 7 + rng.randint(0, 11)
+        title = f"{rng.choice(TASK_VERBS)} {' '.join(rng.sample(WORDS, 3))} #{i}"
+        yield {
+            "task": f"{hour}:00 - {hour + 1}:00: {title}",
+            "title": title,
+            "created": (start + timedelta(minutes=i)).isoformat(),
+            "completed": rng.random() < 0.6,
+        }
+
+
+def generate_journal(n, seed=0):
+    rng = random.Random(seed + 1)
+    start = datetime(2024, 1, 1, 21)
+    # Spread entries over up to three years, several per day at large sizes
+    step = max(1, int(3 * 365 * 24 * 60 / max(n, 1)))
+    for i in range(n):
+        when = start + timedelta(minutes=i * step)
+        words = [rng.choice(WORDS) for _ in range(rng.randint(15, 80))]
+        yield {
+            "entry": " ".join(words),
+            "mood": rng.choice(MOODS),
+            "ai_response": "Thank you for sharing that. It sounds like a full day.",
+            "timestamp": when.isoformat(),
+            "date": when.strftime("%B %d, %Y"),
+        }
+
+
+def generate_conversations(n, seed=0):
+    rng = random.Random(seed + 2)
+    start = datetime(2024, 1, 1, 9)
+    for i in range(n):
+        yield {
+            "user": f"Help me plan {' '.join(rng.sample(WORDS, 4))}",
+            "assistant": "9:00 AM - 10:00 AM: Focus on the most important task first",
+            "timestamp": (start + timedelta(hours=i)).isoformat(),
+        }
+
+
+def _chunks(items, size=10_000):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def build_database(path, n, seed=0):
+    from storage import SQLiteStore
+    store = SQLiteStore(["memory.json", "tasks.json", "journal.json"], path)
+    store.init()
+    for chunk in _chunks(generate_tasks(n, seed)):
+        store.extend("tasks.json", chunk)
+    for chunk in _chunks(generate_journal(n, seed)):
+        store.extend("journal.json", chunk)
+    # The app keeps only the last 50 conversations
+    store.extend("memory.json", list(generate_conversations(50, seed)))
+    # Fold the WAL into the main file so the database is a single file to copy
+    conn = store._conn()
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.close()
+
+
+def seed_database(path, size, seed=0):
+    """Copy a cached data set of `size` ("1k", "100k", "1m" or a number) to path"""
+    n = SIZES.get(str(size).lower()) or int(size)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    cached = os.path.join(CACHE_DIR, f"daymind-v{DATA_VERSION}-{n}-seed{seed}.db")
+    if not os.path.exists(cached):
+        started = time.perf_counter()
+        print(f"🌱 Generating {n} tasks and journal entries (seed {seed})...")
+        building = cached + ".building"
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(building + suffix):
+                os.remove(building + suffix)
+        build_database(building, n, seed)
+        os.replace(building, cached)
+        print(f"🌱 Data set ready in {time.perf_counter() - started:.1f}s: {cached}")
+    shutil.copyfile(cached, path)
+    return n
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", default=None, help="1k, 100k, 1m or a number")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="daymind.db")
+    parser.add_argument("--audio-dir", default=None)
+    args = parser.parse_args()
+
+    if args.size:
+        seed_database(args.out, args.size, args.seed)
+        print(f"✅ {args.out}")
+    if args.audio_dir:
+        os.makedirs(args.audio_dir, exist_ok=True)
+        for name in AUDIO_FIXTURES:
+            path = os.path.join(args.audio_dir, f"{name}.wav")
+            with open(path, "wb") as f:
+                f.write(audio_fixture(name))
+            print(f"✅ {path}")
+
+
+if __name__ == "__main__":
+    main()
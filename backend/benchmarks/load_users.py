@@ -0,0 +1,172 @@
+"""
+Multi-user load test: does throughput scale with cores?
+
+Simulates --users users (1,000 by default), each writing journal entries,
+chatting, listing tasks and searching their journal, against a gunicorn
+server with the fake LLM/TTS services (fakes.py). Each --workers count is
+run twice:
+- shared: every request goes to the default user, i.e. one set of files
+  and locks, as before per-user data
+- per-user: requests carry X-User-Id, so each user has their own sharded
+  store (users.py) and writers don't contend
+
+For every run it reports requests/s, latency percentiles, errors and the
+speed-up over the first --workers count; per-user throughput should grow
+with the worker count up to the number of cores while shared levels off.
+
+Usage (from backend/):
+    python benchmarks/load_users.py --users 1000 --workers 1,2,4,8 --concurrency 64
+    python benchmarks/load_users.py --modes per-user --out users.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fakes import FakeConfig, FakeServices, TRANSCRIPTS
+from fixtures import WORDS, MOODS
+from bench_e2e import free_port, start_server, run_scenario, git_commit
+
+# Share of each request type in the simulated traffic
+MIX = [("journal_entry", 3), ("tasks", 4), ("chat", 2), ("journal_search", 1)]
+
+
+def user_headers(rng, ctx):
+    if ctx["mode"] == "shared":
+        return {}
+    return {"X-User-Id": f"user-{rng.randrange(ctx['users']):05d}"}
+
+
+def scenario_mixed(s, rng, ctx):
+    """One request of the mix, as a random user"""
+    kind = rng.choices([k for k, _ in MIX], weights=[w for _, w in MIX])[0]
+    url, headers = ctx["url"], user_headers(rng, ctx)
+    if kind == "journal_entry":
+        response = s.post(f"{url}/journal/entry", headers=headers, json={
+            "entry": " ".join(rng.choices(WORDS, k=30)), "mood": rng.choice(MOODS)
+        })
+    elif kind == "tasks":
+        response = s.get(f"{url}/tasks", headers=headers, params={"limit": 50})
+    elif kind == "chat":
+        response = s.post(f"{url}/chat", headers=headers, json={"message": rng.choice(TRANSCRIPTS)})
+    else:
+        response = s.post(f"{url}/journal/search", headers=headers,
+                          json={"query": " ".join(rng.sample(WORDS, 2))})
+    return response.status_code == 200, None
+
+
+def wait_for(url, process, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with {process.returncode} (see server.log)")
+        try:
+            if requests.get(f"{url}/health", timeout=5).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("server was not ready in time")
+
+
+def run(mode, workers, args, fakes):
+    workdir = tempfile.mkdtemp(prefix="daymind-users-")
+    port = free_port()
+    env = dict(
+        os.environ, **fakes.env(), PORT=str(port),
+        DATABASE_FILE=os.path.join(workdir, "daymind.db"),
+        MEMORY_INDEX_DIR=os.path.join(workdir, "memory_index"),
+        TTS_CACHE_DIR=os.path.join(workdir, "tts_cache"),
+        JOURNAL_INDEX_FILE=os.path.join(workdir, "journal_index.pkl"),
+        USER_DATA_DIR=os.path.join(workdir, "users"),
+        USER_CACHE_SIZE=str(args.user_cache),
+        STORAGE_BACKEND=args.storage, TRACE_SLOW_MS="0", PYTHONUNBUFFERED="1",
+    )
+    url = f"http://127.0.0.1:{port}"
+    process = start_server("gunicorn", workdir, env, workers, args.threads)
+    try:
+        wait_for(url, process)
+        ctx = {"url": url, "mode": mode, "users": args.users}
+        # Warm-up: every user is opened once before measuring
+        run_scenario(scenario_mixed, ctx, args.concurrency, max(1, args.users // args.concurrency), args.seed + 1)
+        result = run_scenario(scenario_mixed, ctx, args.concurrency, args.requests_per_client, args.seed)
+        result["users_open"] = requests.get(f"{url}/health").json().get("users", {}).get("open")
+        return result
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000, help="simulated users")
+    parser.add_argument("--workers", default=None, help="comma-separated gunicorn worker counts, default 1,2,4.. up to the CPU count")
+    parser.add_argument("--threads", type=int, default=8, help="threads per worker")
+    parser.add_argument("--concurrency", type=int, default=64, help="concurrent clients")
+    parser.add_argument("--requests-per-client", type=int, default=50)
+    parser.add_argument("--modes", default="shared,per-user")
+    parser.add_argument("--storage", choices=["sqlite", "json"], default="sqlite")
+    parser.add_argument("--user-cache", type=int, default=256, help="USER_CACHE_SIZE of the server")
+    parser.add_argument("--llm-first-token-ms", type=float, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="write the JSON results here")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    if args.workers:
+        worker_counts = [int(w) for w in args.workers.split(",")]
+    else:
+        worker_counts = [w for w in (1, 2, 4, 8, 16, 32) if w <= cpus] or [1]
+    modes = args.modes.split(",")
+
+    fake_config = FakeConfig(llm_first_token_ms=args.llm_first_token_ms, tokens_per_s=10_000,
+                             tts_base_ms=0, seed=args.seed)
+    fakes = FakeServices(fake_config).start()
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": vars(args),
+        "fakes": fake_config.to_dict(),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": cpus},
+        "runs": {},
+    }
+    try:
+        for mode in modes:
+            results["runs"][mode] = {}
+            baseline = None
+            for workers in worker_counts:
+                result = run(mode, workers, args, fakes)
+                baseline = baseline or result["rps"]
+                result["speedup"] = round(result["rps"] / baseline, 2) if baseline else None
+                results["runs"][mode][str(workers)] = result
+                print(f"📊 {mode:>8} workers={workers:<3} {result['rps']:>8} req/s  x{result['speedup']:<5} "
+                      f"p50 {result['p50_ms']:>8}ms  p95 {result['p95_ms']:>8}ms  errors {result['errors']}")
+    finally:
+        fakes.stop()
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results written to {args.out}")
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
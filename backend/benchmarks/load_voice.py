@@ -0,0 +1,86 @@
+"""
+/voice load test
+
+Uploads a clip to a running DayMind (or whisper_server.py) at 1, 8 and 32
+concurrent clients and reports p50/p99 latency and clips per second.
+
+Usage (from backend/, with the server running):
+    python benchmarks/load_voice.py --url http://localhost:5000/voice
+    python benchmarks/load_voice.py --url http://localhost:5001/transcribe --audio clip.wav
+"""
+import io
+import json
+import time
+import wave
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+
+def synthetic_wav(seconds=3.0, rate=16000):
+    """A short tone-and-noise clip so the script works without fixtures"""
+    t = np.arange(int(seconds * rate)) / rate
+    signal = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.02 * np.random.randn(len(t))
+    pcm = (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+    buf = io.BytesIO()
+    with wave.open(buf, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+def run_level(url, audio, concurrency, requests_per_client):
+    def client(_):
+        latencies, errors = [], 0
+        session = requests.Session()
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            try:
+                r = session.post(url, files={"audio": ("clip.wav", audio, "audio/wav")}, timeout=300)
+                errors += r.status_code != 200
+            except requests.RequestException:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+        return latencies, errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(client, range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(l for ls, _ in results for l in ls)
+    return {
+        "concurrency": concurrency,
+        "clips": len(latencies),
+        "errors": sum(e for _, e in results),
+        "p50_s": round(statistics.median(latencies), 3),
+        "p99_s": round(latencies[max(0, int(len(latencies) * 0.99) - 1)], 3),
+        "clips_per_s": round(len(latencies) / elapsed, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:5000/voice")
+    parser.add_argument("--audio", help="WAV file to upload (default: synthetic 3s clip)")
+    parser.add_argument("--levels", default="1,8,32")
+    parser.add_argument("--requests", type=int, default=4, help="uploads per client")
+    args = parser.parse_args()
+
+    audio = open(args.audio, 'rb').read() if args.audio else synthetic_wav()
+    results = []
+    for level in [int(x) for x in args.levels.split(",")]:
+        result = run_level(args.url, audio, level, args.requests)
+        results.append(result)
+        print(f"📊 {level:>3} concurrent: p50={result['p50_s']}s p99={result['p99_s']}s "
+              f"{result['clips_per_s']} clips/s ({result['errors']} errors)")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
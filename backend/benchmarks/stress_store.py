@@ -0,0 +1,97 @@
+"""
+Storage stress test
+
+Hammers /tasks/complete and /journal/entry from many threads (and optionally
+several processes) through the Flask test client, then checks that no write
+was lost: every seeded task is completed and every journal entry is present
+with a unique id. AI and TTS calls are replaced with instant stand-ins.
+
+Usage (from backend/):
+    python benchmarks/stress_store.py --threads 32 --requests 500
+    python benchmarks/stress_store.py --backend json --processes 4
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def load_app(workdir, backend):
+    os.chdir(workdir)
+    os.environ["STORAGE_BACKEND"] = backend
+    os.environ["DATABASE_FILE"] = os.path.join(workdir, "daymind.db")
+    import app
+    app.create_app()
+    app.get_ai_response = lambda *args, **kwargs: "Thanks for sharing."
+    app.text_to_speech = lambda *args, **kwargs: None
+    return app
+
+
+def hammer(workdir, backend, indexes, threads):
+    """Complete the given task indexes and write one journal entry per index"""
+    app = load_app(workdir, backend)
+    client = app.create_app().test_client()
+
+    def work(i):
+        errors = 0
+        r = client.post("/tasks/complete", json={"index": i})
+        errors += r.status_code != 200
+        r = client.post("/journal/entry", json={"entry": f"stress entry {i}", "mood": "good"})
+        errors += r.status_code != 200
+        return errors
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return sum(pool.map(work, indexes))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=["sqlite", "json"], default="sqlite")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="daymind-stress-")
+    app = load_app(workdir, args.backend)
+    app.save_json(app.TASKS_FILE, {"tasks": [
+        {"task": f"Seeded task {i}", "created": "2025-01-01T09:00:00", "completed": False}
+        for i in range(args.requests)
+    ]})
+
+    chunks = [list(range(p, args.requests, args.processes)) for p in range(args.processes)]
+    start = time.perf_counter()
+    if args.processes == 1:
+        errors = hammer(workdir, args.backend, chunks[0], args.threads)
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(args.processes) as pool:
+            errors = sum(pool.starmap(
+                hammer, [(workdir, args.backend, chunk, args.threads) for chunk in chunks]
+            ))
+    elapsed = time.perf_counter() - start
+
+    tasks = app.load_json(app.TASKS_FILE)["tasks"]
+    entries = app.load_json(app.JOURNAL_FILE)["entries"]
+    incomplete = sum(1 for t in tasks if not t["completed"])
+    ids = [e["id"] for e in entries]
+
+    print(f"⏱️ {args.requests * 2} requests in {elapsed:.2f}s "
+          f"({args.processes} process(es) x {args.threads} threads, {args.backend})")
+    print(f"📋 Tasks: {len(tasks)} total, {incomplete} not completed")
+    print(f"📝 Journal: {len(entries)}/{args.requests} entries, {len(set(ids))} unique ids")
+
+    ok = (errors == 0 and incomplete == 0 and len(entries) == args.requests
+          and len(set(ids)) == len(ids))
+    print("✅ No lost writes" if ok else f"❌ Lost writes detected ({errors} request errors)")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+In-process publish/subscribe for pushing updates to clients
+
+Routes publish small events (task added, journal entry created, audio
+ready...) and GET /events streams them to every connected client as
+server-sent events, so clients no longer poll for changes.
+
+EventBus only reaches clients connected to the same process. It is the
+single place events go through, so it can be swapped for a local broker
+(e.g. Redis pub/sub) when running several workers.
+
+Environment:
+- EVENTS_BACKLOG: recent events kept for clients that reconnect, default 256
+- EVENTS_HEARTBEAT: seconds between keep-alive comments, default 15
+"""
+import os
+import queue
+import threading
+from collections import deque
+
+EVENTS_BACKLOG = int(os.getenv("EVENTS_BACKLOG", "256"))
+EVENTS_HEARTBEAT = float(os.getenv("EVENTS_HEARTBEAT", "15"))
+
+# Events buffered per client before it is considered too slow
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class Subscription:
+    def __init__(self, bus):
+        self.bus = bus
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        # Set when events had to be dropped; the client should reload
+        self.lagged = False
+
+    def get(self, timeout=EVENTS_HEARTBEAT):
+        """Next (id, event, data), or None after timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """Fan-out of (id, event, data) to subscribers, with a short replay backlog"""
+
+    def __init__(self, backlog=EVENTS_BACKLOG):
+        self._last_id = 0
+        self._backlog = deque(maxlen=backlog)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def publish(self, event, data):
+        with self._lock:
+            self._last_id += 1
+            message = (self._last_id, event, data)
+            self._backlog.append(message)
+            self.published += 1
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(message)
+            except queue.Full:
+                subscription.lagged = True
+
+    def subscribe(self, last_event_id=None):
+        """
+        New subscription. With the Last-Event-ID of a reconnecting client,
+        events it missed are replayed; if they have already left the
+        backlog the subscription starts lagged.
+        """
+        subscription = Subscription(self)
+        with self._lock:
+            if last_event_id is not None:
+                oldest = self._backlog[0][0] if self._backlog else self._last_id + 1
+                # Missed events that are gone, or ids from before a restart
+                if last_event_id + 1 < oldest or last_event_id > self._last_id:
+                    subscription.lagged = True
+                missed = [m for m in self._backlog if m[0] > last_event_id]
+                for message in missed[-SUBSCRIBER_QUEUE_SIZE:]:
+                    subscription.queue.put_nowait(message)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def status(self):
+        return {"subscribers": len(self._subscribers), "published": self.published}
+
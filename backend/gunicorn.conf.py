@@ -0,0 +1,50 @@
+"""
+gunicorn settings for production
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+The app is loaded once in the master and forked into WEB_CONCURRENCY
+worker processes with GUNICORN_THREADS threads each (gthread workers).
+Every open /events stream holds one thread, so leave room for them.
+
+Graceful reload: `kill -HUP <master>` starts new workers and lets the
+old ones finish their requests (up to graceful_timeout). Because the app
+is preloaded, HUP keeps the code the master loaded; to deploy new code,
+send USR2 (starts a new master alongside) and then TERM the old master.
+
+Environment:
+- BIND: address to listen on, default 0.0.0.0:$PORT (PORT defaults to 5000)
+- WEB_CONCURRENCY: worker processes, default 2
+- GUNICORN_THREADS: threads per worker, default 8
+- GUNICORN_TIMEOUT: seconds before a stuck worker is restarted, default 120
+- GUNICORN_GRACEFUL_TIMEOUT: seconds workers get to finish on reload/stop, default 30
+- GUNICORN_MAX_REQUESTS: recycle a worker after this many requests, default 0 (never)
+"""
+import os
+
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '5000')}")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+worker_class = "gthread"
+
+# Build indexes and load models before forking (see wsgi.py)
+preload_app = True
+
+# /voice and non-streaming /chat wait on Whisper and the LLM
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+
+# Tokenizers used by sentence-transformers don't survive fork with their thread pool on
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+
+def worker_exit(server, worker):
+    """Finish queued background jobs (TTS, task extraction) and save indexes before the worker goes away"""
+    import app
+    app.shutdown()
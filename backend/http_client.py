@@ -0,0 +1,87 @@
+"""
+Shared outbound HTTP client for Groq, Anthropic, OpenAI and ElevenLabs
+
+- keep-alive connection pools per host, so calls reuse TCP/TLS connections
+- connect/read timeouts on every call (LLM calls used to have none)
+- retries with jittered exponential backoff on connection errors, 429 and 5xx,
+  honouring Retry-After
+
+Environment:
+- HTTP_CONNECT_TIMEOUT: seconds, default 5
+- HTTP_READ_TIMEOUT: seconds, default 60
+- HTTP_RETRIES: extra attempts after the first, default 2
+- HTTP_POOL_SIZE: connections kept per host, default 10
+"""
+import os
+import time
+import random
+
+import requests
+from requests.adapters import HTTPAdapter
+
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "60"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def backoff_delay(attempt, retry_after=None, base=0.5, cap=8.0):
+    """Full-jitter exponential backoff, or the server's Retry-After if given"""
+    if retry_after:
+        try:
+            return min(float(retry_after), cap)
+        except ValueError:
+            pass
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class HTTPClient:
+    """requests.Session with per-host keep-alive pools, timeouts and retries"""
+
+    def __init__(self, connect_timeout=HTTP_CONNECT_TIMEOUT, read_timeout=HTTP_READ_TIMEOUT,
+                 retries=HTTP_RETRIES, pool_size=HTTP_POOL_SIZE):
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.pool_size = pool_size
+        self.session = self._new_session()
+
+    def _new_session(self):
+        self._pid = os.getpid()
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=self.pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def request(self, method, url, **kwargs):
+        # A forked worker must not share the parent's pooled sockets
+        if self._pid != os.getpid():
+            self.session = self._new_session()
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.retries:
+                    raise
+                time.sleep(backoff_delay(attempt))
+                attempt += 1
+                continue
+            if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                delay = backoff_delay(attempt, response.headers.get("Retry-After"))
+                response.close()
+                print(f"🔁 {response.status_code} from {url}, retrying in {delay:.1f}s...")
+                time.sleep(delay)
+                attempt += 1
+                continue
+            return response
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
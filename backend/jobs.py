@@ -0,0 +1,202 @@
+"""
+Background job queue
+
+Work that doesn't have to finish before a response is sent (TTS of a
+reply, task extraction, memory and index writes) is submitted here and
+run by a small pool of worker threads. Jobs have ids that can be looked
+up while they're queued and for a while after they finish; failures are
+retried with exponential backoff. A job runs in a copy of the submitter's
+context variables, so it works on the data of the user whose request
+queued it (see users.py).
+
+The queue is bounded: submit() raises JobQueueFull instead of letting
+work pile up. On shutdown, queued jobs are drained for up to
+JOB_SHUTDOWN_TIMEOUT seconds.
+
+Environment:
+- JOB_WORKERS: worker threads, default 4
+- JOB_QUEUE_SIZE: queued jobs before submit() is rejected, default 256
+- JOB_RETRIES: extra attempts after a failure, default 2
+- JOB_SHUTDOWN_TIMEOUT: seconds to drain queued jobs at exit, default 10
+"""
+import os
+import time
+import uuid
+import queue
+import threading
+import contextvars
+from collections import OrderedDict
+
+from metrics import end_trace
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "256"))
+JOB_RETRIES = int(os.getenv("JOB_RETRIES", "2"))
+JOB_SHUTDOWN_TIMEOUT = float(os.getenv("JOB_SHUTDOWN_TIMEOUT", "10"))
+
+# First retry waits this long, then doubles
+RETRY_BACKOFF = 0.5
+
+# Jobs remembered for status lookups (oldest forgotten first)
+JOB_HISTORY = 1000
+
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are already waiting"""
+
+
+class Job:
+    def __init__(self, kind, fn, args, kwargs, retries, on_done):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.retries = retries
+        self.on_done = on_done
+        self.state = "queued"   # queued -> running -> done | failed
+        self.attempts = 0
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self._finished = threading.Event()
+        self.context = contextvars.copy_context()
+
+    def wait(self, timeout=None):
+        """Block until the job has finished; returns False on timeout"""
+        return self._finished.wait(timeout)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "state": self.state,
+            "attempts": self.attempts,
+            "result": self.result,
+            "error": self.error,
+            "created": self.created,
+            "finished": self.finished,
+        }
+
+
+class JobQueue:
+    """Bounded queue of jobs run by a pool of worker threads"""
+
+    def __init__(self, workers=JOB_WORKERS, queue_size=JOB_QUEUE_SIZE, retries=JOB_RETRIES):
+        self.workers = workers
+        self.retries = retries
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.jobs = OrderedDict()
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.rejected = 0
+        self.running = 0
+        self._threads = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _ensure_workers(self):
+        # Started on first use, so a forking server starts them in each worker process
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            for i in range(len(self._threads), self.workers):
+                thread = threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, kind, fn, *args, retries=None, on_done=None, **kwargs):
+        """
+        Queue fn(*args, **kwargs). on_done(job) is called from the worker
+        once the job has finished, successfully or not.
+        """
+        if self._closed:
+            raise JobQueueFull("job queue is shutting down")
+        self._ensure_workers()
+        job = Job(kind, fn, args, kwargs, self.retries if retries is None else retries, on_done)
+        try:
+            self.queue.put_nowait(job)
+        except queue.Full:
+            self.rejected += 1
+            raise JobQueueFull(f"{self.queue.maxsize} jobs already waiting")
+        with self._lock:
+            self.jobs[job.id] = job
+            while len(self.jobs) > JOB_HISTORY:
+                self.jobs.popitem(last=False)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            with self._lock:
+                self.running += 1
+            try:
+                job.context.run(self._execute, job)
+            finally:
+                with self._lock:
+                    self.running -= 1
+
+    def _execute(self, job):
+        # The request's trace has been reported by now; job stages aren't part of it
+        end_trace()
+        job.state = "running"
+        while True:
+            job.attempts += 1
+            try:
+                job.result = job.fn(*job.args, **job.kwargs)
+                job.state = "done"
+                job.error = None
+                self.completed += 1
+                break
+            except Exception as e:
+                job.error = str(e)
+                if job.attempts > job.retries or self._closed:
+                    job.state = "failed"
+                    self.failed += 1
+                    print(f"❌ Job {job.kind} {job.id[:8]} failed after {job.attempts} attempts: {e}")
+                    break
+                self.retried += 1
+                time.sleep(RETRY_BACKOFF * 2 ** (job.attempts - 1))
+        job.finished = time.time()
+        job._finished.set()
+        if job.on_done:
+            try:
+                job.on_done(job)
+            except Exception as e:
+                print(f"⚠️ Job {job.kind} callback failed: {e}")
+
+    def shutdown(self, timeout=JOB_SHUTDOWN_TIMEOUT):
+        """Stop accepting jobs and let the workers drain the queue for up to timeout seconds"""
+        self._closed = True
+        deadline = time.monotonic() + timeout
+        threads = list(self._threads)
+        try:
+            for _ in threads:
+                # Behind the queued jobs, so those still run
+                self.queue.put(None, timeout=max(0, deadline - time.monotonic()))
+        except queue.Full:
+            pass
+        for thread in threads:
+            thread.join(max(0, deadline - time.monotonic()))
+        left = sum(1 for job in list(self.queue.queue) if job is not None)
+        if left:
+            print(f"⚠️ {left} background jobs dropped at shutdown")
+
+    def status(self):
+        return {
+            "workers": self.workers,
+            "queued": self.queue.qsize(),
+            "max_queue": self.queue.maxsize,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "rejected": self.rejected,
+        }
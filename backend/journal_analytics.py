@@ -0,0 +1,147 @@
+"""
+Precomputed journal analytics
+
+Per-day rollups (entry count, mood histogram, latest excerpts) are kept up
+to date incrementally as entries are appended, so stats for any date range
+are assembled from at most one rollup per day instead of rescanning and
+re-parsing the whole journal. AI summaries are cached per (range, entries
+in range) and only regenerated when new entries arrive.
+"""
+import hashlib
+import threading
+from datetime import date, timedelta
+from collections import Counter, OrderedDict, deque
+
+# Excerpts kept per day for the summary prompt
+EXCERPTS_PER_DAY = 5
+EXCERPT_CHARS = 100
+
+# Summaries kept in memory (one per range/entry-set)
+SUMMARY_CACHE_SIZE = 64
+
+
+class DayRollup:
+    __slots__ = ("count", "moods", "excerpts", "last_timestamp")
+
+    def __init__(self):
+        self.count = 0
+        self.moods = Counter()
+        self.excerpts = deque(maxlen=EXCERPTS_PER_DAY)
+        self.last_timestamp = ""
+
+
+class JournalAnalytics:
+    """Per-day journal rollups, caught up from the store like JournalIndex"""
+
+    def __init__(self, store, journal_file):
+        self.store = store
+        self.journal_file = journal_file
+        self.days = {}          # "YYYY-MM-DD" -> DayRollup
+        self.indexed = 0        # journal entries folded into the rollups
+        self.summaries = OrderedDict()
+        self.summary_hits = 0
+        self.summary_misses = 0
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Fold in entries appended since the last call; rebuild if the journal shrank"""
+        with self._lock:
+            count = self.store.count(self.journal_file)
+            if count < self.indexed:
+                self.days = {}
+                self.indexed = 0
+            if count > self.indexed:
+                for entry in self.store.items_from(self.journal_file, self.indexed):
+                    self._add(entry)
+                    self.indexed += 1
+
+    def _add(self, entry):
+        timestamp = entry.get("timestamp") or ""
+        day = timestamp[:10]
+        if len(day) != 10:
+            return
+        rollup = self.days.get(day)
+        if rollup is None:
+            rollup = self.days[day] = DayRollup()
+        rollup.count += 1
+        rollup.moods[entry.get("mood") or "neutral"] += 1
+        rollup.excerpts.append(entry.get("entry", "")[:EXCERPT_CHARS])
+        rollup.last_timestamp = max(rollup.last_timestamp, timestamp)
+
+    def stats(self, start, end):
+        """
+        Stats for the inclusive date range [start, end], plus a fingerprint
+        that changes whenever an entry in the range is added
+        """
+        self.refresh()
+        moods = Counter()
+        total = 0
+        days_journaled = 0
+        excerpts = []
+        fingerprint = hashlib.sha256()
+        with self._lock:
+            first, last = start.isoformat(), end.isoformat()
+            # Walk whichever is shorter: the days in the range or the days journaled
+            if (end - start).days + 1 <= len(self.days):
+                days = [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+            else:
+                days = sorted(d for d in self.days if first <= d <= last)
+            for day in days:
+                rollup = self.days.get(day)
+                if rollup is None:
+                    continue
+                total += rollup.count
+                days_journaled += 1
+                moods.update(rollup.moods)
+                excerpts.extend(rollup.excerpts)
+                fingerprint.update(f"{day}:{rollup.count}:{rollup.last_timestamp};".encode())
+        return {
+            "total_entries": total,
+            "most_common_mood": moods.most_common(1)[0][0] if moods else "neutral",
+            "days_journaled": days_journaled,
+            "mood_counts": dict(moods),
+        }, excerpts[-EXCERPTS_PER_DAY:], fingerprint.hexdigest()
+
+    def cached_summary(self, start, end, fingerprint, generate):
+        """Return the summary for this range and entry set, calling generate() on a miss"""
+        key = (start.isoformat(), end.isoformat(), fingerprint)
+        with self._lock:
+            if key in self.summaries:
+                self.summaries.move_to_end(key)
+                self.summary_hits += 1
+                return self.summaries[key]
+            self.summary_misses += 1
+        summary = generate()
+        with self._lock:
+            self.summaries[key] = summary
+            while len(self.summaries) > SUMMARY_CACHE_SIZE:
+                self.summaries.popitem(last=False)
+        return summary
+
+    def status(self):
+        return {
+            "entries": self.indexed,
+            "days": len(self.days),
+            "summary_hits": self.summary_hits,
+            "summary_misses": self.summary_misses,
+        }
+
+
+def parse_range(days=None, start=None, end=None, today=None):
+    """
+    Resolve ?days=N or ?from=YYYY-MM-DD&to=YYYY-MM-DD into (start, end) dates.
+    Raises ValueError on bad input.
+    """
+    today = today or date.today()
+    if start or end:
+        if not start:
+            raise ValueError("'from' is required when 'to' is given")
+        start_date = date.fromisoformat(start)
+        end_date = date.fromisoformat(end) if end else today
+        if start_date > end_date:
+            raise ValueError("'from' must not be after 'to'")
+        return start_date, end_date
+    days = int(days) if days else 7
+    if not 1 <= days <= 3660:
+        raise ValueError("days must be between 1 and 3660")
+    return today - timedelta(days=days - 1), today
@@ -0,0 +1,240 @@
+"""
+Full-text search over the journal
+
+An in-process inverted index over each entry's text and its ai_response:
+- tokenized, lowercased terms with BM25 ranking
+- prefix matching, so "run" finds "running" and "runs"
+- mood and date-range filters, limit/cursor pagination
+- kept up to date incrementally: new entries are indexed as they are
+  appended, and entries written by other workers are picked up on the
+  next query
+- snapshotted to disk so a restart doesn't re-tokenize the whole journal:
+  every SNAPSHOT_EVERY new entries, and by save() when the user's data is
+  closed or the process exits
+
+Environment:
+- JOURNAL_INDEX_FILE: snapshot path, default "journal_index.pkl" (empty disables it)
+"""
+import os
+import re
+import heapq
+import math
+import pickle
+import bisect
+import tempfile
+import threading
+from collections import Counter
+
+JOURNAL_INDEX_FILE = os.getenv("JOURNAL_INDEX_FILE", "journal_index.pkl")
+
+# Bump when the snapshot layout or tokenizer changes
+INDEX_VERSION = 1
+
+# Snapshot after this many newly indexed entries
+SNAPSHOT_EVERY = 1000
+
+# A short prefix like "a" shouldn't expand to the whole vocabulary
+MAX_PREFIX_EXPANSIONS = 50
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from had has have i i'm if in is it it's
+me my of on or so that the this to was we were with you your
+""".split())
+
+
+def tokenize(text):
+    """Lowercased word tokens without stopwords"""
+    return [t for t in TOKEN.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+def entry_date(entry):
+    """YYYY-MM-DD of an entry's timestamp ('' if it has none)"""
+    return (entry.get("timestamp") or "")[:10]
+
+
+class JournalIndex:
+    """Inverted index of journal entries, addressed by their position in the journal"""
+
+    def __init__(self, store, journal_file, snapshot_path=JOURNAL_INDEX_FILE):
+        self.store = store
+        self.journal_file = journal_file
+        self.snapshot_path = snapshot_path
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._reset()
+
+    def _reset(self):
+        self.entries = []
+        self.postings = {}      # term -> {position: term frequency}
+        self.doc_lengths = []
+        self.total_length = 0
+        self.vocabulary = []    # sorted terms, for prefix lookups
+        self._unsaved = 0
+
+    # Building
+
+    def _add(self, entry):
+        position = len(self.entries)
+        tokens = tokenize(entry.get("entry")) + tokenize(entry.get("ai_response"))
+        for term, tf in Counter(tokens).items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                bisect.insort(self.vocabulary, term)
+            postings[position] = tf
+        self.entries.append(entry)
+        self.doc_lengths.append(len(tokens))
+        self.total_length += len(tokens)
+        self._unsaved += 1
+
+    def refresh(self):
+        """Index entries appended since the last call; rebuild if the journal shrank"""
+        with self._lock:
+            if not self._loaded:
+                self._load_snapshot()
+                self._loaded = True
+            count = self.store.count(self.journal_file)
+            if count < len(self.entries):
+                print("🔎 Journal changed underneath the search index, rebuilding...")
+                self._reset()
+            if count > len(self.entries):
+                for entry in self.store.items_from(self.journal_file, len(self.entries)):
+                    self._add(entry)
+            if self._unsaved >= SNAPSHOT_EVERY:
+                self._save_snapshot()
+
+    def save(self):
+        """Write the snapshot if entries were indexed since the last one"""
+        with self._lock:
+            if self._unsaved:
+                self._save_snapshot()
+
+    def _load_snapshot(self):
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                snapshot = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+            print(f"⚠️ Could not read search index snapshot: {e}")
+            return
+        if snapshot.get("version") != INDEX_VERSION:
+            return
+        entries = snapshot["entries"]
+        # Only trust the snapshot if the journal still starts with the same entries
+        if entries and self.store.get_at(self.journal_file, len(entries) - 1) != entries[-1]:
+            print("🔎 Search index snapshot is stale, rebuilding...")
+            return
+        self.entries = entries
+        self.postings = snapshot["postings"]
+        self.doc_lengths = snapshot["doc_lengths"]
+        self.total_length = sum(self.doc_lengths)
+        self.vocabulary = sorted(self.postings)
+        print(f"🔎 Loaded search index with {len(entries)} journal entries")
+
+    def _save_snapshot(self):
+        self._unsaved = 0
+        if not self.snapshot_path:
+            return
+        snapshot = {
+            "version": INDEX_VERSION,
+            "entries": self.entries,
+            "postings": self.postings,
+            "doc_lengths": self.doc_lengths,
+        }
+        directory = os.path.dirname(os.path.abspath(self.snapshot_path))
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-index-")
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            print(f"⚠️ Could not write search index snapshot: {e}")
+
+    # Querying
+
+    def _expand(self, term):
+        """Indexed terms starting with term (term itself first if present)"""
+        start = bisect.bisect_left(self.vocabulary, term)
+        matches = []
+        for candidate in self.vocabulary[start:]:
+            if not candidate.startswith(term) or len(matches) >= MAX_PREFIX_EXPANSIONS:
+                break
+            matches.append(candidate)
+        return matches
+
+    def _matches_filters(self, position, mood, date_from, date_to):
+        entry = self.entries[position]
+        if mood and (entry.get("mood") or "").lower() != mood:
+            return False
+        if date_from or date_to:
+            day = entry_date(entry)
+            if date_from and day < date_from:
+                return False
+            if date_to and day > date_to:
+                return False
+        return True
+
+    def search(self, query="", mood=None, date_from=None, date_to=None, limit=20, cursor=0):
+        """
+        Return (results, total, next_cursor). Results are entries with a
+        "score", best first; without a query, filtered entries newest first.
+        Dates are YYYY-MM-DD and inclusive.
+        """
+        self.refresh()
+        mood = (mood or "").lower() or None
+        terms = tokenize(query)
+
+        with self._lock:
+            doc_count = len(self.entries)
+            if not terms:
+                positions = [
+                    p for p in range(doc_count - 1, -1, -1)
+                    if self._matches_filters(p, mood, date_from, date_to)
+                ]
+                page = positions[cursor:cursor + limit]
+                results = [dict(self.entries[p]) for p in page]
+                total = len(positions)
+            else:
+                avg_length = self.total_length / doc_count if doc_count else 0
+                base = BM25_K1 * (1 - BM25_B)
+                per_token = BM25_K1 * BM25_B / (avg_length or 1)
+                doc_lengths = self.doc_lengths
+                scores = {}
+                get = scores.get
+                for term in dict.fromkeys(terms):
+                    for indexed in self._expand(term):
+                        postings = self.postings[indexed]
+                        idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                        weight = idf * (BM25_K1 + 1)
+                        for position, tf in postings.items():
+                            scores[position] = get(position, 0.0) + weight * tf / (
+                                tf + base + per_token * doc_lengths[position]
+                            )
+                if mood or date_from or date_to:
+                    scores = {
+                        p: s for p, s in scores.items()
+                        if self._matches_filters(p, mood, date_from, date_to)
+                    }
+                total = len(scores)
+                # Newer entries win ties
+                best = heapq.nlargest(cursor + limit, scores.items(), key=lambda item: (item[1], item[0]))
+                results = []
+                for position, score in best[cursor:]:
+                    result = dict(self.entries[position])
+                    result["score"] = round(score, 3)
+                    results.append(result)
+
+        next_cursor = cursor + limit if cursor + limit < total else None
+        return results, total, next_cursor
+
+    def status(self):
+        return {
+            "entries": len(self.entries),
+            "terms": len(self.postings),
+        }
@@ -0,0 +1,205 @@
+"""
+Lightweight in-process latency metrics
+
+LatencyStats keeps recent samples for /health. Histograms and spans
+below feed GET /metrics (Prometheus text format) and per-request traces.
+Metrics are per process: with several workers, each reports its own.
+"""
+import time
+import functools
+import threading
+import contextlib
+import contextvars
+from collections import deque
+
+
+class LatencyStats:
+    """Keeps the most recent samples and reports count/avg/percentiles"""
+
+    def __init__(self, window=500):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, ms):
+        with self._lock:
+            self.samples.append(ms)
+            self.count += 1
+
+    def percentile(self, p):
+        with self._lock:
+            ordered = sorted(self.samples)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    def summary(self):
+        with self._lock:
+            ordered = sorted(self.samples)
+        if not ordered:
+            return {"count": self.count}
+        return {
+            "count": self.count,
+            "avg_ms": round(sum(ordered) / len(ordered), 1),
+            "p50_ms": round(ordered[len(ordered) // 2], 1),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+        }
+
+
+# Prometheus-style histograms and per-request spans
+#
+# span("tts") times a block into daymind_stage_seconds{stage="tts"} and,
+# inside a traced request, adds it to that request's trace (reported in
+# the Server-Timing header and in the slow-request log).
+
+# Upper bounds in seconds, from store reads to slow LLM calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one label set per series"""
+
+    def __init__(self, name, help_text, label_names, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self.series = {}    # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, *label_values):
+        with self._lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[i] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted(self.series.items())
+        for label_values, values in series:
+            labels = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.label_names, label_values))
+            prefix = f"{labels}," if labels else ""
+            for bound, count in zip(self.buckets, values):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {values[-1]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {values[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {values[-1]}")
+        return "\n".join(lines)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_gauges(gauges):
+    """Prometheus text for {name: (help, value)}; None values are skipped"""
+    lines = []
+    for name, (help_text, value) in gauges.items():
+        if value is None:
+            continue
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"]
+    return "\n".join(lines)
+
+
+stage_seconds = Histogram("daymind_stage_seconds", "Time spent per stage (whisper, LLM, store, TTS...)", ("stage",))
+request_seconds = Histogram("daymind_request_seconds", "HTTP request duration", ("endpoint", "method", "status"))
+
+_trace = contextvars.ContextVar("trace", default=None)
+
+
+class Trace:
+    """Spans recorded while one request is handled"""
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.spans = []     # (stage, seconds)
+        self.notes = {}     # e.g. prompt_tokens
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        """Server-Timing header value: one entry per stage, repeated stages summed"""
+        totals = {}
+        for stage, seconds in self.spans:
+            totals[stage] = totals.get(stage, 0) + seconds
+        entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in totals.items()]
+        entries.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(entries)
+
+    def breakdown(self):
+        parts = [f"{stage}={seconds * 1000:.0f}ms" for stage, seconds in self.spans]
+        return " ".join(parts + [f"{name}={value}" for name, value in self.notes.items()])
+
+
+def start_trace(name):
+    trace = Trace(name)
+    _trace.set(trace)
+    return trace
+
+
+def end_trace():
+    trace = _trace.get()
+    _trace.set(None)
+    return trace
+
+
+def note(name, value):
+    """Attach a value (e.g. prompt_tokens) to the current request's trace, if any"""
+    trace = _trace.get()
+    if trace is not None:
+        trace.notes[name] = value
+
+
+@contextlib.contextmanager
+def span(stage):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        stage_seconds.observe(seconds, stage)
+        trace = _trace.get()
+        if trace is not None:
+            trace.spans.append((stage, seconds))
+
+
+def timed(stage):
+    """Decorator form of span()"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class TracedStore:
+    """Wraps a storage backend so every call is a store_read or store_write span"""
+
+    READS = {"load", "items", "tail", "items_from", "count", "get_at", "get_item", "page", "version", "changes"}
+
+    def __init__(self, store):
+        self._store = store
+
+    def __getattr__(self, name):
+        attr = getattr(self._store, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+        stage = "store_read" if name in self.READS else "store_write"
+
+        @functools.wraps(attr)
+        def call(*args, **kwargs):
+            with span(stage):
+                return attr(*args, **kwargs)
+        # Cached, so later lookups skip __getattr__
+        setattr(self, name, call)
+        return call
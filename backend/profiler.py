@@ -0,0 +1,118 @@
+"""
+Sampling profiler for slow requests
+
+With PROFILE_SLOW_MS set, a background thread samples the stack of every
+thread that is handling a request, every PROFILE_INTERVAL_MS. When a
+request takes longer than PROFILE_SLOW_MS its samples are written to
+PROFILE_DIR as collapsed stacks (one "frame;frame;frame count" line per
+distinct stack), which flamegraph.pl and https://speedscope.app read
+directly. Off by default; nothing is sampled unless it is enabled.
+
+Environment:
+- PROFILE_SLOW_MS: profile requests slower than this, default unset (off)
+- PROFILE_INTERVAL_MS: sampling interval, default 5
+- PROFILE_DIR: where profiles are written, default "profiles"
+- PROFILE_MAX_FILES: newest profiles kept, default 100
+"""
+import os
+import sys
+import time
+import threading
+from collections import Counter
+
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "100"))
+
+MAX_STACK_DEPTH = 128
+
+
+def collapse(frame):
+    """'outer (file.py:12);inner (file.py:40)' for a frame and its callers"""
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """Samples request threads while they run; keeps the samples of slow ones"""
+
+    def __init__(self, slow_ms=PROFILE_SLOW_MS, interval_ms=PROFILE_INTERVAL_MS,
+                 directory=PROFILE_DIR, max_files=PROFILE_MAX_FILES):
+        self.slow_ms = slow_ms
+        self.interval = interval_ms / 1000
+        self.directory = directory
+        self.max_files = max_files
+        self.enabled = slow_ms > 0
+        self.active = {}    # thread id -> Counter of collapsed stacks
+        self.dumped = 0
+        self._sampler = None
+        self._lock = threading.Lock()
+
+    def _ensure_sampler(self):
+        # Started on first use, so each forked worker runs its own
+        with self._lock:
+            if self._sampler is None or not self._sampler.is_alive():
+                self._sampler = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._sampler.start()
+
+    def start_request(self):
+        if not self.enabled:
+            return
+        self._ensure_sampler()
+        self.active[threading.get_ident()] = Counter()
+
+    def end_request(self, name, seconds):
+        """Stop sampling this thread; returns the profile path if the request was slow"""
+        if not self.enabled:
+            return None
+        samples = self.active.pop(threading.get_ident(), None)
+        if not samples or seconds * 1000 < self.slow_ms:
+            return None
+        return self._dump(name, seconds, samples)
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            for thread_id, samples in list(self.active.items()):
+                frame = frames.get(thread_id)
+                if frame is not None and thread_id != me:
+                    samples[collapse(frame)] += 1
+
+    def _dump(self, name, seconds, samples):
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(
+            self.directory, f"{stamp}-{os.getpid()}-{name or 'request'}-{int(seconds * 1000)}ms.folded"
+        )
+        with open(path, "w") as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+        self.dumped += 1
+        self._prune()
+        return path
+
+    def _prune(self):
+        try:
+            files = sorted(
+                (os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                 if name.endswith(".folded")),
+                key=os.path.getmtime
+            )
+            for path in files[:-self.max_files]:
+                os.remove(path)
+        except OSError:
+            pass
+
+    def status(self):
+        return {
+            "enabled": self.enabled,
+            "slow_ms": self.slow_ms if self.enabled else None,
+            "profiles_written": self.dumped,
+        }
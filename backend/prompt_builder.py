@@ -0,0 +1,124 @@
+"""
+Prompt assembly
+
+- PromptTemplate: a system prompt split once into literal text and
+  {fields}, with the token cost of the literal part counted up front
+- PromptBuilder: renders a mode's template with a context section that is
+  cached per mode and message, keyed by a memory version so any memory or
+  journal write (by any worker) invalidates it, and trimmed so the whole
+  prompt fits the token budget of the provider it is sent to
+
+Tokens are estimated (~4 characters per token), the same count the
+semantic memory budget uses.
+
+Environment:
+- PROMPT_TOKENS_GROQ / PROMPT_TOKENS_ANTHROPIC / PROMPT_TOKENS_OPENAI:
+  max system prompt plus message tokens per provider, default 2000 / 4000 / 4000
+- PROMPT_CACHE_SIZE: cached context sections, default 256
+"""
+import os
+import string
+import threading
+from collections import OrderedDict
+
+from semantic_memory import estimate_tokens
+
+PROMPT_TOKEN_BUDGETS = {
+    "groq": int(os.getenv("PROMPT_TOKENS_GROQ", "2000")),
+    "anthropic": int(os.getenv("PROMPT_TOKENS_ANTHROPIC", "4000")),
+    "openai": int(os.getenv("PROMPT_TOKENS_OPENAI", "4000")),
+}
+DEFAULT_TOKEN_BUDGET = 2000
+PROMPT_CACHE_SIZE = int(os.getenv("PROMPT_CACHE_SIZE", "256"))
+
+# Room kept for the date/time lines and estimation error
+RESERVED_TOKENS = 40
+
+
+class PromptTemplate:
+    """A str.format template parsed once; uses_context says whether it has {context}"""
+
+    def __init__(self, text):
+        self.parts = list(string.Formatter().parse(text))
+        self.fields = {field for _, field, _, _ in self.parts if field}
+        self.uses_context = "context" in self.fields
+        self.static_tokens = estimate_tokens("".join(literal for literal, _, _, _ in self.parts))
+
+    def render(self, **values):
+        out = []
+        for literal, field, spec, _ in self.parts:
+            out.append(literal)
+            if field is not None:
+                out.append(format(values[field], spec))
+        return "".join(out)
+
+
+class Prompt:
+    """A rendered system prompt and what went into it"""
+
+    def __init__(self, text, tokens, context_tokens, cached):
+        self.text = text
+        self.tokens = tokens
+        self.context_tokens = context_tokens
+        self.cached = cached
+
+
+class PromptBuilder:
+    """
+    Renders system prompts for each mode. context_source(message, budget)
+    returns the context snippets for a message within a token budget;
+    version() changes whenever memory is written.
+    """
+
+    def __init__(self, templates, context_source, version, budgets=PROMPT_TOKEN_BUDGETS,
+                 cache_size=PROMPT_CACHE_SIZE):
+        self.templates = {mode: PromptTemplate(text) for mode, text in templates.items()}
+        self.context_source = context_source
+        self.version = version
+        self.budgets = budgets
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def budget_for(self, providers):
+        """Token budget of a prompt that may go to any of these providers"""
+        budgets = [self.budgets.get(name, DEFAULT_TOKEN_BUDGET) for name in providers]
+        return min(budgets) if budgets else DEFAULT_TOKEN_BUDGET
+
+    def context(self, mode, user_message, budget):
+        """Context section for a mode and message, from the cache when memory hasn't changed"""
+        key = (mode, " ".join(user_message.lower().split()), budget, self.version())
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key], True
+            self.misses += 1
+        texts = self.context_source(user_message, budget) if budget > 0 else []
+        context = "\n\n".join(texts)
+        with self._lock:
+            self._cache[key] = context
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return context, False
+
+    def build(self, mode, user_message, budget=DEFAULT_TOKEN_BUDGET, **values):
+        """Render the prompt for a mode, with as much context as the budget leaves room for"""
+        template = self.templates.get(mode) or self.templates["general"]
+        context, cached = "", False
+        if template.uses_context:
+            room = budget - template.static_tokens - estimate_tokens(user_message) - RESERVED_TOKENS
+            context, cached = self.context(mode, user_message, max(room, 0))
+        text = template.render(context=context, **values)
+        return Prompt(text, estimate_tokens(text) + estimate_tokens(user_message),
+                      estimate_tokens(context) if context else 0, cached)
+
+    def status(self):
+        return {
+            "cached": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "budgets": self.budgets,
+        }
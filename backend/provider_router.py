@@ -0,0 +1,233 @@
+"""
+AI provider router
+
+- hedged requests: if the primary provider hasn't answered within its
+  p95-derived deadline, the next provider is fired too and the first
+  success wins
+- per-provider circuit breaker: providers that keep failing are skipped
+  until a cool-down has passed, then probed again
+- latency and error-rate EWMAs per provider, exposed via status();
+  streamed calls report their time to first token separately, since the
+  hedge deadline is about complete replies
+
+Providers are plain callables (system_prompt, user_message) -> text that
+raise on failure, so the router can be driven by local fakes.
+
+Environment:
+- AI_HEDGE_DEFAULT_MS: hedge deadline before enough latency samples exist, default 4000
+- AI_HEDGE_MIN_MS: lower bound for the hedge deadline, default 500
+- AI_BREAKER_FAILURES: consecutive failures that open a breaker, default 3
+- AI_BREAKER_COOLDOWN: seconds a breaker stays open, default 30
+"""
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from metrics import LatencyStats
+
+AI_HEDGE_DEFAULT_MS = float(os.getenv("AI_HEDGE_DEFAULT_MS", "4000"))
+AI_HEDGE_MIN_MS = float(os.getenv("AI_HEDGE_MIN_MS", "500"))
+AI_BREAKER_FAILURES = int(os.getenv("AI_BREAKER_FAILURES", "3"))
+AI_BREAKER_COOLDOWN = float(os.getenv("AI_BREAKER_COOLDOWN", "30"))
+
+EWMA_ALPHA = 0.2
+# Below ~20 samples "p95" is just the maximum
+MIN_SAMPLES_FOR_P95 = 20
+
+
+class NoProviderAvailable(Exception):
+    """Raised when every provider failed or has an open circuit breaker"""
+
+
+class CircuitBreaker:
+    """closed -> open after N consecutive failures -> half_open after cool-down"""
+
+    def __init__(self, failure_threshold=AI_BREAKER_FAILURES, cooldown=AI_BREAKER_COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        """May a call go through? In half_open only one probe call is let through"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class Provider:
+    def __init__(self, name, call, enabled=True):
+        self.name = name
+        self.call = call
+        self.enabled = enabled
+        self.breaker = CircuitBreaker()
+        self.latency = LatencyStats(window=200)
+        self.ewma_latency_ms = None
+        self.ttft = LatencyStats(window=200)
+        self.ewma_ttft_ms = None
+        self.ewma_error_rate = 0.0
+        self.calls = 0
+        self.streams = 0
+        self.failures = 0
+        self.hedges_won = 0
+        self._lock = threading.Lock()
+
+    def record(self, ms, ok, stream=False):
+        """
+        Outcome of one call: ms is the time to the whole reply, or for a
+        stream the time to its first chunk (or to the failure)
+        """
+        with self._lock:
+            self.calls += 1
+            self.streams += stream
+            if ok and stream:
+                self.ttft.observe(ms)
+                self.ewma_ttft_ms = ms if self.ewma_ttft_ms is None else (
+                    EWMA_ALPHA * ms + (1 - EWMA_ALPHA) * self.ewma_ttft_ms
+                )
+            elif ok:
+                self.latency.observe(ms)
+                self.ewma_latency_ms = ms if self.ewma_latency_ms is None else (
+                    EWMA_ALPHA * ms + (1 - EWMA_ALPHA) * self.ewma_latency_ms
+                )
+            else:
+                self.failures += 1
+            self.ewma_error_rate = EWMA_ALPHA * (0 if ok else 1) + (1 - EWMA_ALPHA) * self.ewma_error_rate
+        if ok:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def hedge_deadline(self, default_ms=AI_HEDGE_DEFAULT_MS, min_ms=AI_HEDGE_MIN_MS):
+        """Seconds to wait before hedging: this provider's recent p95"""
+        if len(self.latency.samples) < MIN_SAMPLES_FOR_P95:
+            return default_ms / 1000
+        return max(min_ms, self.latency.percentile(95)) / 1000
+
+    def status(self):
+        return {
+            "enabled": self.enabled,
+            "breaker": self.breaker.state,
+            "calls": self.calls,
+            "streams": self.streams,
+            "failures": self.failures,
+            "hedges_won": self.hedges_won,
+            "ewma_latency_ms": round(self.ewma_latency_ms, 1) if self.ewma_latency_ms else None,
+            "ewma_error_rate": round(self.ewma_error_rate, 3),
+            "p95_ms": self.latency.percentile(95),
+            "ewma_ttft_ms": round(self.ewma_ttft_ms, 1) if self.ewma_ttft_ms else None,
+            "ttft_p95_ms": self.ttft.percentile(95),
+        }
+
+
+class ProviderRouter:
+    """Calls providers in priority order with hedging and circuit breaking"""
+
+    def __init__(self, providers, hedge_default_ms=AI_HEDGE_DEFAULT_MS, hedge_min_ms=AI_HEDGE_MIN_MS):
+        self.providers = providers
+        self.hedge_default_ms = hedge_default_ms
+        self.hedge_min_ms = hedge_min_ms
+        self.executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="provider")
+
+    def available(self):
+        """Enabled providers whose breaker isn't open, in priority order"""
+        return [p for p in self.providers if p.enabled and p.breaker.state != "open"]
+
+    def _start(self, provider, args):
+        def run():
+            start = time.perf_counter()
+            try:
+                result = provider.call(*args)
+            except Exception:
+                provider.record((time.perf_counter() - start) * 1000, ok=False)
+                raise
+            provider.record((time.perf_counter() - start) * 1000, ok=True)
+            return result
+        return self.executor.submit(run)
+
+    def call(self, *args):
+        """Return (provider_name, text) from the first provider to succeed"""
+        candidates = self.available()
+        if not candidates:
+            raise NoProviderAvailable("All AI providers are unavailable (circuit open)")
+
+        in_flight = {}
+        hedged = set()
+        errors = []
+        next_index = 0
+
+        def launch_next(hedge=False):
+            nonlocal next_index
+            while next_index < len(candidates):
+                provider = candidates[next_index]
+                next_index += 1
+                # A half-open breaker lets exactly one probe call through
+                if provider.breaker.allow():
+                    in_flight[self._start(provider, args)] = provider
+                    if hedge:
+                        hedged.add(provider.name)
+                    return True
+            return False
+
+        if not launch_next():
+            raise NoProviderAvailable("All AI providers are unavailable (circuit open)")
+        while in_flight:
+            primary = next(iter(in_flight.values()))
+            deadline = primary.hedge_deadline(self.hedge_default_ms, self.hedge_min_ms)
+            # Only hedge while there is someone left to hedge with
+            timeout = deadline if next_index < len(candidates) else None
+            done, _ = wait(list(in_flight), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                print(f"⏱️ {primary.name} slower than {deadline * 1000:.0f}ms, hedging...")
+                launch_next(hedge=True)
+                continue
+
+            for future in done:
+                provider = in_flight.pop(future)
+                try:
+                    text = future.result()
+                except Exception as e:
+                    print(f"⚠️ {provider.name} failed: {e}")
+                    errors.append(f"{provider.name}: {e}")
+                    continue
+                if provider.name in hedged:
+                    provider.hedges_won += 1
+                return provider.name, text
+
+            if not in_flight:
+                launch_next()
+
+        raise NoProviderAvailable("; ".join(errors) or "No AI provider answered")
+
+    def status(self):
+        return {p.name: p.status() for p in self.providers}
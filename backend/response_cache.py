@@ -0,0 +1,208 @@
+"""
+Opt-in cache of AI replies for repeated requests
+
+Users ask for the same things over and over ("plan my day", "help me
+focus"). With RESPONSE_CACHE=true, replies are kept in a bounded LRU keyed
+on mode plus the normalized message, so a repeat skips the provider call.
+With RESPONSE_CACHE_SIMILARITY set, a message whose embedding (the semantic
+memory's embedder, fully local) is at least that similar to a cached one
+of the same mode also counts as a hit.
+
+Replies go stale, so every entry has a TTL per mode. Planning replies and
+messages about today/tomorrow also expire at midnight, and messages about
+"now" or the next hours get the short RESPONSE_CACHE_TTL_NOW. Journaling
+replies respond to a personal entry and are not cached by default.
+
+Environment:
+- RESPONSE_CACHE: enable the cache, default false
+- RESPONSE_CACHE_SIZE: max cached replies, default 512
+- RESPONSE_CACHE_SIMILARITY: min cosine similarity for a near-duplicate hit,
+  default unset (exact matches only)
+- RESPONSE_CACHE_TTL_PLANNING / _GENERAL / _JOURNALING: seconds, default 900 / 3600 / 0
+- RESPONSE_CACHE_TTL_NOW: seconds for messages about the current time, default 300
+- RESPONSE_CACHE_FILE: snapshot file so the cache survives restarts, default unset
+"""
+import os
+import re
+import time
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import numpy as np
+
+RESPONSE_CACHE = os.getenv("RESPONSE_CACHE", "false").lower() == "true"
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+RESPONSE_CACHE_SIMILARITY = os.getenv("RESPONSE_CACHE_SIMILARITY")
+RESPONSE_CACHE_TTLS = {
+    "planning": float(os.getenv("RESPONSE_CACHE_TTL_PLANNING", "900")),
+    "general": float(os.getenv("RESPONSE_CACHE_TTL_GENERAL", "3600")),
+    "journaling": float(os.getenv("RESPONSE_CACHE_TTL_JOURNALING", "0")),
+}
+RESPONSE_CACHE_TTL_NOW = float(os.getenv("RESPONSE_CACHE_TTL_NOW", "300"))
+RESPONSE_CACHE_FILE = os.getenv("RESPONSE_CACHE_FILE", "")
+
+# Snapshot after this many new replies (and at shutdown)
+SNAPSHOT_EVERY = 20
+SNAPSHOT_VERSION = 1
+
+FILLER = re.compile(r"\b(please|hey|hi|hello|daymind|can you|could you|would you|thanks|thank you)\b")
+ABOUT_NOW = re.compile(r"\b(now|right now|at the moment|next hour|next (two|few|couple of) hours|rest of the day|tonight)\b")
+ABOUT_DAY = re.compile(r"\b(today|tomorrow|this (morning|afternoon|evening|week)|my day|the day)\b")
+
+
+def normalize_message(text):
+    """Lowercase words without punctuation and polite filler"""
+    text = re.sub(r"[^\w\s']", " ", text.lower())
+    return " ".join(FILLER.sub(" ", text).split())
+
+
+class ResponseCache:
+    """LRU of replies keyed by (mode, normalized message), with TTLs and optional similarity lookup"""
+
+    def __init__(self, embedder=None, enabled=RESPONSE_CACHE, max_entries=RESPONSE_CACHE_SIZE,
+                 similarity=RESPONSE_CACHE_SIMILARITY, ttls=RESPONSE_CACHE_TTLS,
+                 ttl_now=RESPONSE_CACHE_TTL_NOW, snapshot_path=RESPONSE_CACHE_FILE):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.similarity = float(similarity) if similarity else None
+        self.embedder = embedder if self.similarity else None
+        self.ttls = ttls
+        self.ttl_now = ttl_now
+        self.snapshot_path = snapshot_path
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # (mode, message) -> {"reply", "expires", "vector"}
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        if self.enabled:
+            self._load_snapshot()
+
+    def expiry(self, mode, message, now=None):
+        """When a reply to this message goes stale (None: don't cache it)"""
+        ttl = self.ttls.get(mode, self.ttls.get("general", 0))
+        if ABOUT_NOW.search(message):
+            ttl = min(ttl, self.ttl_now)
+        if ttl <= 0:
+            return None
+        now = now or datetime.now()
+        expires = now + timedelta(seconds=ttl)
+        if mode == "planning" or ABOUT_DAY.search(message):
+            midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+            expires = min(expires, midnight)
+        return expires.timestamp()
+
+    def _embed(self, message):
+        return self.embedder.embed([message])[0] if self.embedder else None
+
+    def get(self, mode, message):
+        """A cached reply for this request, or None"""
+        if not self.enabled:
+            return None
+        key = (mode, normalize_message(message))
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry["expires"] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry["reply"]
+            if entry:
+                del self._entries[key]
+            candidates = [(k, e) for k, e in self._entries.items()
+                          if k[0] == mode and e["vector"] is not None and e["expires"] > now]
+        if self.embedder and candidates:
+            scores = np.stack([e["vector"] for _, e in candidates]) @ self._embed(key[1])
+            best = int(np.argmax(scores))
+            if scores[best] >= self.similarity:
+                with self._lock:
+                    self.similar_hits += 1
+                    if candidates[best][0] in self._entries:
+                        self._entries.move_to_end(candidates[best][0])
+                return candidates[best][1]["reply"]
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, mode, message, reply):
+        """Remember a reply, unless its TTL rules say it shouldn't be reused"""
+        if not self.enabled or not reply:
+            return
+        expires = self.expiry(mode, message)
+        if expires is None:
+            return
+        normalized = normalize_message(message)
+        entry = {"reply": reply, "expires": expires, "vector": self._embed(normalized)}
+        with self._lock:
+            self._entries[(mode, normalized)] = entry
+            self._entries.move_to_end((mode, normalized))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._unsaved += 1
+            if self._unsaved >= SNAPSHOT_EVERY:
+                self._save_snapshot()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._unsaved += 1
+
+    def save(self):
+        """Write the snapshot if anything changed (called at shutdown)"""
+        with self._lock:
+            if self._unsaved:
+                self._save_snapshot()
+
+    def _load_snapshot(self):
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                snapshot = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+            print(f"⚠️ Could not read response cache snapshot: {e}")
+            return
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            return
+        now = time.time()
+        for key, entry in snapshot["entries"]:
+            if entry["expires"] > now:
+                # Vectors from another embedder (or none) can't be compared
+                if entry["vector"] is not None and (
+                    not self.embedder or len(entry["vector"]) != self.embedder.dim
+                ):
+                    entry["vector"] = None
+                if entry["vector"] is None and self.embedder:
+                    entry["vector"] = self._embed(key[1])
+                self._entries[key] = entry
+        print(f"💬 Loaded {len(self._entries)} cached replies")
+
+    def _save_snapshot(self):
+        self._unsaved = 0
+        if not self.snapshot_path:
+            return
+        snapshot = {"version": SNAPSHOT_VERSION, "entries": list(self._entries.items())}
+        directory = os.path.dirname(os.path.abspath(self.snapshot_path))
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-responses-")
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            print(f"⚠️ Could not write response cache snapshot: {e}")
+
+    def status(self):
+        lookups = self.hits + self.similar_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "similarity": self.similarity,
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.similar_hits) / lookups, 3) if lookups else None,
+        }
@@ -0,0 +1,256 @@
+"""
+Local semantic memory
+
+Every conversation and journal entry is embedded on the CPU and kept in an
+append-only float32 matrix on disk, memory-mapped for search. Prompts get
+the snippets most similar to the current message (vectorized cosine top-k)
+instead of simply the last few conversations, within a token budget.
+
+Runs fully offline. The default embedder hashes words, word pairs and
+character trigrams into a fixed-size vector (no model download). Set
+EMBEDDING_MODEL to a sentence-transformers model that is already in the
+local cache (e.g. all-MiniLM-L6-v2) to use it instead.
+
+Environment:
+- MEMORY_INDEX_DIR: where vectors and snippets live, default "memory_index"
+- EMBEDDING_MODEL: local sentence-transformers model, default "" (hashing embedder)
+- MEMORY_TOP_K: snippets considered per prompt, default 4
+- MEMORY_MIN_SCORE: minimum cosine similarity, default depends on the embedder
+- MEMORY_TOKEN_BUDGET: max estimated tokens of context per prompt, default 800
+"""
+import os
+import json
+import zlib
+import threading
+
+import numpy as np
+
+from storage import FileLock
+from journal_index import tokenize
+
+MEMORY_INDEX_DIR = os.getenv("MEMORY_INDEX_DIR", "memory_index")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "")
+MEMORY_TOP_K = int(os.getenv("MEMORY_TOP_K", "4"))
+# Unset: each embedder has its own threshold
+MEMORY_MIN_SCORE = os.getenv("MEMORY_MIN_SCORE")
+MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", "800"))
+
+# Longer snippets are cut before they go into a prompt
+MAX_SNIPPET_CHARS = 1200
+
+# Words that carry no topic (on top of the search stopwords), plus the
+# "User:"/"Assistant:" labels every conversation snippet has
+EMBED_STOPWORDS = frozenset("""
+about after again all also am any assistant been before being both can could
+did do does doing don't done down each even every feel get got how i'll i've
+into its just know let like make many more most much need no not now off
+only other our out over really same say said see she should some such sure
+than their them then there these they thing things think those through too
+under up us very want way well what when where which while who why will
+would yes yet you'll you're user
+""".split())
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token for English)"""
+    return len(text) // 4 + 1
+
+
+class HashingEmbedder:
+    """
+    Feature-hashing embedder: words, word pairs and character trigrams are
+    hashed into signed buckets. Deterministic, instant, no model files.
+    """
+
+    name = "hashing-v1"
+    # Unrelated texts score around +-0.05 from hash collisions
+    min_score = 0.08
+
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def _features(self, text):
+        words = [w for w in tokenize(text) if w not in EMBED_STOPWORDS]
+        features = [(w, 1.0) for w in words]
+        features += [(f"{a} {b}", 0.5) for a, b in zip(words, words[1:])]
+        # Trigrams let "taxes" and "tax" land close together
+        for word in words:
+            padded = f"<{word}>"
+            features += [(padded[i:i + 3], 0.3) for i in range(len(padded) - 2)]
+        return features
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % self.dim] += weight if h & 0x80000000 else -weight
+        # Sublinear term frequency, then unit length so dot product = cosine
+        np.copysign(np.log1p(np.abs(vectors)), vectors, out=vectors)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return vectors / norms
+
+
+class SentenceTransformerEmbedder:
+    """A small local sentence-transformers model on the CPU"""
+
+    min_score = 0.3
+
+    def __init__(self, model_name):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name, device="cpu", local_files_only=True)
+        self.name = model_name
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts):
+        return self.model.encode(
+            list(texts), normalize_embeddings=True, convert_to_numpy=True
+        ).astype(np.float32)
+
+
+def create_embedder(model_name=EMBEDDING_MODEL):
+    if model_name:
+        try:
+            return SentenceTransformerEmbedder(model_name)
+        except Exception as e:
+            print(f"⚠️ Embedding model {model_name} unavailable ({e}), using hashing embedder")
+    return HashingEmbedder()
+
+
+class SemanticMemory:
+    """
+    Append-only store of (snippet, embedding). Vectors are raw float32 rows
+    in vectors.f32, snippets one JSON line each in snippets.jsonl (line i
+    describes row i). Writers hold a file lock so several workers can share
+    the index; readers pick up new rows on their next search.
+    """
+
+    def __init__(self, directory=MEMORY_INDEX_DIR, embedder=None):
+        self.directory = directory
+        self.embedder = embedder or create_embedder()
+        self.dim = self.embedder.dim
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.snippets_path = os.path.join(directory, "snippets.jsonl")
+        self.meta_path = os.path.join(directory, "meta.json")
+        self.snippets = []
+        self.keys = set()
+        self.matrix = None
+        self._offset = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        with FileLock(self.snippets_path):
+            self._check_meta()
+
+    def _check_meta(self):
+        """Vectors from a different embedder can't be compared, start over"""
+        meta = {"embedder": self.embedder.name, "dim": self.dim}
+        try:
+            with open(self.meta_path) as f:
+                current = json.load(f)
+        except (OSError, ValueError):
+            current = None
+        if current != meta:
+            if current is not None:
+                print(f"🧠 Embedder changed to {self.embedder.name}, re-indexing memory...")
+            for path in (self.vectors_path, self.snippets_path):
+                open(path, 'wb').close()
+            with open(self.meta_path, 'w') as f:
+                json.dump(meta, f)
+
+    def refresh(self):
+        """Pick up snippets appended since the last call (by any process)"""
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self):
+        try:
+            with open(self.snippets_path, 'rb') as f:
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        # Ignore a trailing line that is still being written
+        end = data.rfind(b"\n") + 1
+        if not end:
+            return
+        for line in data[:end].splitlines():
+            snippet = json.loads(line)
+            self.snippets.append(snippet)
+            self.keys.add(snippet["key"])
+        self._offset += end
+        self.matrix = np.memmap(
+            self.vectors_path, dtype=np.float32, mode='r', shape=(len(self.snippets), self.dim)
+        )
+
+    def version(self):
+        """Number of indexed snippets, including ones other processes added"""
+        self.refresh()
+        return len(self.snippets)
+
+    def add(self, key, text, **fields):
+        self.add_many([(key, text, fields)])
+
+    def add_many(self, items):
+        """Embed and append (key, text, fields) items whose key isn't indexed yet"""
+        with self._lock, FileLock(self.snippets_path):
+            self._refresh()
+            seen = set()
+            new = []
+            for key, text, fields in items:
+                if key not in self.keys and key not in seen and text.strip():
+                    seen.add(key)
+                    new.append((key, text, fields))
+            if not new:
+                return 0
+            vectors = self.embedder.embed([text for _, text, _ in new])
+            with open(self.vectors_path, 'r+b') as f:
+                # Drop rows left by a writer that died before adding their snippets
+                f.truncate(len(self.snippets) * self.dim * 4)
+                f.seek(0, os.SEEK_END)
+                f.write(vectors.astype(np.float32).tobytes())
+            lines = "".join(
+                json.dumps({"key": key, "text": text, **fields}) + "\n" for key, text, fields in new
+            )
+            with open(self.snippets_path, 'ab') as f:
+                f.write(lines.encode("utf-8"))
+            self._refresh()
+            return len(new)
+
+    def search(self, query, k=MEMORY_TOP_K, min_score=None):
+        """Return up to k (score, snippet) pairs, most similar first"""
+        if min_score is None:
+            min_score = float(MEMORY_MIN_SCORE) if MEMORY_MIN_SCORE else self.embedder.min_score
+        self.refresh()
+        matrix, snippets = self.matrix, self.snippets
+        if matrix is None or not len(snippets) or not query.strip():
+            return []
+        scores = matrix @ self.embedder.embed([query])[0]
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), snippets[i]) for i in top if scores[i] >= min_score]
+
+    def context_for(self, query, budget=MEMORY_TOKEN_BUDGET, k=MEMORY_TOP_K, always=()):
+        """
+        Snippet texts for a prompt: `always` first (e.g. the last exchange),
+        then the most relevant matches, stopping at the token budget.
+        """
+        texts = []
+        used = 0
+        candidates = list(always) + [s["text"] for _, s in self.search(query, k=k)]
+        for text in dict.fromkeys(candidates):
+            text = text[:MAX_SNIPPET_CHARS]
+            cost = estimate_tokens(text)
+            if used + cost > budget:
+                continue
+            texts.append(text)
+            used += cost
+        return texts
+
+    def status(self):
+        return {
+            "embedder": self.embedder.name,
+            "snippets": len(self.snippets),
+            "bytes": len(self.snippets) * self.dim * 4,
+        }
@@ -0,0 +1,651 @@
+"""
+DayMind storage layer
+
+Every document (memory, tasks, journal) is a list of items under one key,
+e.g. {"tasks": [...]}. Backends:
+- "sqlite" (default): one row per item in a WAL-mode SQLite database,
+  so appends are O(1) and lookups go through an index
+- "json": the original whole-file JSON documents, written atomically
+
+Both backends offer a transactional API for read-modify-write:
+
+    with store.update(TASKS_FILE) as data:
+        data["tasks"].append(task)
+
+Every item gets a stable integer "id" when it is stored, so clients can
+address it independently of its position. The SQLite backend also keeps a
+version per document, bumped on every write, so clients can revalidate
+(ETag) or fetch only what changed since the version they have:
+
+    store.changes(TASKS_FILE, since="41")
+    # {"tasks": [changed or added], "deleted": [ids], "version": "42", "reset": False}
+
+Writers are serialized across threads and processes; readers never block
+and never see a partially written document.
+"""
+import os
+import json
+import shutil
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sqlite")
+DATABASE_FILE = os.getenv("DATABASE_FILE", "daymind.db")
+
+# Document name -> key holding its list of items
+DOCUMENTS = {
+    "memory": "conversations",
+    "tasks": "tasks",
+    "journal": "entries",
+}
+
+
+def doc_name(filepath):
+    """Map a legacy file path like 'tasks.json' to its document name"""
+    name = os.path.splitext(os.path.basename(filepath))[0]
+    for doc in DOCUMENTS:
+        if doc in name:
+            return doc
+    return name
+
+
+def get_default_content(filepath):
+    """Get default content based on filename"""
+    key = DOCUMENTS.get(doc_name(filepath))
+    return {key: []} if key else {}
+
+
+def list_key(filepath):
+    return DOCUMENTS.get(doc_name(filepath), "items")
+
+
+def assign_ids(items):
+    """Give items without an "id" the next free one, in order"""
+    next_id = max((item["id"] for item in items if isinstance(item.get("id"), int)), default=0) + 1
+    for item in items:
+        if "id" not in item:
+            item["id"] = next_id
+            next_id += 1
+
+
+class FileLock:
+    """Exclusive lock on <path>.lock, held across threads and processes"""
+
+    _thread_locks = {}
+    _guard = threading.Lock()
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path) + ".lock"
+        with FileLock._guard:
+            self.thread_lock = FileLock._thread_locks.setdefault(self.path, threading.Lock())
+        self.handle = None
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        try:
+            self.handle = open(self.path, 'a+')
+            if fcntl:
+                fcntl.flock(self.handle.fileno(), fcntl.LOCK_EX)
+            else:
+                while True:
+                    try:
+                        self.handle.seek(0)
+                        msvcrt.locking(self.handle.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+        except BaseException:
+            if self.handle:
+                self.handle.close()
+            self.thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if fcntl:
+                fcntl.flock(self.handle.fileno(), fcntl.LOCK_UN)
+            else:
+                self.handle.seek(0)
+                msvcrt.locking(self.handle.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self.handle.close()
+            self.thread_lock.release()
+        return False
+
+
+def atomic_write_json(filepath, data):
+    """Write to a temp file in the same directory, then rename over the target"""
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(filepath)}.")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class JSONStore:
+    """Original backend: each document is rewritten as a whole JSON file"""
+
+    def __init__(self, files, directory=None):
+        self.files = files
+        # Documents are addressed by name ("tasks.json") and live in directory
+        self.directory = directory
+
+    def _path(self, filepath):
+        return os.path.join(self.directory, filepath) if self.directory else filepath
+
+    def init(self):
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+        for filepath in self.files:
+            path = self._path(filepath)
+            with FileLock(path):
+                if not os.path.exists(path):
+                    atomic_write_json(path, get_default_content(filepath))
+            items = self.items(filepath)
+            if any("id" not in item for item in items):
+                with self.update(filepath) as data:
+                    assign_ids(data[list_key(filepath)])
+
+    def load(self, filepath):
+        """Load JSON without locking; writes are atomic renames so this never sees partial state"""
+        path = self._path(filepath)
+        try:
+            with open(path, 'r') as f:
+                content = f.read().strip()
+            if not content:
+                return get_default_content(filepath)
+            return json.loads(content)
+        except FileNotFoundError:
+            return get_default_content(filepath)
+        except json.JSONDecodeError:
+            # Keep the damaged file around instead of silently wiping it
+            backup = path + ".corrupt"
+            print(f"⚠️ {path} is corrupted, backed up to {backup}")
+            shutil.copyfile(path, backup)
+            return get_default_content(filepath)
+
+    def save(self, filepath, data):
+        path = self._path(filepath)
+        try:
+            with FileLock(path):
+                atomic_write_json(path, data)
+        except Exception as e:
+            print(f"❌ Error saving {path}: {e}")
+
+    @contextmanager
+    def update(self, filepath):
+        """Locked read-modify-write of a whole document"""
+        path = self._path(filepath)
+        with FileLock(path):
+            data = self.load(filepath)
+            data.setdefault(list_key(filepath), [])
+            yield data
+            atomic_write_json(path, data)
+
+    def items(self, filepath):
+        return self.load(filepath)[list_key(filepath)]
+
+    def append(self, filepath, item):
+        """Append one item, giving it the next id if it has none"""
+        self.extend(filepath, [item])
+        return item
+
+    def extend(self, filepath, items):
+        with self.update(filepath) as data:
+            existing = data[list_key(filepath)]
+            existing.extend(items)
+            assign_ids(existing)
+
+    def tail(self, filepath, n):
+        return self.items(filepath)[-n:] if n > 0 else []
+
+    def items_from(self, filepath, start):
+        """Items at position start and later"""
+        return self.items(filepath)[start:]
+
+    def count(self, filepath):
+        return len(self.items(filepath))
+
+    def get_at(self, filepath, index):
+        items = self.items(filepath)
+        return items[index] if 0 <= index < len(items) else None
+
+    def set_at(self, filepath, index, item):
+        with self.update(filepath) as data:
+            items = data[list_key(filepath)]
+            if not 0 <= index < len(items):
+                return False
+            items[index] = item
+        return True
+
+    def trim(self, filepath, keep):
+        with self.update(filepath) as data:
+            key = list_key(filepath)
+            data[key] = data[key][-keep:] if keep > 0 else []
+
+    def get_item(self, filepath, item_id):
+        return next((item for item in self.items(filepath) if item.get("id") == item_id), None)
+
+    def update_item(self, filepath, item_id, fields):
+        """Merge fields (except "id") into the item with this id; returns the item or None"""
+        fields = {key: value for key, value in fields.items() if key != "id"}
+        with self.update(filepath) as data:
+            for item in data[list_key(filepath)]:
+                if item.get("id") == item_id:
+                    item.update(fields)
+                    return item
+        return None
+
+    def page(self, filepath, cursor=None, limit=50, newest_first=False):
+        """Return (items, next_cursor); the cursor is an opaque string"""
+        items = self.items(filepath)
+        if newest_first:
+            items.reverse()
+        start = int(cursor) if cursor else 0
+        page = items[start:start + limit]
+        return page, str(start + limit) if start + limit < len(items) else None
+
+    def version(self, filepath):
+        """Changes whenever the document is rewritten"""
+        try:
+            stat = os.stat(self._path(filepath))
+        except FileNotFoundError:
+            return "0"
+        return f"{stat.st_mtime_ns}.{stat.st_size}"
+
+    def changes(self, filepath, since):
+        """No change log in JSON files: always ask the client for a full reload"""
+        return {
+            list_key(filepath): [],
+            "deleted": [],
+            "version": self.version(filepath),
+            "reset": True,
+        }
+
+
+class SQLiteStore:
+    """
+    One row per item, indexed by (doc, seq), in a WAL-mode database.
+    Writers take BEGIN IMMEDIATE, which SQLite serializes across threads and
+    processes; WAL readers never block and only see committed data.
+
+    Each row also stores its item id and the document version that last
+    wrote it; deleted ids are kept as tombstones so changes() can report them.
+    """
+
+    # Tombstones kept per document; clients older than that get a full reload
+    MAX_TOMBSTONES = 10000
+
+    def __init__(self, files, db_path=DATABASE_FILE):
+        self.files = files
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        # SQLite connections must not be used across fork(); a forked worker opens its own
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def init(self):
+        conn = self._conn()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS items (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                doc TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_items_doc ON items(doc, seq);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE TABLE IF NOT EXISTS tombstones (
+                doc TEXT NOT NULL,
+                item_id INTEGER NOT NULL,
+                version INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_tombstones_doc ON tombstones(doc, version);
+        """)
+        self._migrate()
+        for filepath in self.files:
+            self._import_json(filepath)
+            self._assign_missing_ids(doc_name(filepath))
+
+    def _migrate(self):
+        """Add the item_id/version columns to databases created before they existed"""
+        with self._transaction() as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(items)")}
+            if "item_id" not in columns:
+                conn.execute("ALTER TABLE items ADD COLUMN item_id INTEGER")
+            if "version" not in columns:
+                conn.execute("ALTER TABLE items ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_items_item ON items(doc, item_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_items_version ON items(doc, version)")
+
+    def _import_json(self, filepath):
+        """Import an existing JSON document the first time the database sees it"""
+        doc = doc_name(filepath)
+        conn = self._conn()
+        marker = f"imported:{doc}"
+        if conn.execute("SELECT 1 FROM meta WHERE key = ?", (marker,)).fetchone():
+            return
+        items = []
+        if os.path.exists(filepath):
+            items = JSONStore([filepath]).items(filepath)
+            print(f"📦 Importing {len(items)} items from {filepath}...")
+        with self._transaction() as conn:
+            self._insert(conn, doc, items)
+            conn.execute("INSERT INTO meta (key, value) VALUES (?, ?)", (marker, filepath))
+
+    def _assign_missing_ids(self, doc):
+        """Give rows stored before ids existed one: their own "id" if they have it, else the next free one"""
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT seq, data FROM items WHERE doc = ? AND item_id IS NULL ORDER BY seq", (doc,)
+            ).fetchall()
+            if not rows:
+                return
+            version = self._bump_version(conn, doc)
+            items = [(seq, json.loads(data)) for seq, data in rows]
+            for seq, item in items:
+                if "id" in item:
+                    conn.execute(
+                        "UPDATE items SET item_id = ?, version = ? WHERE seq = ?", (item["id"], version, seq)
+                    )
+            missing = [(seq, item) for seq, item in items if "id" not in item]
+            if missing:
+                first = self._next_ids(conn, doc, len(missing))
+                for offset, (seq, item) in enumerate(missing):
+                    item["id"] = first + offset
+                    conn.execute(
+                        "UPDATE items SET item_id = ?, data = ?, version = ? WHERE seq = ?",
+                        (item["id"], json.dumps(item), version, seq)
+                    )
+
+    def _transaction(self):
+        return _Transaction(self._conn())
+
+    def _meta_int(self, conn, key):
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return int(row[0]) if row else None
+
+    def _set_meta(self, conn, key, value):
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def _bump_version(self, conn, doc):
+        """Next version of a document; call once per write transaction"""
+        version = (self._meta_int(conn, f"version:{doc}") or 0) + 1
+        self._set_meta(conn, f"version:{doc}", version)
+        return version
+
+    def _next_ids(self, conn, doc, n):
+        """Reserve n ids for a document and return the first; ids are never reused"""
+        first = self._meta_int(conn, f"next_id:{doc}")
+        if first is None:
+            highest = conn.execute(
+                "SELECT MAX(item_id) FROM items WHERE doc = ? AND typeof(item_id) = 'integer'", (doc,)
+            ).fetchone()[0]
+            first = (highest or 0) + 1
+        self._set_meta(conn, f"next_id:{doc}", first + n)
+        return first
+
+    def _insert(self, conn, doc, items):
+        """Insert items at the end of a document, assigning ids, as a new version"""
+        version = self._bump_version(conn, doc)
+        missing = [item for item in items if "id" not in item]
+        if missing:
+            first = self._next_ids(conn, doc, len(missing))
+            for offset, item in enumerate(missing):
+                item["id"] = first + offset
+        conn.executemany(
+            "INSERT INTO items (doc, data, item_id, version) VALUES (?, ?, ?, ?)",
+            [(doc, json.dumps(item), item["id"], version) for item in items]
+        )
+        return version
+
+    def _delete(self, conn, doc, where, params):
+        """Delete rows of a document matching where, leaving tombstones for their ids"""
+        version = self._bump_version(conn, doc)
+        conn.execute(
+            f"INSERT INTO tombstones (doc, item_id, version) "
+            f"SELECT doc, item_id, ? FROM items WHERE doc = ? AND {where}",
+            (version, doc, *params)
+        )
+        conn.execute(f"DELETE FROM items WHERE doc = ? AND {where}", (doc, *params))
+        # Forget the oldest tombstones; clients that synced before them must reload
+        oldest_kept = conn.execute(
+            "SELECT version FROM tombstones WHERE doc = ? ORDER BY version DESC LIMIT 1 OFFSET ?",
+            (doc, self.MAX_TOMBSTONES)
+        ).fetchone()
+        if oldest_kept:
+            conn.execute("DELETE FROM tombstones WHERE doc = ? AND version <= ?", (doc, oldest_kept[0]))
+            self._set_meta(conn, f"tombstone_floor:{doc}", oldest_kept[0])
+
+    def load(self, filepath):
+        return {list_key(filepath): self.items(filepath)}
+
+    def save(self, filepath, data):
+        """Replace a whole document (kept for callers that still rewrite everything)"""
+        try:
+            with self._transaction() as conn:
+                self._replace(conn, filepath, data)
+        except sqlite3.Error as e:
+            print(f"❌ Error saving {filepath}: {e}")
+
+    def _replace(self, conn, filepath, data):
+        doc = doc_name(filepath)
+        self._delete(conn, doc, "1", ())
+        items = data.get(list_key(filepath), [])
+        # Items that survive the rewrite keep their id, so they aren't reported as deleted
+        kept = [item["id"] for item in items if "id" in item]
+        if kept:
+            placeholders = ",".join("?" * len(kept))
+            conn.execute(
+                f"DELETE FROM tombstones WHERE doc = ? AND version = ? AND item_id IN ({placeholders})",
+                (doc, self._meta_int(conn, f"version:{doc}"), *kept)
+            )
+        self._insert(conn, doc, items)
+
+    @contextmanager
+    def update(self, filepath):
+        """Read-modify-write of a whole document inside one write transaction"""
+        with self._transaction() as conn:
+            data = self.load(filepath)
+            yield data
+            self._replace(conn, filepath, data)
+
+    def items(self, filepath):
+        rows = self._conn().execute(
+            "SELECT data FROM items WHERE doc = ? ORDER BY seq", (doc_name(filepath),)
+        )
+        return [json.loads(data) for (data,) in rows]
+
+    def append(self, filepath, item):
+        """Append one item, giving it the next id if it has none"""
+        with self._transaction() as conn:
+            self._insert(conn, doc_name(filepath), [item])
+        return item
+
+    def extend(self, filepath, items):
+        with self._transaction() as conn:
+            self._insert(conn, doc_name(filepath), items)
+
+    def tail(self, filepath, n):
+        if n <= 0:
+            return []
+        rows = self._conn().execute(
+            "SELECT data FROM items WHERE doc = ? ORDER BY seq DESC LIMIT ?",
+            (doc_name(filepath), n)
+        ).fetchall()
+        return [json.loads(data) for (data,) in reversed(rows)]
+
+    def items_from(self, filepath, start):
+        """Items at position start and later"""
+        rows = self._conn().execute(
+            "SELECT data FROM items WHERE doc = ? ORDER BY seq LIMIT -1 OFFSET ?",
+            (doc_name(filepath), max(start, 0))
+        )
+        return [json.loads(data) for (data,) in rows]
+
+    def count(self, filepath):
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM items WHERE doc = ?", (doc_name(filepath),)
+        ).fetchone()[0]
+
+    def _seq_at(self, conn, doc, index):
+        if index < 0:
+            return None
+        row = conn.execute(
+            "SELECT seq, data FROM items WHERE doc = ? ORDER BY seq LIMIT 1 OFFSET ?",
+            (doc, index)
+        ).fetchone()
+        return row
+
+    def get_at(self, filepath, index):
+        row = self._seq_at(self._conn(), doc_name(filepath), index)
+        return json.loads(row[1]) if row else None
+
+    def set_at(self, filepath, index, item):
+        doc = doc_name(filepath)
+        with self._transaction() as conn:
+            row = self._seq_at(conn, doc, index)
+            if not row:
+                return False
+            item["id"] = json.loads(row[1]).get("id")
+            conn.execute(
+                "UPDATE items SET data = ?, version = ? WHERE seq = ?",
+                (json.dumps(item), self._bump_version(conn, doc), row[0])
+            )
+        return True
+
+    def get_item(self, filepath, item_id):
+        row = self._conn().execute(
+            "SELECT data FROM items WHERE doc = ? AND item_id = ?", (doc_name(filepath), item_id)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update_item(self, filepath, item_id, fields):
+        """Merge fields (except "id") into the item with this id; returns the item or None"""
+        fields = {key: value for key, value in fields.items() if key != "id"}
+        doc = doc_name(filepath)
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT seq, data FROM items WHERE doc = ? AND item_id = ?", (doc, item_id)
+            ).fetchone()
+            if not row:
+                return None
+            item = {**json.loads(row[1]), **fields}
+            conn.execute(
+                "UPDATE items SET data = ?, version = ? WHERE seq = ?",
+                (json.dumps(item), self._bump_version(conn, doc), row[0])
+            )
+        return item
+
+    def trim(self, filepath, keep):
+        doc = doc_name(filepath)
+        with self._transaction() as conn:
+            cutoff = conn.execute(
+                "SELECT seq FROM items WHERE doc = ? ORDER BY seq DESC LIMIT 1 OFFSET ?",
+                (doc, keep)
+            ).fetchone()
+            if cutoff:
+                self._delete(conn, doc, "seq <= ?", (cutoff[0],))
+
+    def page(self, filepath, cursor=None, limit=50, newest_first=False):
+        """
+        Return (items, next_cursor). Keyset pagination on the row order, so
+        pages stay stable while items are appended.
+        """
+        if newest_first:
+            query = "SELECT seq, data FROM items WHERE doc = ? AND seq < ? ORDER BY seq DESC LIMIT ?"
+            after = int(cursor) if cursor else 2 ** 63 - 1
+        else:
+            query = "SELECT seq, data FROM items WHERE doc = ? AND seq > ? ORDER BY seq LIMIT ?"
+            after = int(cursor) if cursor else 0
+        rows = self._conn().execute(query, (doc_name(filepath), after, limit + 1)).fetchall()
+        next_cursor = str(rows[limit - 1][0]) if len(rows) > limit else None
+        return [json.loads(data) for _, data in rows[:limit]], next_cursor
+
+    def version(self, filepath):
+        return str(self._meta_int(self._conn(), f"version:{doc_name(filepath)}") or 0)
+
+    def changes(self, filepath, since):
+        """Items added or changed and ids deleted after version `since`"""
+        doc = doc_name(filepath)
+        # One read transaction, so items, tombstones and version are consistent
+        with _Transaction(self._conn(), "BEGIN") as conn:
+            version = self._meta_int(conn, f"version:{doc}") or 0
+            floor = self._meta_int(conn, f"tombstone_floor:{doc}") or 0
+            try:
+                since = int(since)
+            except (TypeError, ValueError):
+                since = -1
+            if not floor <= since <= version:
+                return {list_key(filepath): [], "deleted": [], "version": str(version), "reset": True}
+            rows = conn.execute(
+                "SELECT data FROM items WHERE doc = ? AND version > ? ORDER BY seq", (doc, since)
+            ).fetchall()
+            deleted = conn.execute(
+                "SELECT DISTINCT item_id FROM tombstones WHERE doc = ? AND version > ?", (doc, since)
+            ).fetchall()
+        return {
+            list_key(filepath): [json.loads(data) for (data,) in rows],
+            "deleted": [item_id for (item_id,) in deleted],
+            "version": str(version),
+            "reset": False,
+        }
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK around a block (plain BEGIN for read snapshots)"""
+
+    def __init__(self, conn, begin="BEGIN IMMEDIATE"):
+        self.conn = conn
+        self.begin = begin
+
+    def __enter__(self):
+        self.conn.execute(self.begin)
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+def create_store(files, backend=STORAGE_BACKEND, directory=None):
+    """
+    Build the configured storage backend. With a directory, all documents
+    (or the database) live in it instead of the working directory.
+    """
+    if backend == "json":
+        return JSONStore(files, directory)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        # Only JSON files inside the directory are imported
+        return SQLiteStore(
+            [os.path.join(directory, f) for f in files],
+            os.path.join(directory, os.path.basename(DATABASE_FILE))
+        )
+    return SQLiteStore(files)
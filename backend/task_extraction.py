@@ -0,0 +1,172 @@
+"""
+Task extraction from AI replies
+
+One linear pass over the reply's lines with precompiled, line-anchored
+patterns (no cross-line lookaheads, so long replies can't backtrack).
+Time-blocked lines ("9:00 AM - 10:30 AM: Deep work", also as a markdown
+heading or table row) win; numbered list items are only used when the
+reply has no time blocks. Clock and time range parsing is cached, since
+replies keep using the same handful of times.
+
+Each task comes back structured: the display text used so far, a title,
+start/end datetimes and a duration when times were given. dedupe()
+drops tasks that are already open.
+"""
+import re
+import functools
+from datetime import date, datetime, time, timedelta
+
+MAX_TASKS = 15
+MIN_TITLE_CHARS = 15
+# Longer lines are prose (or garbage), never a task; skipping them keeps huge replies cheap
+MAX_LINE_CHARS = 500
+
+# Markdown/list decoration in front of a line: "| " (table row), "### ",
+# "- ", "* ", "1. ", "**". Every optional part starts with a non-space
+# character, so runs of whitespace can only be matched one way (no
+# quadratic backtracking).
+_PREFIX = (
+    r'^[ \t]*(?:(?P<table>\|)[ \t]*|#{1,6}[ \t]+)?'
+    r'(?:[-*•][ \t]+|\d{1,3}[.)][ \t]+)?(?:(?:\*\*|__)[ \t]*)?'
+)
+_CLOCK = r'\d{1,2}:\d{2}(?:[ \t]*[ap]\.?m\.?)?|\d{1,2}[ \t]*[ap]\.?m\.?'
+
+TIME_BLOCK = re.compile(
+    _PREFIX
+    + rf'(?P<start>{_CLOCK})'
+    + rf'(?:[ \t]*(?:-|–|—|to)[ \t]*(?P<end>{_CLOCK}))?'
+    + r'[ \t]*(?:(?:\*\*|__)[ \t]*)?[:\-–—|][ \t]*(?P<title>\S.*)$',
+    re.IGNORECASE
+)
+NUMBERED = re.compile(r'^[ \t]*\d{1,3}[.)][ \t]+(?P<title>\S.*)$')
+CLOCK_PARTS = re.compile(r'(\d{1,2})(?::(\d{2}))?[ \t]*(?:([ap])\.?m\.?)?', re.IGNORECASE)
+WHITESPACE = re.compile(r'\s+')
+NOT_WORD = re.compile(r'[^a-z0-9 ]+')
+MERIDIEM = re.compile(r'[ap]\.?m', re.IGNORECASE)
+
+
+def _clean(title):
+    title = ' '.join(title.split())
+    if title[:2] in ('**', '__'):
+        title = title[2:].lstrip()
+    if title[-2:] in ('**', '__'):
+        title = title[:-2].rstrip()
+    return title
+
+
+def _title(match):
+    title = match.group('title')
+    if match.group('table'):
+        # First cell after the time: "| 9:00 | Deep work | high |"
+        title = title.split('|', 1)[0]
+    return _clean(title)
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_clock(text):
+    """'9:30 PM' -> (21, 30, True); the flag says whether AM/PM was given"""
+    match = CLOCK_PARTS.match(text.strip())
+    hour, minute = int(match.group(1)), int(match.group(2) or 0)
+    meridiem = (match.group(3) or '').lower()
+    if meridiem == 'p' and hour < 12:
+        hour += 12
+    elif meridiem == 'a' and hour == 12:
+        hour = 0
+    return hour, minute, bool(meridiem)
+
+
+@functools.lru_cache(maxsize=4096)
+def _time_range(start_text, end_text, day):
+    """Datetimes for a time block; a missing AM/PM is taken from the other end"""
+    try:
+        start_h, start_m, start_has = _parse_clock(start_text)
+        if not end_text:
+            return datetime.combine(day, time(start_h % 24, start_m)), None
+        end_h, end_m, end_has = _parse_clock(end_text)
+        if not start_has and end_has and end_h >= 12 and start_h < 12 and start_h + 12 <= end_h:
+            start_h += 12
+        start = datetime.combine(day, time(start_h % 24, start_m))
+        end = datetime.combine(day, time(end_h % 24, end_m))
+    except ValueError:
+        return None, None
+    if end <= start:
+        # "11:00 - 1:00" without AM/PM means 11 AM to 1 PM; otherwise it runs past midnight
+        end += timedelta(hours=12) if not end_has and end + timedelta(hours=12) > start else timedelta(days=1)
+    return start, end
+
+
+def extract_tasks(text, day=None):
+    """
+    Return up to MAX_TASKS dicts:
+    {"task", "title", "start", "end", "duration_minutes"}; times are
+    ISO datetimes on `day` (default today) or None.
+    """
+    day = day or date.today()
+    timed = []
+    numbered = []
+    previous_start = None
+    for line in (text or '').splitlines():
+        if len(timed) >= MAX_TASKS:
+            break
+        if len(line) > MAX_LINE_CHARS:
+            continue
+        match = TIME_BLOCK.match(line)
+        if match:
+            title = _title(match)
+            if len(title) < MIN_TITLE_CHARS:
+                continue
+            start_text = match.group('start').strip()
+            end_text = (match.group('end') or '').strip()
+            start, end = _time_range(start_text, end_text, day)
+            # Plans run forward: a bare "1:00" after "11:00 - 1:00" is 1 PM, not 1 AM
+            if start and previous_start and start < previous_start and not MERIDIEM.search(start_text):
+                shifted = start + timedelta(hours=12)
+                if shifted >= previous_start:
+                    start, end = shifted, end + timedelta(hours=12) if end else None
+            previous_start = start or previous_start
+            label = f"{start_text} - {end_text}" if end_text else start_text
+            timed.append({
+                "task": f"{label}: {title}",
+                "title": title,
+                "start": start.isoformat() if start else None,
+                "end": end.isoformat() if end else None,
+                "duration_minutes": int((end - start).total_seconds() // 60) if start and end else None,
+            })
+        elif not timed and len(numbered) < MAX_TASKS:
+            match = NUMBERED.match(line)
+            if match:
+                title = _clean(match.group('title'))
+                if len(title) > MIN_TITLE_CHARS:
+                    numbered.append({
+                        "task": title,
+                        "title": title,
+                        "start": None,
+                        "end": None,
+                        "duration_minutes": None,
+                    })
+    return (timed or numbered)[:MAX_TASKS]
+
+
+def normalize_title(title):
+    """Case, punctuation and spacing don't make a task different"""
+    return WHITESPACE.sub(' ', NOT_WORD.sub(' ', (title or '').lower())).strip()
+
+
+def _title_of(task):
+    """Stored title, or the text after the time label for tasks saved before titles existed"""
+    if task.get("title"):
+        return task["title"]
+    match = TIME_BLOCK.match(task.get("task") or '')
+    return match.group('title') if match else task.get("task")
+
+
+def dedupe(new_tasks, existing_tasks):
+    """Drop new tasks whose title matches an open existing task (or an earlier new one)"""
+    seen = {normalize_title(_title_of(task)) for task in existing_tasks if not task.get("completed")}
+    unique = []
+    for task in new_tasks:
+        key = normalize_title(task["title"])
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(task)
+    return unique
@@ -0,0 +1,39 @@
+"""
+The app against the local fakes of every external service (benchmarks/fakes.py),
+with its data in a temporary directory. Run from backend/: python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "benchmarks"))
+
+from fakes import FakeConfig, FakeServices
+
+
+@pytest.fixture(scope="session")
+def app_module(tmp_path_factory):
+    fakes = FakeServices(FakeConfig(
+        llm_first_token_ms=5, tokens_per_s=10_000, tts_base_ms=0, tts_ms_per_char=0, whisper_base_ms=0
+    )).start()
+    workdir = tmp_path_factory.mktemp("daymind")
+    previous = os.getcwd()
+    os.environ.update(fakes.env(), TRACE_SLOW_MS="0", JOB_RETRIES="0")
+    os.environ.pop("WHISPER_SERVER_URL")
+    os.chdir(workdir)
+    import app
+    app.create_app(preload=True)
+    yield app
+    # Snapshots are saved to relative paths, so before leaving workdir
+    app.shutdown()
+    os.chdir(previous)
+    fakes.stop()
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
@@ -0,0 +1,21 @@
+"""/events: the server-sent event stream"""
+
+
+def test_stream_opens_before_the_first_event(client):
+    stream = client.get("/events", headers={"X-User-Id": "hana"}, buffered=False)
+    try:
+        assert stream.headers["Content-Type"].startswith("text/event-stream")
+        assert next(iter(stream.response)).startswith(b": connected")
+    finally:
+        stream.close()
+
+
+def test_published_events_reach_the_stream(client):
+    stream = client.get("/events", headers={"X-User-Id": "hana"}, buffered=False)
+    try:
+        chunks = iter(stream.response)
+        next(chunks)
+        client.post("/tasks/clear", headers={"X-User-Id": "hana"})
+        assert b"event: tasks_cleared" in next(chunks)
+    finally:
+        stream.close()
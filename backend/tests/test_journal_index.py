@@ -0,0 +1,84 @@
+"""Journal search index (journal_index.py)"""
+import pytest
+
+from storage import create_store
+from journal_index import JournalIndex
+
+JOURNAL = "journal.json"
+
+ENTRIES = [
+    {"entry": "Went running by the river before work", "mood": "good", "timestamp": "2024-03-01T07:00:00"},
+    {"entry": "Long meeting, felt tired all afternoon", "mood": "bad", "timestamp": "2024-03-02T18:00:00"},
+    {"entry": "Ran again, the river path is flooded", "mood": "okay", "timestamp": "2024-03-03T07:30:00"},
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = create_store([JOURNAL], directory=str(tmp_path))
+    store.init()
+    store.extend(JOURNAL, [dict(e) for e in ENTRIES])
+    return store
+
+
+def test_save_writes_entries_indexed_since_the_last_snapshot(store, tmp_path):
+    snapshot = str(tmp_path / "journal_index.pkl")
+    index = JournalIndex(store, JOURNAL, snapshot_path=snapshot)
+    index.refresh()
+    index.save()
+
+    reopened = JournalIndex(store, JOURNAL, snapshot_path=snapshot)
+    reopened._load_snapshot()
+    assert len(reopened.entries) == len(ENTRIES)
+    assert reopened.postings == index.postings
+
+
+def test_closing_a_user_saves_their_search_index(app_module, client):
+    client.post("/journal/entry", headers={"X-User-Id": "ivan"}, json={"entry": "quiet sunday", "mood": "good"})
+    user = app_module.users.get("ivan")
+    user.journal_index.refresh()
+    app_module.close_user_data(user)
+
+    reopened = JournalIndex(user.store, app_module.JOURNAL_FILE, snapshot_path=user.journal_index.snapshot_path)
+    reopened._load_snapshot()
+    assert len(reopened.entries) == 1
+
+
+@pytest.fixture
+def index(store):
+    return JournalIndex(store, JOURNAL, snapshot_path="")
+
+
+def texts(results):
+    return [r["entry"] for r in results]
+
+
+def test_entries_matching_more_query_terms_rank_first(index):
+    results, total, _ = index.search("river flooded")
+    assert total == 2
+    assert texts(results) == [ENTRIES[2]["entry"], ENTRIES[0]["entry"]]
+    assert results[0]["score"] > results[1]["score"]
+
+
+def test_terms_match_as_prefixes(index):
+    results, _, _ = index.search("run")
+    assert texts(results) == [ENTRIES[0]["entry"]]
+
+
+def test_mood_and_date_filters(index):
+    assert texts(index.search("river", mood="okay")[0]) == [ENTRIES[2]["entry"]]
+    assert texts(index.search("", date_from="2024-03-02", date_to="2024-03-02")[0]) == [ENTRIES[1]["entry"]]
+
+
+def test_pages_follow_the_cursor(index):
+    first, total, cursor = index.search("", limit=2)
+    second, _, last = index.search("", limit=2, cursor=cursor)
+    assert total == 3 and last is None
+    assert texts(first + second) == [e["entry"] for e in reversed(ENTRIES)]
+
+
+def test_new_entries_are_found_without_a_rebuild(index, store):
+    index.search("river")
+    store.append(JOURNAL, {"entry": "Picnic by the river", "mood": "good", "timestamp": "2024-03-04T12:00:00"})
+    results, total, _ = index.search("picnic")
+    assert total == 1 and index.status()["entries"] == 4
@@ -0,0 +1,74 @@
+"""AI provider router (provider_router.py): failover, hedging, circuit breaking"""
+import time
+
+import pytest
+
+from provider_router import CircuitBreaker, NoProviderAvailable, Provider, ProviderRouter
+
+
+def answer(text, delay=0.0):
+    def call(system_prompt, user_message):
+        time.sleep(delay)
+        return text
+    return call
+
+
+def fail(system_prompt, user_message):
+    raise RuntimeError("503 from provider")
+
+
+def test_next_provider_answers_when_the_first_fails():
+    router = ProviderRouter([Provider("groq", fail), Provider("anthropic", answer("hi"))])
+    assert router.call("system", "hello") == ("anthropic", "hi")
+    assert router.status()["groq"]["failures"] == 1
+
+
+def test_slow_primary_is_hedged():
+    router = ProviderRouter([Provider("groq", answer("slow", 1.0)), Provider("anthropic", answer("fast"))],
+                            hedge_default_ms=50, hedge_min_ms=10)
+    started = time.perf_counter()
+    assert router.call("system", "hello") == ("anthropic", "fast")
+    assert time.perf_counter() - started < 0.5
+    assert router.status()["anthropic"]["hedges_won"] == 1
+
+
+def test_hedge_deadline_follows_recent_p95():
+    provider = Provider("groq", answer("hi"))
+    assert provider.hedge_deadline(default_ms=4000, min_ms=10) == 4
+    for ms in range(100, 130):
+        provider.record(ms, ok=True)
+    assert 0.12 <= provider.hedge_deadline(default_ms=4000, min_ms=10) <= 0.13
+
+
+def test_streamed_first_tokens_do_not_move_the_hedge_deadline():
+    provider = Provider("groq", answer("hi"))
+    for _ in range(30):
+        provider.record(20, ok=True, stream=True)
+    assert provider.hedge_deadline(default_ms=4000, min_ms=10) == 4
+    assert provider.status()["streams"] == 30 and provider.status()["ewma_ttft_ms"] == 20
+
+
+def test_breaker_opens_after_consecutive_failures_and_probes_after_cooldown():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=0.05)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_providers_with_an_open_breaker_are_skipped():
+    broken = Provider("groq", fail)
+    broken.breaker = CircuitBreaker(failure_threshold=1, cooldown=60)
+    router = ProviderRouter([broken, Provider("anthropic", answer("hi"))])
+    router.call("system", "hello")
+    assert [p.name for p in router.available()] == ["anthropic"]
+
+    router.providers = [broken]
+    with pytest.raises(NoProviderAvailable):
+        router.call("system", "hello")
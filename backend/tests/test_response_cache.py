@@ -0,0 +1,73 @@
+"""Response cache (response_cache.py): keys, TTLs and bounds"""
+from datetime import datetime
+
+import response_cache
+from response_cache import ResponseCache
+
+TTLS = {"planning": 900, "general": 3600, "journaling": 0}
+MORNING = datetime(2024, 3, 1, 9, 0)
+
+
+def cache(**kwargs):
+    return ResponseCache(**{"enabled": True, "ttls": TTLS, "ttl_now": 300, "snapshot_path": "", **kwargs})
+
+
+def test_ttl_depends_on_mode_and_message():
+    c = cache()
+    start = MORNING.timestamp()
+    assert c.expiry("general", "how do I stay focused", MORNING) == start + 3600
+    assert c.expiry("planning", "help me plan", MORNING) == start + 900
+    assert c.expiry("general", "what should I do right now", MORNING) == start + 300
+    assert c.expiry("journaling", "I felt tired today", MORNING) is None
+
+
+def test_day_specific_replies_expire_at_midnight():
+    late = datetime(2024, 3, 1, 23, 50)
+    assert cache().expiry("general", "what's left for today", late) == datetime(2024, 3, 2).timestamp()
+
+
+def test_repeats_hit_after_normalization():
+    c = cache()
+    c.put("general", "How do I stay focused?", "Take breaks.")
+    assert c.get("general", "hey, how do I stay focused please") == "Take breaks."
+    assert c.get("planning", "How do I stay focused?") is None
+    assert c.status()["hits"] == 1 and c.status()["misses"] == 1
+
+
+def test_expired_replies_are_not_served(monkeypatch):
+    c = cache()
+    c.put("general", "how do I stay focused", "Take breaks.")
+    now = response_cache.time.time()
+    monkeypatch.setattr(response_cache.time, "time", lambda: now + 3601)
+    assert c.get("general", "how do I stay focused") is None
+    assert c.status()["entries"] == 0
+
+
+def test_journaling_replies_are_not_cached():
+    c = cache()
+    c.put("journaling", "I felt tired today", "That sounds hard.")
+    assert c.get("journaling", "I felt tired today") is None
+
+
+def test_least_recently_used_replies_are_evicted():
+    c = cache(max_entries=2)
+    c.put("general", "first question here", "1")
+    c.put("general", "second question here", "2")
+    c.get("general", "first question here")
+    c.put("general", "third question here", "3")
+    assert c.get("general", "second question here") is None
+    assert c.get("general", "first question here") == "1"
+
+
+def test_disabled_cache_never_answers():
+    c = cache(enabled=False)
+    c.put("general", "how do I stay focused", "Take breaks.")
+    assert c.get("general", "how do I stay focused") is None
+
+
+def test_snapshot_survives_a_restart(tmp_path):
+    path = str(tmp_path / "responses.pkl")
+    c = cache(snapshot_path=path)
+    c.put("general", "how do I stay focused", "Take breaks.")
+    c.save()
+    assert cache(snapshot_path=path).get("general", "how do I stay focused") == "Take breaks."
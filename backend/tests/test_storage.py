@@ -0,0 +1,36 @@
+"""Storage backends (storage.py): item ids, updates and versions"""
+import pytest
+
+from storage import create_store
+
+TASKS = "tasks.json"
+
+
+@pytest.fixture(params=["sqlite", "json"])
+def store(request, tmp_path):
+    store = create_store([TASKS], backend=request.param, directory=str(tmp_path))
+    store.init()
+    return store
+
+
+def test_items_get_stable_ids(store):
+    first = store.append(TASKS, {"task": "write report"})
+    second = store.append(TASKS, {"task": "call mom"})
+    assert [t["id"] for t in store.items(TASKS)] == [first["id"], second["id"]]
+    assert first["id"] != second["id"]
+    assert store.get_item(TASKS, second["id"])["task"] == "call mom"
+
+
+def test_update_item_keeps_the_stored_id(store):
+    task = store.append(TASKS, {"task": "write report"})
+    updated = store.update_item(TASKS, task["id"], {"completed": True, "id": "1"})
+    assert updated == {**task, "completed": True}
+    assert store.get_item(TASKS, task["id"])["id"] == task["id"]
+
+
+def test_version_changes_on_every_write(store):
+    before = store.version(TASKS)
+    task = store.append(TASKS, {"task": "write report"})
+    appended = store.version(TASKS)
+    store.update_item(TASKS, task["id"], {"completed": True})
+    assert len({before, appended, store.version(TASKS)}) == 3
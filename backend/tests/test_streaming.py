@@ -0,0 +1,41 @@
+"""Streamed replies (server-sent events from /chat and /voice)"""
+import time
+
+from users import DEFAULT_USER
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_reply_is_saved_when_the_client_disconnects(app_module, client):
+    user = app_module.users.get("dana")
+    response = client.post("/chat", headers={"X-User-Id": "dana"}, buffered=False,
+                           json={"message": "plan my afternoon", "stream": True})
+    chunks = iter(response.response)
+    assert b"event: token" in next(chunks)
+    response.close()
+
+    def remembered():
+        return [c for c in user.store.items(app_module.MEMORY_FILE) if c["user"] == "plan my afternoon"]
+
+    assert wait_for(remembered)
+    assert len(remembered()[0]["assistant"]) > 100
+    assert not app_module.users.get(DEFAULT_USER).store.items(app_module.MEMORY_FILE)
+
+
+def test_streamed_replies_are_reported_to_the_router(app_module, client):
+    def streams():
+        return sum(p["streams"] for p in app_module.provider_router.status().values())
+
+    before = streams()
+    response = client.post("/chat", json={"message": "stream my evening plan", "stream": True})
+    assert b"event: token" in response.data
+
+    assert streams() == before + 1
+    assert any(p["ewma_ttft_ms"] for p in app_module.provider_router.status().values())
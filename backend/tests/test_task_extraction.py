@@ -0,0 +1,52 @@
+"""Task extraction from AI replies (task_extraction.py)"""
+import json
+import os
+import time
+from datetime import date
+
+import pytest
+
+from task_extraction import extract_tasks, dedupe, MAX_TASKS
+
+DAY = date(2024, 3, 1)
+
+with open(os.path.join(os.path.dirname(__file__), "..", "benchmarks", "task_corpus.json")) as f:
+    CORPUS = json.load(f)
+
+
+@pytest.mark.parametrize("entry", CORPUS, ids=[entry["name"] for entry in CORPUS])
+def test_recorded_replies(entry):
+    tasks = extract_tasks(entry["reply"], DAY)
+    assert [task["title"] for task in tasks] == entry["expected"]
+    if "starts" in entry:
+        assert [task["start"][11:16] if task["start"] else None for task in tasks] == entry["starts"]
+
+
+def test_time_blocks_are_structured():
+    task = extract_tasks("9:00 AM - 10:30 AM: Deep work on the quarterly report", DAY)[0]
+    assert task == {
+        "task": "9:00 AM - 10:30 AM: Deep work on the quarterly report",
+        "title": "Deep work on the quarterly report",
+        "start": "2024-03-01T09:00:00",
+        "end": "2024-03-01T10:30:00",
+        "duration_minutes": 90,
+    }
+
+
+def test_at_most_max_tasks():
+    reply = "\n".join(f"{h % 12 + 1}:00 - {h % 12 + 1}:30: Focus block number {h}" for h in range(40))
+    assert len(extract_tasks(reply, DAY)) == MAX_TASKS
+
+
+def test_huge_replies_stay_linear():
+    reply = " " * 200_000 + "\n" + "9:00 AM" + " " * 100_000 + "\n" + "- " * 50_000
+    started = time.perf_counter()
+    extract_tasks(reply, DAY)
+    assert time.perf_counter() - started < 1
+
+
+def test_dedupe_ignores_case_punctuation_and_completed_tasks():
+    existing = [{"task": "9:00 AM: Write the report!", "completed": False},
+                {"title": "Call the bank today", "completed": True}]
+    new = [{"title": "write the  report"}, {"title": "Call the bank today"}, {"title": "call the bank today."}]
+    assert dedupe(new, existing) == [{"title": "Call the bank today"}]
@@ -0,0 +1,38 @@
+"""/tasks: completing by id, ETags and delta sync"""
+import pytest
+
+USER = {"X-User-Id": "erin"}
+
+
+@pytest.fixture
+def tasks(app_module):
+    store = app_module.users.get("erin").store
+    store.save(app_module.TASKS_FILE, {"tasks": []})
+    return [store.append(app_module.TASKS_FILE, {"task": name, "completed": False})
+            for name in ("write report", "call mom")]
+
+
+@pytest.mark.parametrize("task_id", ["1", True, 1.0, None])
+def test_complete_rejects_ids_that_are_not_integers(client, tasks, task_id):
+    response = client.post("/tasks/complete", headers=USER, json={"id": task_id})
+    assert response.status_code == 400
+    assert [t["id"] for t in client.get("/tasks", headers=USER).get_json()["tasks"]] == [t["id"] for t in tasks]
+
+
+def test_unchanged_tasks_are_not_modified(client, tasks):
+    first = client.get("/tasks", headers=USER)
+    again = client.get("/tasks", headers={**USER, "If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+
+    client.post("/tasks/complete", headers=USER, json={"id": tasks[0]["id"]})
+    changed = client.get("/tasks", headers={**USER, "If-None-Match": first.headers["ETag"]})
+    assert changed.status_code == 200
+
+
+def test_since_returns_only_changed_tasks(client, tasks):
+    version = client.get("/tasks", headers=USER).get_json()["version"]
+    client.post("/tasks/complete", headers=USER, json={"id": tasks[1]["id"]})
+
+    delta = client.get(f"/tasks?since={version}", headers=USER).get_json()
+    assert delta["tasks"] == [{**tasks[1], "completed": True}]
+    assert delta["deleted"] == [] and not delta["reset"]
@@ -0,0 +1,40 @@
+"""Transcription scheduler (transcription.py) without a Whisper model"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from transcription import TranscriptionScheduler, NoSpeechDetected, decode_verdict, _Job
+
+
+def decoded(avg_logprob=-0.3, compression_ratio=1.5, no_speech_prob=0.05):
+    return SimpleNamespace(avg_logprob=avg_logprob, compression_ratio=compression_ratio,
+                           no_speech_prob=no_speech_prob)
+
+
+def test_confident_greedy_decodes_are_kept():
+    assert decode_verdict(decoded()) == "ok"
+
+
+@pytest.mark.parametrize("result", [decoded(compression_ratio=3.1), decoded(avg_logprob=-1.4)])
+def test_repetitive_or_unlikely_decodes_are_retried(result):
+    assert decode_verdict(result) == "retry"
+
+
+def test_likely_silence_is_dropped_not_retried():
+    assert decode_verdict(decoded(avg_logprob=-1.4, no_speech_prob=0.9)) == "silent"
+    assert decode_verdict(decoded(no_speech_prob=0.9)) == "ok"
+
+
+def test_chunks_of_a_clip_are_joined_in_order():
+    job = _Job([np.zeros(1), np.zeros(1), np.zeros(1)])
+    job.results = [{"text": " Buy milk,", "language": "en"}, {"text": ""}, {"text": " then call mom. "}]
+    assert job.result() == {"text": "Buy milk, then call mom.", "language": "en"}
+
+
+def test_silent_clips_never_reach_the_model():
+    manager = SimpleNamespace(server_url=None)
+    scheduler = TranscriptionScheduler(manager)
+    with pytest.raises(NoSpeechDetected):
+        scheduler.transcribe(np.zeros(16000 * 3, dtype=np.float32))
+    assert scheduler.status()["queued"] == 0 and scheduler._worker is None
@@ -0,0 +1,83 @@
+"""Per-user data partitioning (users.py and its use in app.py)"""
+import pytest
+
+from users import DEFAULT_USER, UserData, UserRegistry
+
+
+def as_user(user_id):
+    return {"X-User-Id": user_id}
+
+
+def test_latest_audio_is_per_user(client):
+    reply = client.post("/chat", headers=as_user("alice"),
+                        json={"message": "plan my day", "wait_audio": True}).get_json()
+    assert reply["audio_available"]
+
+    response = client.get("/audio", headers=as_user("alice"))
+    assert response.status_code == 200
+    assert response.data == client.get(f"/audio/{reply['audio_id']}").data
+
+    assert client.get("/audio", headers=as_user("bob")).status_code == 404
+
+
+def test_events_reach_a_stream_whose_user_was_evicted(app_module, client):
+    max_open = app_module.users.max_open
+    app_module.users.max_open = 2
+    # An unknown Last-Event-ID makes the stream start with a resync event
+    # instead of waiting for a keep-alive
+    stream = client.get("/events", headers={**as_user("alice"), "Last-Event-ID": "1000000"}, buffered=False)
+    try:
+        # Only the default user and one other stay open
+        client.get("/tasks", headers=as_user("bob"))
+        client.get("/tasks", headers=as_user("carol"))
+        assert client.post("/tasks/clear", headers=as_user("alice")).status_code == 200
+        chunks = iter(stream.response)
+        assert b"event: resync" in next(chunks)
+        assert b"event: tasks_cleared" in next(chunks)
+    finally:
+        stream.close()
+        app_module.users.max_open = max_open
+
+
+def test_startup_warms_the_default_user(app_module):
+    default = app_module.users.get(DEFAULT_USER)
+    default.store.append(app_module.JOURNAL_FILE, {"entry": "warm me up", "mood": "good"})
+    # As if the app were started by a request from alice (lazy start)
+    app_module.users.activate("alice")
+    app_module._started = False
+    app_module.create_app(preload=True)
+
+    assert app_module.users.current().user_id == "alice"
+    assert any(e["entry"] == "warm me up" for e in default.journal_index.entries)
+
+
+def test_metrics_and_health_cover_every_open_user(app_module, client):
+    client.post("/journal/entry", headers=as_user("frank"), json={"entry": "long walk by the river", "mood": "good"})
+    stream = client.get("/events", headers=as_user("frank"), buffered=False)
+    try:
+        metrics = client.get("/metrics").get_data(as_text=True)
+        assert "daymind_event_subscribers 0" not in metrics
+
+        health = client.get("/health").get_json()
+        entries = sum(u.journal_index.status()["entries"] for u in app_module.users.open_users())
+        assert health["journal_index"]["entries"] == entries
+        assert entries > app_module.users.get(DEFAULT_USER).journal_index.status()["entries"]
+    finally:
+        stream.close()
+
+
+def test_a_user_that_fails_to_open_can_be_opened_again():
+    attempts = []
+
+    def factory(user_id, directory):
+        attempts.append(user_id)
+        if len(attempts) == 1:
+            raise OSError("disk full")
+        return UserData(user_id, directory)
+
+    registry = UserRegistry(factory, max_open=4, root="users")
+    with pytest.raises(OSError):
+        registry.get("gina")
+    assert registry._opening == {}
+    assert registry.get("gina").user_id == "gina"
+    assert registry.status()["open"] == 1
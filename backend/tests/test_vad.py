@@ -0,0 +1,48 @@
+"""Voice activity detection before Whisper (vad.py)"""
+import numpy as np
+
+from vad import VoiceActivityDetector
+
+RATE = 16000
+
+
+def tone(seconds, dbfs, seed=0):
+    """A voiced-sounding signal at a steady level"""
+    t = np.arange(int(seconds * RATE)) / RATE
+    noise = np.random.default_rng(seed).normal(0, 0.05, len(t))
+    signal = np.sin(2 * np.pi * 180 * t) + noise
+    return (signal / np.sqrt(np.mean(signal ** 2)) * 10 ** (dbfs / 20)).astype(np.float32)
+
+
+def silence(seconds, dbfs=-70, seed=1):
+    return (np.random.default_rng(seed).normal(0, 1, int(seconds * RATE)) * 10 ** (dbfs / 20)).astype(np.float32)
+
+
+def test_continuous_speech_is_kept_whole():
+    vad = VoiceActivityDetector(enabled=True)
+    clip = tone(2, -20)
+    chunks = vad.speech_chunks(clip)
+    assert len(chunks) == 1
+    assert len(chunks[0]) >= len(clip) - vad.frame
+
+
+def test_silence_gives_no_chunks():
+    vad = VoiceActivityDetector(enabled=True)
+    assert vad.speech_chunks(silence(3)) == []
+    assert vad.status()["rejected"] == 1
+
+
+def test_long_pauses_are_trimmed():
+    vad = VoiceActivityDetector(enabled=True)
+    clip = np.concatenate([silence(2), tone(1, -20), silence(3, seed=2), tone(1, -20, seed=3), silence(2, seed=4)])
+    chunks = vad.speech_chunks(clip)
+    assert len(chunks) == 1
+    # Both words with their padding, without the seconds of silence around them
+    assert 2 * RATE <= len(chunks[0]) <= 3 * RATE
+
+
+def test_long_speech_is_split_below_the_chunk_limit():
+    vad = VoiceActivityDetector(enabled=True, max_chunk_s=5)
+    chunks = vad.speech_chunks(tone(12, -20))
+    assert len(chunks) == 3
+    assert all(len(chunk) <= 5 * RATE for chunk in chunks)
@@ -0,0 +1,233 @@
+"""
+Batched transcription scheduler
+
+/voice requests submit decoded audio to a bounded queue and wait on a
+per-request future. A single worker thread collects pending clips for up to
+WHISPER_BATCH_WAIT_MS (or until WHISPER_BATCH_SIZE clips are waiting) and
+runs them through Whisper as one padded batch of log-mel spectrograms.
+
+Before that, vad.py trims silence and splits long recordings into speech
+chunks that fit one 30 s window. A clip's chunks are queued as one job, so
+a long recording takes one queue slot, and the worker decodes the chunks
+of every clip in the batch WHISPER_BATCH_SIZE at a time. Silent clips
+raise NoSpeechDetected without touching the model.
+
+The batched decode is greedy (temperature 0). Chunks whose result fails
+the same checks transcribe() applies (compression ratio, average log
+probability) are transcribed again with transcribe() and its temperature
+fallback, so batching doesn't lower the quality of hard clips.
+
+Environment:
+- WHISPER_BATCH_SIZE: max clips per batch, default 8
+- WHISPER_BATCH_WAIT_MS: max time to wait for a batch to fill, default 50
+- WHISPER_QUEUE_SIZE: max pending clips before rejecting, default 32
+- WHISPER_TIMEOUT: seconds a request waits for its transcript, default 120
+"""
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+import numpy as np
+
+from vad import VoiceActivityDetector, NoSpeechDetected
+
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "8"))
+WHISPER_BATCH_WAIT_MS = int(os.getenv("WHISPER_BATCH_WAIT_MS", "50"))
+WHISPER_QUEUE_SIZE = int(os.getenv("WHISPER_QUEUE_SIZE", "32"))
+WHISPER_TIMEOUT = float(os.getenv("WHISPER_TIMEOUT", "120"))
+
+# transcribe()'s defaults for when a greedy decode is retried or dropped
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+class TranscriptionQueueFull(Exception):
+    """Raised when too many clips are already waiting to be transcribed"""
+
+
+def decode_verdict(result):
+    """
+    What transcribe() would do with a greedy DecodingResult: "ok",
+    "retry" at higher temperatures, or "silent" (its text is dropped)
+    """
+    if result.no_speech_prob > NO_SPEECH_THRESHOLD:
+        return "silent" if result.avg_logprob <= LOGPROB_THRESHOLD else "ok"
+    if result.compression_ratio > COMPRESSION_RATIO_THRESHOLD or result.avg_logprob < LOGPROB_THRESHOLD:
+        return "retry"
+    return "ok"
+
+
+class _Job:
+    """One clip: its speech chunks, transcribed in order and joined"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.results = [None] * len(chunks)
+        self.future = Future()
+
+    def result(self):
+        if len(self.results) == 1:
+            return self.results[0]
+        return {
+            "text": " ".join(r["text"].strip() for r in self.results if r["text"].strip()),
+            "language": self.results[0].get("language"),
+        }
+
+
+class TranscriptionScheduler:
+    """Collects clips into batches and transcribes them on one worker thread"""
+
+    def __init__(self, manager, max_batch=WHISPER_BATCH_SIZE,
+                 max_wait_ms=WHISPER_BATCH_WAIT_MS, queue_size=WHISPER_QUEUE_SIZE, vad=None):
+        self.manager = manager
+        self.vad = vad or VoiceActivityDetector()
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.batches = 0
+        self.clips = 0
+        self.fallbacks = 0
+        self._worker = None
+        self._lock = threading.Lock()
+        self._stopping = False
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._stopping = False
+                self._worker = threading.Thread(
+                    target=self._run, name="whisper-batcher", daemon=True
+                )
+                self._worker.start()
+
+    def submit(self, audio):
+        """Queue a float32 16 kHz clip; returns a Future with Whisper's result dict"""
+        return self.submit_chunks([audio])
+
+    def submit_chunks(self, chunks):
+        """Queue the speech chunks of one clip as a single job; the Future has the joined text"""
+        self._ensure_worker()
+        job = _Job(chunks)
+        try:
+            self.queue.put_nowait(job)
+        except queue.Full:
+            raise TranscriptionQueueFull(
+                f"{self.queue.maxsize} clips already waiting for transcription"
+            )
+        return job.future
+
+    def transcribe(self, audio, timeout=WHISPER_TIMEOUT):
+        """
+        Transcribe the speech in a decoded clip, batching with other requests
+        when the model is local. Raises NoSpeechDetected for silent clips.
+        """
+        chunks = self.vad.speech_chunks(audio)
+        if not chunks:
+            raise NoSpeechDetected("No speech detected in the recording")
+        if self.manager.server_url:
+            # Upload only the speech; the server splits it again
+            return self.manager.transcribe(np.concatenate(chunks))
+        future = self.submit_chunks(chunks)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            # Nobody will read it; skip it if it hasn't been picked up yet
+            future.cancel()
+            raise
+
+    def stop(self):
+        """Finish queued work and stop the worker thread"""
+        self._stopping = True
+        if self._worker:
+            self.queue.put(None)
+            self._worker.join()
+
+    def _next_batch(self):
+        job = self.queue.get()
+        if job is None:
+            return None
+        batch = [job]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                job = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if job is None:
+                self._stopping = True
+                break
+            batch.append(job)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._run_batch(batch)
+            except Exception as e:
+                for job in batch:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+            if self._stopping and self.queue.empty():
+                return
+
+    def _run_batch(self, batch):
+        # Requests that timed out while their job was queued
+        batch = [job for job in batch if job.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        import torch
+        import whisper
+
+        model = self.manager.get_model()
+        fp16 = self.manager.use_fp16
+
+        # Only the first 30s window is batched; longer chunks use the
+        # regular sliding-window transcribe
+        pieces = [(job, i, chunk) for job in batch for i, chunk in enumerate(job.chunks)]
+        short = [piece for piece in pieces if len(piece[2]) <= whisper.audio.N_SAMPLES]
+        for job, i, chunk in pieces:
+            if len(chunk) > whisper.audio.N_SAMPLES:
+                job.results[i] = model.transcribe(chunk, fp16=fp16)
+
+        for start in range(0, len(short), self.max_batch):
+            group = short[start:start + self.max_batch]
+            mels = torch.stack([
+                whisper.log_mel_spectrogram(whisper.pad_or_trim(chunk), model.dims.n_mels)
+                for _, _, chunk in group
+            ]).to(model.device)
+            results = whisper.decode(model, mels, whisper.DecodingOptions(fp16=fp16))
+            for (job, i, chunk), result in zip(group, results):
+                verdict = decode_verdict(result)
+                if verdict == "retry":
+                    self.fallbacks += 1
+                    job.results[i] = model.transcribe(chunk, fp16=fp16)
+                else:
+                    text = result.text if verdict == "ok" else ""
+                    job.results[i] = {"text": text, "language": result.language}
+
+        for job in batch:
+            job.future.set_result(job.result())
+        self.batches += 1
+        self.clips += len(batch)
+
+    def status(self):
+        return {
+            "queued": self.queue.qsize(),
+            "max_queue": self.queue.maxsize,
+            "max_batch": self.max_batch,
+            "max_wait_ms": int(self.max_wait * 1000),
+            "batches": self.batches,
+            "clips": self.clips,
+            "fallbacks": self.fallbacks,
+            "vad": self.vad.status(),
+        }
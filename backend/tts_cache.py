@@ -0,0 +1,139 @@
+"""
+Content-addressed TTS cache
+
+Synthesized audio is stored on disk under the SHA-256 of
+(normalized text, voice id, voice settings, model id), so repeated phrases
+(greetings, journal prompts, common replies) skip the ElevenLabs round-trip.
+Least recently used clips are evicted once the cache exceeds its size cap.
+
+Environment:
+- TTS_CACHE_DIR: cache directory, default "tts_cache"
+- TTS_CACHE_MB: size cap, default 256 (0 disables the cache)
+"""
+import os
+import re
+import json
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "tts_cache")
+TTS_CACHE_MB = float(os.getenv("TTS_CACHE_MB", "256"))
+
+EXTENSIONS = {"audio/mpeg": ".mp3", "audio/wav": ".wav"}
+
+
+def normalize_text(text):
+    """Whitespace differences shouldn't produce different audio"""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+class TTSCache:
+    """Disk-backed LRU of synthesized clips keyed by content hash"""
+
+    def __init__(self, directory=TTS_CACHE_DIR, max_bytes=int(TTS_CACHE_MB * 1024 * 1024)):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = max_bytes > 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0
+        self._entries = OrderedDict()  # key -> (path, size), oldest first
+        self._lock = threading.Lock()
+        if self.enabled:
+            os.makedirs(directory, exist_ok=True)
+            self._scan()
+
+    def _scan(self):
+        """Rebuild the LRU order from file access times left by a previous run"""
+        found = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            key, ext = os.path.splitext(name)
+            if ext in EXTENSIONS.values() and os.path.isfile(path):
+                stat = os.stat(path)
+                found.append((stat.st_mtime, key, path, stat.st_size))
+        for _, key, path, size in sorted(found):
+            self._entries[key] = (path, size)
+            self.size += size
+        self._evict()
+
+    @staticmethod
+    def key(text, voice_id, settings, model_id):
+        payload = json.dumps(
+            [normalize_text(text), voice_id, settings, model_id], sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return (bytes, mimetype) or None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        path, _ = entry
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._drop(key)
+            return None
+        mimetype = next((m for m, ext in EXTENSIONS.items() if path.endswith(ext)), "audio/mpeg")
+        return data, mimetype
+
+    def put(self, key, data, mimetype):
+        if not self.enabled or len(data) > self.max_bytes:
+            return
+        path = os.path.join(self.directory, key + EXTENSIONS.get(mimetype, ".mp3"))
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not write TTS cache entry: {e}")
+            return
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (path, len(data))
+            self.size += len(data)
+            self._evict()
+
+    def _evict(self):
+        """Remove least recently used clips until under the size cap"""
+        while self.size > self.max_bytes and self._entries:
+            old_key = next(iter(self._entries))
+            old_path, _ = self._entries[old_key]
+            self._drop(old_key)
+            self.evictions += 1
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self.size -= entry[1]
+
+    def status(self):
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "clips": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
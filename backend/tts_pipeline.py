@@ -0,0 +1,85 @@
+"""
+Sentence-pipelined TTS
+
+While the LLM is still streaming, the reply is cut into sentences and each
+sentence is sent to TTS with bounded concurrency. Finished clips are handed
+back strictly in sentence order, so the first sentence can start playing
+after roughly one sentence's synthesis time.
+
+Environment:
+- TTS_CONCURRENCY: sentences synthesized in parallel, default 3
+"""
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, wait
+
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "3"))
+
+# End of sentence: . ! ? (optionally closed by quotes/brackets) followed by
+# whitespace, or a line break. "9.30" and "e.g.x" are not split.
+SENTENCE_END = re.compile(r'(?<=[.!?])["\')\]]*\s+|\n+')
+
+# Don't send tiny fragments like "1." on their own
+MIN_SENTENCE_CHARS = 20
+
+
+class SentenceSplitter:
+    """Accumulates streamed text and returns complete sentences"""
+
+    def __init__(self, min_chars=MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self.buffer = ""
+
+    def feed(self, chunk):
+        """Add streamed text; returns any sentences completed by it"""
+        self.buffer += chunk
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self.buffer):
+            candidate = self.buffer[start:match.end()].strip()
+            if len(candidate) >= self.min_chars:
+                sentences.append(candidate)
+                start = match.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self):
+        """Return whatever is left once the stream has ended"""
+        rest = self.buffer.strip()
+        self.buffer = ""
+        return [rest] if rest else []
+
+
+class TTSPipeline:
+    """Synthesizes sentences concurrently and yields results in order"""
+
+    def __init__(self, synthesize, max_workers=TTS_CONCURRENCY):
+        self.synthesize = synthesize
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts")
+        self.futures = []
+        self.next_index = 0
+
+    def submit(self, sentence):
+        self.futures.append(self.executor.submit(self.synthesize, sentence))
+
+    def ready(self):
+        """Yield (index, result) for finished clips, stopping at the first unfinished one"""
+        while self.next_index < len(self.futures) and self.futures[self.next_index].done():
+            yield self._take()
+
+    def drain(self):
+        """Wait for and yield all remaining clips in order"""
+        while self.next_index < len(self.futures):
+            wait([self.futures[self.next_index]])
+            yield self._take()
+        self.executor.shutdown(wait=False)
+
+    def _take(self):
+        index = self.next_index
+        self.next_index += 1
+        try:
+            result = self.futures[index].result()
+        except Exception as e:
+            print(f"⚠️ Sentence TTS failed: {e}")
+            result = None
+        return index, result
@@ -0,0 +1,189 @@
+"""
+Per-user data partitioning
+
+Each user has their own storage, search index, journal rollups, semantic
+memory, response cache and event channel, all under one directory:
+
+    USER_DATA_DIR/<shard>/<user id>/
+
+where the shard is the first two hex digits of the user id's SHA-1, so no
+directory holds more than a few thousand users. Requests for different
+users never touch the same files or locks.
+
+Users are identified per request by (first match wins):
+- Authorization: Bearer <token> (or ?token= for EventSource/WebSocket).
+  The token is an opaque secret the client generates; the user id is
+  derived from its hash, so tokens are never stored.
+- X-User-Id: <id> (or ?user_id=), for deployments behind a proxy that
+  authenticates users itself
+Requests with neither use the "default" user, which keeps the original
+shared files (DATABASE_FILE, MEMORY_INDEX_DIR, ...) in the working
+directory.
+
+Open user data sets are kept in an LRU of USER_CACHE_SIZE; opening one is
+serialized per user, not globally.
+
+Environment:
+- USER_DATA_DIR: root directory of per-user data, default "users"
+- USER_CACHE_SIZE: user data sets kept open per process, default 256
+"""
+import os
+import re
+import hashlib
+import threading
+import contextvars
+from collections import OrderedDict
+
+USER_DATA_DIR = os.getenv("USER_DATA_DIR", "users")
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "256"))
+
+DEFAULT_USER = "default"
+USER_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+_current = contextvars.ContextVar("user", default=None)
+
+
+class InvalidUser(ValueError):
+    """Raised for a malformed user id or token"""
+
+
+def user_id_for_token(token):
+    """Stable user id for a client token"""
+    if not token or len(token) < 16:
+        raise InvalidUser("Tokens must be at least 16 characters")
+    return "t" + hashlib.sha256(token.encode("utf-8")).hexdigest()[:32]
+
+
+def resolve_user_id(headers, args):
+    """User id of a request from its headers and query arguments"""
+    auth = headers.get("Authorization", "")
+    token = auth[7:].strip() if auth.lower().startswith("bearer ") else args.get("token")
+    if token:
+        return user_id_for_token(token)
+    user_id = headers.get("X-User-Id") or args.get("user_id")
+    if not user_id:
+        return DEFAULT_USER
+    if not USER_ID.match(user_id):
+        raise InvalidUser("User ids are 1-64 letters, digits, '-' or '_'")
+    return user_id
+
+
+def user_directory(user_id, root=USER_DATA_DIR):
+    """Where a user's data lives (None for the default user's shared files)"""
+    if user_id == DEFAULT_USER:
+        return None
+    shard = hashlib.sha1(user_id.encode("utf-8")).hexdigest()[:2]
+    return os.path.join(root, shard, user_id)
+
+
+class UserData:
+    """Everything kept for one user; the app's factory fills in the parts"""
+
+    def __init__(self, user_id, directory):
+        self.user_id = user_id
+        self.directory = directory
+
+
+class UserRegistry:
+    """
+    LRU of open UserData. factory(user_id, directory) builds one and
+    close(user) flushes one that is evicted; a user being opened by one
+    thread makes other threads wait for that user only.
+    """
+
+    def __init__(self, factory, close=None, max_open=USER_CACHE_SIZE, root=USER_DATA_DIR):
+        self.factory = factory
+        self.close = close
+        self.max_open = max_open
+        self.root = root
+        self.opened = 0
+        self.evicted = 0
+        self._users = OrderedDict()
+        self._opening = {}      # user id -> lock held while it is being opened
+        self._lock = threading.Lock()
+
+    def get(self, user_id=DEFAULT_USER):
+        with self._lock:
+            user = self._users.get(user_id)
+            if user is not None:
+                self._users.move_to_end(user_id)
+                return user
+            opening = self._opening.setdefault(user_id, threading.Lock())
+        with opening:
+            with self._lock:
+                user = self._users.get(user_id)
+                if user is not None:
+                    return user
+            try:
+                user = self.factory(user_id, user_directory(user_id, self.root))
+            except Exception:
+                with self._lock:
+                    self._opening.pop(user_id, None)
+                raise
+            evicted = []
+            with self._lock:
+                self._users[user_id] = user
+                self.opened += 1
+                self._opening.pop(user_id, None)
+                # The default user backs startup warm-ups and is never evicted
+                while len(self._users) > max(self.max_open, 2):
+                    oldest = next(uid for uid in self._users if uid != DEFAULT_USER)
+                    evicted.append(self._users.pop(oldest))
+                    self.evicted += 1
+            for old in evicted:
+                self._close(old)
+            return user
+
+    def _close(self, user):
+        if self.close:
+            try:
+                self.close(user)
+            except Exception as e:
+                print(f"⚠️ Could not close data of user {user.user_id}: {e}")
+
+    def close_all(self):
+        """Flush every open user (at shutdown)"""
+        for user in self.open_users():
+            self._close(user)
+
+    def open_users(self):
+        """The user data sets open right now"""
+        with self._lock:
+            return list(self._users.values())
+
+    def current(self):
+        """The user of the request (or job) being handled"""
+        user = _current.get()
+        return user if user is not None else self.get(DEFAULT_USER)
+
+    def activate(self, user_id):
+        """Make user_id the current user of this thread/context"""
+        return self.use(self.get(user_id))
+
+    def use(self, user):
+        """Make an already open user current, e.g. inside a streamed response"""
+        _current.set(user)
+        return user
+
+    def status(self):
+        return {
+            "open": len(self._users),
+            "max_open": self.max_open,
+            "opened": self.opened,
+            "evicted": self.evicted,
+        }
+
+
+class CurrentUser:
+    """
+    Stands in for one attribute of the current user's data, e.g.
+    store = CurrentUser(registry, "store") forwards store.items(...) to
+    the requesting user's store.
+    """
+
+    def __init__(self, registry, attribute):
+        self._registry = registry
+        self._attribute = attribute
+
+    def __getattr__(self, name):
+        return getattr(getattr(self._registry.current(), self._attribute), name)
@@ -0,0 +1,173 @@
+"""
+Energy-based voice activity detection before Whisper
+
+Whisper pads every clip to 30 s windows and decodes silence at full cost.
+speech_chunks() runs on the decoded float32 samples first:
+
+- frames of VAD_FRAME_MS are marked as speech when their energy is
+  VAD_MARGIN_DB above the clip's noise floor (and above VAD_MIN_DB); a
+  clip with less range than that is all speech or all silence, and
+  VAD_MIN_DB alone decides which
+- speech is padded by VAD_PAD_MS, pauses shorter than VAD_MIN_SILENCE_MS
+  are kept, blips shorter than VAD_MIN_SPEECH_MS are dropped
+- the remaining segments are packed into chunks of at most VAD_MAX_CHUNK_S,
+  so a long note becomes several short clips that are decoded together in
+  one batch instead of one after another
+
+A clip without speech gives no chunks, and the model is never called.
+
+Environment:
+- VAD_ENABLED: default true
+- VAD_FRAME_MS / VAD_PAD_MS: default 30 / 200
+- VAD_MIN_SPEECH_MS / VAD_MIN_SILENCE_MS: default 120 / 600
+- VAD_MARGIN_DB / VAD_MIN_DB: default 10 / -45 (dBFS)
+- VAD_MAX_CHUNK_S: default 28, below Whisper's 30 s window
+"""
+import os
+import threading
+
+import numpy as np
+
+from audio import SAMPLE_RATE
+
+VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() == "true"
+VAD_FRAME_MS = int(os.getenv("VAD_FRAME_MS", "30"))
+VAD_PAD_MS = int(os.getenv("VAD_PAD_MS", "200"))
+VAD_MIN_SPEECH_MS = int(os.getenv("VAD_MIN_SPEECH_MS", "120"))
+VAD_MIN_SILENCE_MS = int(os.getenv("VAD_MIN_SILENCE_MS", "600"))
+VAD_MARGIN_DB = float(os.getenv("VAD_MARGIN_DB", "10"))
+VAD_MIN_DB = float(os.getenv("VAD_MIN_DB", "-45"))
+VAD_MAX_CHUNK_S = float(os.getenv("VAD_MAX_CHUNK_S", "28"))
+
+
+class NoSpeechDetected(Exception):
+    """Raised when a clip contains nothing but silence"""
+
+
+def _runs(mask):
+    """(start, end) frame ranges where mask is True"""
+    edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+    return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+
+class VoiceActivityDetector:
+    """Finds speech in float32 16 kHz samples and keeps trimming stats"""
+
+    def __init__(self, frame_ms=VAD_FRAME_MS, pad_ms=VAD_PAD_MS, min_speech_ms=VAD_MIN_SPEECH_MS,
+                 min_silence_ms=VAD_MIN_SILENCE_MS, margin_db=VAD_MARGIN_DB, min_db=VAD_MIN_DB,
+                 max_chunk_s=VAD_MAX_CHUNK_S, sample_rate=SAMPLE_RATE, enabled=VAD_ENABLED):
+        self.frame = int(sample_rate * frame_ms / 1000)
+        self.pad_frames = max(0, round(pad_ms / frame_ms))
+        self.min_speech_frames = max(1, round(min_speech_ms / frame_ms))
+        self.min_silence_frames = max(1, round(min_silence_ms / frame_ms))
+        self.margin_db = margin_db
+        self.min_db = min_db
+        self.max_chunk = int(max_chunk_s * sample_rate)
+        self.sample_rate = sample_rate
+        self.enabled = enabled
+        self.clips = 0
+        self.rejected = 0
+        self.audio_seconds = 0.0
+        self.speech_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def frame_db(self, samples):
+        """Energy of each frame in dBFS"""
+        n = len(samples) // self.frame
+        if n == 0:
+            return np.zeros(0)
+        frames = samples[:n * self.frame].reshape(n, self.frame).astype(np.float64)
+        rms = np.sqrt(np.mean(frames ** 2, axis=1))
+        return 20 * np.log10(rms + 1e-10)
+
+    def threshold(self, db):
+        """Energy (dBFS) above which a frame counts as speech"""
+        floor, peak = np.percentile(db, [5, 95])
+        # Speech has pauses between words, so the quietest frames are the
+        # room; without pauses (continuous speech, or no speech at all) there
+        # is no room level to compare with
+        if peak - floor < self.margin_db:
+            return self.min_db
+        return max(self.min_db, floor + self.margin_db)
+
+    def segments(self, samples):
+        """Speech as (start, end) sample ranges"""
+        db = self.frame_db(samples)
+        if not len(db):
+            return []
+        speech = db > self.threshold(db)
+
+        # Drop clicks, then pad what is left and bridge short pauses
+        for start, end in _runs(speech):
+            if end - start < self.min_speech_frames:
+                speech[start:end] = False
+        if not speech.any():
+            return []
+        if self.pad_frames:
+            kernel = np.ones(2 * self.pad_frames + 1, dtype=np.int8)
+            speech = np.convolve(speech.astype(np.int8), kernel, mode="same") > 0
+        for start, end in _runs(~speech):
+            if start > 0 and end < len(speech) and end - start < self.min_silence_frames:
+                speech[start:end] = True
+
+        return [(start * self.frame, min(end * self.frame, len(samples))) for start, end in _runs(speech)]
+
+    def _split(self, samples, db):
+        """Cut a segment longer than max_chunk at its quietest frames"""
+        pieces = []
+        frames_per_chunk = self.max_chunk // self.frame
+        search = max(1, frames_per_chunk // 5)
+        offset = 0
+        while len(samples) - offset > self.max_chunk:
+            first = offset // self.frame
+            window = db[first + frames_per_chunk - search:first + frames_per_chunk]
+            cut = (first + frames_per_chunk - search + int(np.argmin(window))) * self.frame
+            pieces.append(samples[offset:cut])
+            offset = cut
+        pieces.append(samples[offset:])
+        return pieces
+
+    def speech_chunks(self, samples):
+        """
+        Speech of a clip as a list of float32 clips of at most max_chunk
+        samples each; empty when the clip is silent. Long pauses between
+        segments are removed.
+        """
+        samples = np.asarray(samples, dtype=np.float32)
+        if not self.enabled:
+            return [samples] if len(samples) else []
+
+        segments = self.segments(samples)
+        pieces = []
+        for start, end in segments:
+            if end - start > self.max_chunk:
+                pieces.extend(self._split(samples[start:end], self.frame_db(samples[start:end])))
+            else:
+                pieces.append(samples[start:end])
+
+        # Pack consecutive segments into as few chunks as fit
+        chunks, current, size = [], [], 0
+        for piece in pieces:
+            if current and size + len(piece) > self.max_chunk:
+                chunks.append(np.concatenate(current))
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece)
+        if current:
+            chunks.append(np.concatenate(current))
+
+        with self._lock:
+            self.clips += 1
+            self.rejected += not chunks
+            self.audio_seconds += len(samples) / self.sample_rate
+            self.speech_seconds += sum(len(chunk) for chunk in chunks) / self.sample_rate
+        return chunks
+
+    def status(self):
+        return {
+            "enabled": self.enabled,
+            "clips": self.clips,
+            "rejected": self.rejected,
+            "audio_seconds": round(self.audio_seconds, 1),
+            "speech_seconds": round(self.speech_seconds, 1),
+        }
@@ -0,0 +1,180 @@
+"""
+Incremental transcription of audio that is still being recorded
+
+The /voice/stream WebSocket feeds 16 kHz PCM into a StreamingTranscriber
+while the user talks. A worker thread re-transcribes the open window
+every VOICE_PARTIAL_INTERVAL_MS of new audio and reports a partial
+transcript. Once the window reaches VOICE_WINDOW_S it is committed and the
+next one starts VOICE_OVERLAP_S earlier, so words cut at the boundary are
+heard in full; the words both windows agree on are merged away.
+
+End of speech is detected from frame energy (the same threshold as
+vad.py): VOICE_END_SILENCE_MS of quiet after speech. finish() then only
+has to transcribe the last, short window.
+
+Environment:
+- VOICE_PARTIAL_INTERVAL_MS: new audio between partial transcripts, default 1000
+- VOICE_WINDOW_S / VOICE_OVERLAP_S: sliding window and its overlap, default 20 / 1.5
+- VOICE_END_SILENCE_MS: silence that ends an utterance, default 900
+- VOICE_MAX_S: longest accepted recording, default 300
+"""
+import os
+import re
+import threading
+
+import numpy as np
+
+from audio import SAMPLE_RATE
+from vad import NoSpeechDetected
+
+VOICE_PARTIAL_INTERVAL_MS = int(os.getenv("VOICE_PARTIAL_INTERVAL_MS", "1000"))
+VOICE_WINDOW_S = float(os.getenv("VOICE_WINDOW_S", "20"))
+VOICE_OVERLAP_S = float(os.getenv("VOICE_OVERLAP_S", "1.5"))
+VOICE_END_SILENCE_MS = int(os.getenv("VOICE_END_SILENCE_MS", "900"))
+VOICE_MAX_S = float(os.getenv("VOICE_MAX_S", "300"))
+
+
+class RecordingTooLong(Exception):
+    """Raised when a stream goes past VOICE_MAX_S of audio"""
+
+
+def _norm(word):
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def merge_overlap(committed, words, max_overlap=12):
+    """
+    Append words to committed, dropping the longest run at the start of
+    words that repeats the end of committed (the overlapping audio)
+    """
+    tail = [_norm(w) for w in committed[-max_overlap:]]
+    head = [_norm(w) for w in words[:max_overlap]]
+    for k in range(min(len(tail), len(head)), 0, -1):
+        if tail[-k:] == head[:k]:
+            return committed + words[k:]
+    return committed + words
+
+
+def pcm16_to_float(data):
+    """Little-endian 16-bit mono PCM bytes -> float32 samples"""
+    return np.frombuffer(data, "<i2").astype(np.float32) / 32768.0
+
+
+class StreamingTranscriber:
+    """Sliding-window transcription of one recording, fed chunk by chunk"""
+
+    def __init__(self, scheduler, on_partial=None, sample_rate=SAMPLE_RATE,
+                 partial_interval_ms=VOICE_PARTIAL_INTERVAL_MS, window_s=VOICE_WINDOW_S,
+                 overlap_s=VOICE_OVERLAP_S, end_silence_ms=VOICE_END_SILENCE_MS, max_s=VOICE_MAX_S):
+        self.scheduler = scheduler
+        self.vad = scheduler.vad
+        self.on_partial = on_partial
+        self.sample_rate = sample_rate
+        self.partial_interval = int(partial_interval_ms * sample_rate / 1000)
+        self.window = int(window_s * sample_rate)
+        self.overlap = int(overlap_s * sample_rate)
+        self.end_silence_frames = max(1, int(end_silence_ms / 1000 * sample_rate / self.vad.frame))
+        self.max_samples = int(max_s * sample_rate)
+
+        self.committed = []         # words of finished windows
+        self.partial = ""
+        self.ended = False          # end of speech detected
+        self.total_samples = 0
+        self.language = None
+
+        self._audio = np.zeros(0, dtype=np.float32)    # from the start of the open window
+        self._new = 0                                  # samples since the last partial
+        self._frame_db = []
+        self._unframed = np.zeros(0, dtype=np.float32)
+        self._heard_speech = False
+        self._quiet_frames = 0
+        self._finishing = False
+        self._error = None
+        self._cond = threading.Condition()
+        self._worker = threading.Thread(target=self._run, name="voice-stream", daemon=True)
+        self._worker.start()
+
+    def feed(self, samples):
+        """Add float32 samples; returns True once end of speech was detected"""
+        with self._cond:
+            if self.total_samples + len(samples) > self.max_samples:
+                raise RecordingTooLong(f"Recordings are limited to {self.max_samples // self.sample_rate}s")
+            self._audio = np.concatenate([self._audio, samples])
+            self.total_samples += len(samples)
+            self._new += len(samples)
+            self._detect_end(samples)
+            self._cond.notify()
+            return self.ended
+
+    def _detect_end(self, samples):
+        framed = np.concatenate([self._unframed, samples])
+        usable = len(framed) - len(framed) % self.vad.frame
+        self._unframed = framed[usable:]
+        db = self.vad.frame_db(framed[:usable])
+        self._frame_db.extend(db.tolist())
+        threshold = self.vad.threshold(np.array(self._frame_db)) if self._frame_db else None
+        for value in db:
+            if value > threshold:
+                self._heard_speech = True
+                self._quiet_frames = 0
+            else:
+                self._quiet_frames += 1
+        if self._heard_speech and self._quiet_frames >= self.end_silence_frames:
+            self.ended = True
+
+    def _transcribe(self, audio):
+        try:
+            result = self.scheduler.transcribe(audio)
+        except NoSpeechDetected:
+            return []
+        self.language = self.language or result.get("language")
+        return result["text"].split()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._finishing and self._new < self.partial_interval:
+                    self._cond.wait()
+                if self._finishing:
+                    return
+                self._new = 0
+                audio = self._audio
+            try:
+                if len(audio) >= self.window:
+                    words = self._transcribe(audio[:self.window])
+                    with self._cond:
+                        self.committed = merge_overlap(self.committed, words)
+                        # The next window starts a little before this one ended
+                        self._audio = self._audio[self.window - self.overlap:]
+                        self._new = len(self._audio)
+                    text = " ".join(self.committed)
+                else:
+                    text = " ".join(merge_overlap(self.committed, self._transcribe(audio)))
+            except Exception as e:
+                self._error = e
+                return
+            self.partial = text
+            if self.on_partial and text:
+                self.on_partial(text)
+
+    def finish(self):
+        """Stop partials and return the final transcript ("" if nothing was said)"""
+        with self._cond:
+            self._finishing = True
+            self._cond.notify()
+        self._worker.join()
+        if self._error:
+            raise self._error
+        words = self.committed
+        # Whatever is left after the last committed window is short
+        for start in range(0, len(self._audio), self.window - self.overlap):
+            words = merge_overlap(words, self._transcribe(self._audio[start:start + self.window]))
+            if start + self.window >= len(self._audio):
+                break
+        return " ".join(words)
+
+    def close(self):
+        """Abandon the stream (client went away)"""
+        with self._cond:
+            self._finishing = True
+            self._cond.notify()
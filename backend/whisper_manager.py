@@ -0,0 +1,159 @@
+"""
+Lazy Whisper model manager
+
+The model is loaded on first use (or in the background at startup with
+WHISPER_PRELOAD=true) instead of at import time, so workers that never
+handle /voice never pay for torch weights.
+
+Environment:
+- WHISPER_MODEL: model size (tiny, base, small, ...), default "base"
+- WHISPER_DEVICE: "cpu", "cuda" or "auto" (default)
+- WHISPER_DTYPE: "fp32", "fp16" (GPU) or "int8" (CPU dynamic quantization)
+- WHISPER_THREADS: torch intra-op threads, 0 = torch default
+- WHISPER_PRELOAD: start loading in a background thread at startup
+- WHISPER_SERVER_URL: send audio to a shared whisper_server.py instead of
+  loading a model copy in every worker
+"""
+import os
+import time
+import threading
+
+from http_client import HTTPClient
+
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "auto")
+WHISPER_DTYPE = os.getenv("WHISPER_DTYPE", "fp32")
+WHISPER_THREADS = int(os.getenv("WHISPER_THREADS", "0"))
+WHISPER_PRELOAD = os.getenv("WHISPER_PRELOAD", "false").lower() == "true"
+WHISPER_SERVER_URL = os.getenv("WHISPER_SERVER_URL")
+
+
+def resident_memory_mb():
+    """Current resident set size of this process in MB (None if unknown)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS reports bytes, Linux kilobytes
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    except ImportError:
+        return None
+
+
+class WhisperManager:
+    """Loads one Whisper model per process, lazily and in the background"""
+
+    def __init__(self, model_name=WHISPER_MODEL, device=WHISPER_DEVICE,
+                 dtype=WHISPER_DTYPE, threads=WHISPER_THREADS, server_url=WHISPER_SERVER_URL):
+        self.model_name = model_name
+        self.device = device
+        self.dtype = dtype
+        self.threads = threads
+        self.server_url = server_url.rstrip("/") if server_url else None
+        self.model = None
+        self.state = "remote" if self.server_url else "not_loaded"
+        self.error = None
+        self.load_seconds = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._http = HTTPClient(read_timeout=120) if self.server_url else None
+
+    def _claim_loading(self):
+        with self._lock:
+            if self.server_url or self.state != "not_loaded":
+                return False
+            self.state = "loading"
+            return True
+
+    def start_loading(self):
+        """Kick off loading in a background thread (no-op if already started)"""
+        if self._claim_loading():
+            threading.Thread(target=self._load, name="whisper-loader", daemon=True).start()
+
+    def load(self):
+        """
+        Load in the calling thread (no-op if already started). Used before a
+        pre-forking server forks, so workers share the weights copy-on-write.
+        """
+        if self._claim_loading():
+            self._load()
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            print(f"🎤 Loading Whisper model '{self.model_name}'...")
+            import torch
+            import whisper
+
+            if self.threads > 0:
+                torch.set_num_threads(self.threads)
+            device = self.device
+            if device == "auto":
+                device = "cuda" if torch.cuda.is_available() else "cpu"
+
+            model = whisper.load_model(self.model_name, device=device)
+            if self.dtype == "int8" and device == "cpu":
+                model = torch.quantization.quantize_dynamic(
+                    model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+            self.device = device
+            self.model = model
+            self.load_seconds = round(time.perf_counter() - start, 2)
+            self.state = "ready"
+            print(f"✅ Whisper loaded in {self.load_seconds}s on {device}")
+        except Exception as e:
+            self.error = str(e)
+            self.state = "error"
+            print(f"❌ Whisper failed to load: {e}")
+        finally:
+            self._ready.set()
+
+    def get_model(self, timeout=None):
+        """Return the loaded model, loading it now if nobody has started yet"""
+        self.start_loading()
+        self._ready.wait(timeout)
+        if self.model is None:
+            raise RuntimeError(f"Whisper model not available: {self.error or self.state}")
+        return self.model
+
+    @property
+    def use_fp16(self):
+        return self.dtype == "fp16" and self.device == "cuda"
+
+    def transcribe(self, audio):
+        """Transcribe float32 16 kHz samples, locally or via the shared model server"""
+        if self.server_url:
+            from audio import encode_wav
+            response = self._http.post(
+                f"{self.server_url}/transcribe",
+                files={"audio": ("clip.wav", encode_wav(audio), "audio/wav")}
+            )
+            response.raise_for_status()
+            return response.json()
+        model = self.get_model()
+        return model.transcribe(audio, fp16=self.use_fp16)
+
+    def status(self):
+        """Readiness info for health checks"""
+        if self.server_url:
+            try:
+                remote = self._http.get(f"{self.server_url}/health", timeout=2).json()
+                return {"state": "remote", "server": self.server_url, "remote": remote.get("whisper")}
+            except Exception as e:
+                return {"state": "remote_unreachable", "server": self.server_url, "error": str(e)}
+        return {
+            "state": self.state,
+            "model": self.model_name,
+            "device": self.device,
+            "dtype": self.dtype,
+            "load_seconds": self.load_seconds,
+            "rss_mb": resident_memory_mb(),
+            "error": self.error,
+        }
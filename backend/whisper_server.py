@@ -0,0 +1,58 @@
+"""
+Shared Whisper inference server
+
+Run one of these per machine and point every DayMind worker at it with
+WHISPER_SERVER_URL=http://localhost:5001, so N workers share one model
+instead of each keeping its own copy in RAM.
+
+    python whisper_server.py
+"""
+import os
+
+from flask import Flask, request, jsonify
+from dotenv import load_dotenv
+
+load_dotenv()
+# This process owns the model, never forward to another server
+os.environ.pop("WHISPER_SERVER_URL", None)
+
+from whisper_manager import WhisperManager
+from transcription import TranscriptionScheduler, TranscriptionQueueFull
+from audio import decode_audio
+from vad import NoSpeechDetected
+
+app = Flask(__name__)
+manager = WhisperManager(server_url=None)
+manager.start_loading()
+scheduler = TranscriptionScheduler(manager)
+
+@app.route('/transcribe', methods=['POST'])
+def transcribe():
+    if 'audio' not in request.files:
+        return jsonify({"error": "No audio file"}), 400
+
+    try:
+        audio = decode_audio(request.files['audio'].read())
+        result = scheduler.transcribe(audio)
+        return jsonify({"text": result["text"], "language": result.get("language")})
+    except NoSpeechDetected as e:
+        return jsonify({"error": str(e), "no_speech": True}), 422
+    except TranscriptionQueueFull as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/health')
+def health():
+    status = manager.status()
+    code = 200 if status["state"] == "ready" else 503
+    return jsonify({
+        "status": "ok" if code == 200 else "starting",
+        "whisper": status,
+        "transcription": scheduler.status()
+    }), code
+
+if __name__ == '__main__':
+    port = int(os.getenv("WHISPER_SERVER_PORT", "5001"))
+    print(f"🎤 Whisper server on http://localhost:{port}")
+    app.run(port=port, host='127.0.0.1', threaded=True)
@@ -0,0 +1,18 @@
+"""
+Production entry point
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+Importing this module initializes storage and runs the startup warm-up
+in the importing process (create_app(preload=True)). With gunicorn's
+preload_app that is the master, before it forks, so the journal index,
+semantic memory and (with WHISPER_PRELOAD=true) the Whisper weights are
+built once and shared by all workers copy-on-write.
+
+Any WSGI server works the same way, e.g. on Windows:
+
+    waitress-serve --port 5000 --threads 16 wsgi:application
+"""
+from app import create_app
+
+application = create_app(preload=True)
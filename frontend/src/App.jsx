@@ -5,6 +5,17 @@ import VoiceButton from './components/VoiceButton';
 import TaskPanel from './components/TaskPanel';
 import JournalTab from './components/JournalTab';
 import VoiceControls from './components/VoiceControls';
+import { subscribe, audioForJob } from './events';
+import { startVoiceStream } from './voiceStream';
+import { authHeaders } from './user';
+
+// Apply a delta from ?since= to a list of items with stable ids
+function mergeById(items, changed = [], deleted = []) {
+  const byId = new Map(items.map(item => [item.id, item]));
+  deleted.forEach(id => byId.delete(id));
+  changed.forEach(item => byId.set(item.id, item));
+  return [...byId.values()].sort((a, b) => a.id - b.id);
+}
 
 function App() {
   const [messages, setMessages] = useState([
@@ -18,6 +29,7 @@ function App() {
   const [isLoading, setIsLoading] = useState(false);
   const [isRecording, setIsRecording] = useState(false);
   const [tasks, setTasks] = useState([]);
+  const tasksVersionRef = useRef(null);
   const [showSidebar, setShowSidebar] = useState(true);
   const [activeTab, setActiveTab] = useState('chat'); // 'chat' or 'journal'
   const [selectedEmotion, setSelectedEmotion] = useState('friendly');
@@ -26,10 +38,12 @@ function App() {
   const [isPlaying, setIsPlaying] = useState(false);
   const [audioProgress, setAudioProgress] = useState(0);
   const audioRef = useRef(null);
+  const audioQueueRef = useRef([]);
   
   const messagesEndRef = useRef(null);
   const mediaRecorderRef = useRef(null);
   const audioChunksRef = useRef([]);
+  const voiceStreamRef = useRef(null);
 
   const API_BASE = 'http://localhost:5000';
 
@@ -50,8 +64,20 @@ function App() {
     scrollToBottom();
   }, [messages]);
 
+  // Tasks are pushed by the server: load on (re)connect and on every change
   useEffect(() => {
-    loadTasks();
+    const resync = () => {
+      tasksVersionRef.current = null;
+      loadTasks();
+    };
+    const unsubscribers = [
+      subscribe('open', loadTasks),
+      subscribe('resync', resync),
+      subscribe('task_added', loadTasks),
+      subscribe('task_updated', loadTasks),
+      subscribe('tasks_cleared', loadTasks)
+    ];
+    return () => unsubscribers.forEach(unsubscribe => unsubscribe());
   }, []);
 
   // Audio playback handlers
@@ -62,6 +88,11 @@ function App() {
     const handlePlay = () => setIsPlaying(true);
     const handlePause = () => setIsPlaying(false);
     const handleEnded = () => {
+      // Streamed replies arrive as one clip per sentence
+      if (audioQueueRef.current.length > 0) {
+        playNextInQueue();
+        return;
+      }
       setIsPlaying(false);
       setAudioProgress(0);
     };
@@ -84,11 +115,22 @@ function App() {
     };
   }, []);
 
+  // Only fetch what changed since the version we already have
   const loadTasks = async () => {
     try {
-      const response = await fetch(`${API_BASE}/tasks`);
+      const since = tasksVersionRef.current;
+      const response = await fetch(
+        since ? `${API_BASE}/tasks?since=${since}` : `${API_BASE}/tasks`,
+        { headers: authHeaders() }
+      );
+      if (response.status === 304) return;
       const data = await response.json();
-      setTasks(data.tasks || []);
+      if (since && data.reset) {
+        tasksVersionRef.current = null;
+        return loadTasks();
+      }
+      setTasks(prev => since ? mergeById(prev, data.tasks, data.deleted) : (data.tasks || []));
+      tasksVersionRef.current = data.version;
     } catch (error) {
       console.error('Error loading tasks:', error);
     }
@@ -108,32 +150,48 @@ function App() {
     setInput('');
     setIsLoading(true);
 
+    // Show the reply as it streams in, token by token
+    const assistantId = `assistant-${Date.now()}`;
+    let started = false;
+    const updateAssistant = (fields) => {
+      if (!started) {
+        started = true;
+        setMessages(prev => [...prev, {
+          id: assistantId,
+          role: 'assistant',
+          content: '',
+          timestamp: new Date().toISOString()
+        }]);
+      }
+      setMessages(prev => prev.map(m => (
+        m.id === assistantId ? { ...m, ...fields(m) } : m
+      )));
+    };
+
     try {
       const response = await fetch(`${API_BASE}/chat`, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers: authHeaders({ 'Content-Type': 'application/json' }),
         body: JSON.stringify({ 
           message: input,
-          emotion: selectedEmotion 
+          emotion: selectedEmotion,
+          stream: true
         })
       });
 
-      const data = await response.json();
-
-      const assistantMessage = {
-        role: 'assistant',
-        content: data.response,
-        timestamp: new Date().toISOString(),
-        audioAvailable: data.audio_available
-      };
-
-      setMessages(prev => [...prev, assistantMessage]);
-
-      if (data.audio_available) {
-        playAudio();
-      }
-
-      loadTasks();
+      await readEventStream(response, (event, data) => {
+        if (event === 'token') {
+          setIsLoading(false);
+          updateAssistant(current => ({ content: current.content + data.text }));
+        } else if (event === 'audio') {
+          enqueueAudio(data.audio_id);
+        } else if (event === 'done') {
+          updateAssistant(() => ({
+            content: data.response,
+            audioAvailable: data.audio_available
+          }));
+        }
+      });
     } catch (error) {
       console.error('Error:', error);
       setMessages(prev => [...prev, {
@@ -147,7 +205,89 @@ function App() {
     }
   };
 
+  // Parse a text/event-stream response, calling onEvent(event, data) per message
+  const readEventStream = async (response, onEvent) => {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const raw = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+
+        let event = 'message';
+        let data = '';
+        for (const line of raw.split('\n')) {
+          if (line.startsWith('event:')) event = line.slice(6).trim();
+          else if (line.startsWith('data:')) data += line.slice(5).trim();
+        }
+        if (data) onEvent(event, JSON.parse(data));
+      }
+    }
+  };
+
+  // Transcript and reply appear while the user is still talking (/voice/stream)
   const startRecording = async () => {
+    const userId = `voice-${Date.now()}`;
+    const assistantId = `assistant-${Date.now()}`;
+    const upsert = (id, role, fields) => setMessages(prev => (
+      prev.some(m => m.id === id)
+        ? prev.map(m => (m.id === id ? { ...m, ...fields(m) } : m))
+        : [...prev, { id, role, content: '', timestamp: new Date().toISOString(), ...fields({ content: '' }) }]
+    ));
+
+    try {
+      voiceStreamRef.current = await startVoiceStream({
+        emotion: selectedEmotion,
+        onEvent: (event, data) => {
+          if (event === 'partial') {
+            upsert(userId, 'user', () => ({ content: data.text, isVoice: true, isPartial: true }));
+          } else if (event === 'speech_end') {
+            setIsRecording(false);
+          } else if (event === 'transcription') {
+            setIsLoading(true);
+            upsert(userId, 'user', () => ({ content: data.text, isVoice: true, isPartial: false }));
+          } else if (event === 'token') {
+            setIsLoading(false);
+            upsert(assistantId, 'assistant', current => ({ content: current.content + data.text }));
+          } else if (event === 'audio') {
+            enqueueAudio(data.audio_id);
+          } else if (event === 'done') {
+            upsert(assistantId, 'assistant', () => ({
+              content: data.response,
+              audioAvailable: data.audio_available
+            }));
+          } else if (event === 'no_speech' || event === 'error') {
+            setMessages(prev => [...prev.filter(m => m.id !== userId), {
+              role: 'assistant',
+              content: event === 'no_speech'
+                ? "I didn't hear anything. Hold the button while you speak."
+                : "Sorry, I had trouble understanding. Please try again.",
+              timestamp: new Date().toISOString(),
+              isError: true
+            }]);
+          } else if (event === 'closed') {
+            setIsRecording(false);
+            setIsLoading(false);
+            voiceStreamRef.current = null;
+          }
+        }
+      });
+      setIsRecording(true);
+    } catch (error) {
+      // Older backends or browsers: record the whole clip and upload it
+      console.warn('Voice streaming unavailable, uploading the clip instead:', error);
+      await startUploadRecording();
+    }
+  };
+
+  const startUploadRecording = async () => {
     try {
       const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
       const mediaRecorder = new MediaRecorder(stream);
@@ -173,7 +313,10 @@ function App() {
   };
 
   const stopRecording = () => {
-    if (mediaRecorderRef.current && isRecording) {
+    if (voiceStreamRef.current && isRecording) {
+      voiceStreamRef.current.stop();
+      setIsRecording(false);
+    } else if (mediaRecorderRef.current && isRecording) {
       mediaRecorderRef.current.stop();
       setIsRecording(false);
     }
@@ -188,11 +331,22 @@ function App() {
     try {
       const response = await fetch(`${API_BASE}/voice`, {
         method: 'POST',
+        headers: authHeaders(),
         body: formData
       });
 
       const data = await response.json();
 
+      if (data.no_speech) {
+        setMessages(prev => [...prev, {
+          role: 'assistant',
+          content: "I didn't hear anything. Hold the button while you speak.",
+          timestamp: new Date().toISOString(),
+          isError: true
+        }]);
+        return;
+      }
+
       const userMessage = {
         role: 'user',
         content: data.transcription,
@@ -210,10 +364,11 @@ function App() {
       setMessages(prev => [...prev, userMessage, assistantMessage]);
 
       if (data.audio_available) {
-        playAudio();
+        playAudio(data.audio_id);
+      } else if (data.audio_job_id) {
+        // The reply is shown right away; its audio plays once synthesized
+        audioForJob(data.audio_job_id).then(audioId => audioId && playAudio(audioId));
       }
-
-      loadTasks();
     } catch (error) {
       console.error('Voice error:', error);
       setMessages(prev => [...prev, {
@@ -227,14 +382,27 @@ function App() {
     }
   };
 
-  const playAudio = () => {
+  const playAudio = (audioId) => {
     if (audioRef.current) {
-      audioRef.current.src = `${API_BASE}/audio?t=${Date.now()}`;
+      audioRef.current.src = `${API_BASE}/audio/${audioId}`;
       audioRef.current.play();
     }
   };
 
+  const playNextInQueue = () => {
+    const next = audioQueueRef.current.shift();
+    if (next) playAudio(next);
+  };
+
+  const enqueueAudio = (audioId) => {
+    audioQueueRef.current.push(audioId);
+    if (audioRef.current && audioRef.current.paused) {
+      playNextInQueue();
+    }
+  };
+
   const stopAudio = () => {
+    audioQueueRef.current = [];
     if (audioRef.current) {
       audioRef.current.pause();
       audioRef.current.currentTime = 0;
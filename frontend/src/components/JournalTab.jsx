@@ -1,5 +1,7 @@
 import { useState, useEffect, useRef } from 'react';
 import './JournalTab.css';
+import { subscribe, audioForJob } from '../events';
+import { authHeaders } from '../user';
 
 function JournalTab() {
   const [entry, setEntry] = useState('');
@@ -29,9 +31,20 @@ function JournalTab() {
     loadRecentEntries();
   }, []);
 
+  // New entries (from this or another tab) are pushed by the server
+  useEffect(() => {
+    const unsubscribers = [
+      subscribe('journal_entry', ({ entry }) => {
+        setRecentEntries(prev => [entry, ...prev.filter(e => e.id !== entry.id)].slice(0, 5));
+      }),
+      subscribe('resync', loadRecentEntries)
+    ];
+    return () => unsubscribers.forEach(unsubscribe => unsubscribe());
+  }, []);
+
   const loadPrompts = async () => {
     try {
-      const response = await fetch(`${API_BASE}/journal/prompts`);
+      const response = await fetch(`${API_BASE}/journal/prompts`, { headers: authHeaders() });
       const data = await response.json();
       setPrompts(data.prompts || []);
     } catch (error) {
@@ -41,9 +54,9 @@ function JournalTab() {
 
   const loadRecentEntries = async () => {
     try {
-      const response = await fetch(`${API_BASE}/journal`);
+      const response = await fetch(`${API_BASE}/journal?limit=5&order=desc`, { headers: authHeaders() });
       const data = await response.json();
-      setRecentEntries((data.entries || []).slice(-5).reverse());
+      setRecentEntries(data.entries || []);
     } catch (error) {
       console.error('Error loading entries:', error);
     }
@@ -65,7 +78,7 @@ function JournalTab() {
     try {
       const response = await fetch(`${API_BASE}/journal/entry`, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers: authHeaders({ 'Content-Type': 'application/json' }),
         body: JSON.stringify({
           entry: entry,
           mood: selectedMood
@@ -76,19 +89,23 @@ function JournalTab() {
 
       setAiResponse(data.ai_response);
       
-      // Play AI voice response if available
-      if (data.audio_available && audioRef.current) {
-        audioRef.current.src = `${API_BASE}/audio?t=${Date.now()}`;
-        audioRef.current.play();
+      // Play AI voice response when it's ready (synthesized after the reply is returned)
+      const playResponse = (audioId) => {
+        if (audioId && audioRef.current) {
+          audioRef.current.src = `${API_BASE}/audio/${audioId}`;
+          audioRef.current.play();
+        }
+      };
+      if (data.audio_available) {
+        playResponse(data.audio_id);
+      } else if (data.audio_job_id) {
+        audioForJob(data.audio_job_id).then(playResponse);
       }
 
       // Clear form
       setEntry('');
       setSelectedMood(null);
 
-      // Reload entries
-      loadRecentEntries();
-
       // Show success message
       setTimeout(() => {
         alert('✨ Journal entry saved!');
@@ -108,7 +125,7 @@ function JournalTab() {
     try {
       const response = await fetch(`${API_BASE}/journal/search`, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers: authHeaders({ 'Content-Type': 'application/json' }),
         body: JSON.stringify({ query: searchQuery })
       });
 
@@ -123,7 +140,7 @@ function JournalTab() {
     setIsGeneratingSummary(true);
 
     try {
-      const response = await fetch(`${API_BASE}/journal/summary`);
+      const response = await fetch(`${API_BASE}/journal/summary`, { headers: authHeaders() });
       const data = await response.json();
       setWeeklySummary(data);
     } catch (error) {
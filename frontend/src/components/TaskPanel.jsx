@@ -1,5 +1,6 @@
 import { useState } from 'react';
 import './TaskPanel.css';
+import { authHeaders } from '../user';
 
 function TaskPanel({ tasks, onRefresh }) {
   const [expandedTask, setExpandedTask] = useState(null);
@@ -7,12 +8,12 @@ function TaskPanel({ tasks, onRefresh }) {
   const completedCount = tasks.filter(t => t.completed).length;
   const totalCount = tasks.length;
 
-  const toggleTask = async (index) => {
+  const toggleTask = async (task) => {
     try {
       await fetch('http://localhost:5000/tasks/complete', {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ index })
+        headers: authHeaders({ 'Content-Type': 'application/json' }),
+        body: JSON.stringify({ id: task.id, completed: !task.completed })
       });
       onRefresh();
     } catch (error) {
@@ -25,7 +26,8 @@ function TaskPanel({ tasks, onRefresh }) {
     
     try {
       await fetch('http://localhost:5000/tasks/clear', {
-        method: 'POST'
+        method: 'POST',
+        headers: authHeaders()
       });
       onRefresh();
     } catch (error) {
@@ -52,15 +54,15 @@ function TaskPanel({ tasks, onRefresh }) {
       ) : (
         <>
           <div className="task-list">
-            {tasks.map((task, index) => (
+            {tasks.map((task) => (
               <div 
-                key={index} 
+                key={task.id} 
                 className={`task-item ${task.completed ? 'completed' : ''}`}
               >
                 <input
                   type="checkbox"
                   checked={task.completed}
-                  onChange={() => toggleTask(index)}
+                  onChange={() => toggleTask(task)}
                   className="task-checkbox"
                 />
                 <div className="task-content">
@@ -0,0 +1,83 @@
+// One shared connection to the backend's /events push channel.
+// EventSource reconnects on its own and resends the last event id,
+// so missed events are replayed by the server.
+
+import { withToken } from './user';
+
+const API_BASE = 'http://localhost:5000';
+
+let source = null;
+const handlers = new Map();
+
+function connect() {
+  source = new EventSource(withToken(`${API_BASE}/events`));
+  // Listeners registered before the connection existed
+  handlers.forEach((set, type) => {
+    set.forEach(handler => source.addEventListener(type, handler));
+  });
+}
+
+// Calls handler(data) for every event of this type; returns an unsubscribe function.
+// 'open' fires on every (re)connect, 'resync' when the client must reload everything.
+export function subscribe(type, callback) {
+  const handler = (event) => {
+    callback(event.data ? JSON.parse(event.data) : {});
+  };
+  if (!handlers.has(type)) handlers.set(type, new Set());
+  handlers.get(type).add(handler);
+
+  if (!source) {
+    connect();
+  } else {
+    source.addEventListener(type, handler);
+  }
+
+  return () => {
+    handlers.get(type).delete(handler);
+    source?.removeEventListener(type, handler);
+  };
+}
+
+// Replies come back before their audio: the clip is synthesized by a
+// background job and announced with an audio_ready/audio_failed event.
+// Recent results are kept because the event can beat the HTTP response.
+const finishedJobs = new Map();
+const MAX_FINISHED_JOBS = 50;
+
+function rememberJob(jobId, audioId) {
+  finishedJobs.set(jobId, audioId);
+  if (finishedJobs.size > MAX_FINISHED_JOBS) {
+    finishedJobs.delete(finishedJobs.keys().next().value);
+  }
+}
+
+subscribe('audio_ready', ({ job_id, audio_id }) => job_id && rememberJob(job_id, audio_id));
+subscribe('audio_failed', ({ job_id }) => rememberJob(job_id, null));
+
+// Resolves with the audio id of a reply's audio_job_id, or null if synthesis failed
+export function audioForJob(jobId, timeoutMs = 60000) {
+  if (finishedJobs.has(jobId)) return Promise.resolve(finishedJobs.get(jobId));
+
+  return new Promise(resolve => {
+    const unsubscribers = [];
+    const finish = (audioId) => {
+      unsubscribers.forEach(unsubscribe => unsubscribe());
+      clearTimeout(timer);
+      resolve(audioId);
+    };
+    const timer = setTimeout(() => finish(null), timeoutMs);
+    unsubscribers.push(
+      subscribe('audio_ready', (data) => data.job_id === jobId && finish(data.audio_id)),
+      subscribe('audio_failed', (data) => data.job_id === jobId && finish(null))
+    );
+
+    // In case the event was sent before this client connected
+    fetch(`${API_BASE}/jobs/${jobId}`)
+      .then(response => (response.ok ? response.json() : null))
+      .then(job => {
+        if (job?.state === 'done') finish(job.result);
+        else if (job?.state === 'failed') finish(null);
+      })
+      .catch(() => {});
+  });
+}
@@ -0,0 +1,26 @@
+// Identifies this browser to the backend, which keeps each user's tasks,
+// journal and memory separately. The token is a random secret kept in
+// localStorage; the backend derives the user id from its hash.
+
+const TOKEN_KEY = 'daymind-token';
+
+function token() {
+  let value = localStorage.getItem(TOKEN_KEY);
+  if (!value) {
+    const bytes = crypto.getRandomValues(new Uint8Array(24));
+    value = Array.from(bytes, b => b.toString(16).padStart(2, '0')).join('');
+    localStorage.setItem(TOKEN_KEY, value);
+  }
+  return value;
+}
+
+// Headers for fetch(), merged with any others the request needs
+export function authHeaders(headers = {}) {
+  return { ...headers, Authorization: `Bearer ${token()}` };
+}
+
+// EventSource and WebSocket can't send headers; the token goes in the URL
+export function withToken(url) {
+  const separator = url.includes('?') ? '&' : '?';
+  return `${url}${separator}token=${encodeURIComponent(token())}`;
+}
@@ -0,0 +1,85 @@
+// Streams microphone audio to the backend's /voice/stream WebSocket while
+// the user is still talking. Audio goes out as 16 kHz mono 16-bit PCM in
+// small frames; the server answers with partial transcripts, the final
+// transcription and then the reply events (token, audio, done).
+
+import { withToken } from './user';
+
+const WS_BASE = 'ws://localhost:5000';
+const SAMPLE_RATE = 16000;
+
+function toPcm16(samples, inputRate) {
+  // The browser may ignore the requested rate; resample by picking samples
+  const ratio = inputRate / SAMPLE_RATE;
+  const out = new Int16Array(Math.floor(samples.length / ratio));
+  for (let i = 0; i < out.length; i++) {
+    const s = Math.max(-1, Math.min(1, samples[Math.floor(i * ratio)]));
+    out[i] = s < 0 ? s * 0x8000 : s * 0x7fff;
+  }
+  return out.buffer;
+}
+
+// Starts recording and streaming. onEvent(event, data) gets every server
+// message, plus 'speech_end' when the server heard the end of speech before
+// stop() was called, and 'closed' at the end. Returns { stop }.
+export async function startVoiceStream({ emotion, onEvent }) {
+  const media = await navigator.mediaDevices.getUserMedia({ audio: true });
+  const socket = new WebSocket(withToken(`${WS_BASE}/voice/stream`));
+  socket.binaryType = 'arraybuffer';
+
+  try {
+    await new Promise((resolve, reject) => {
+      socket.onopen = resolve;
+      socket.onerror = reject;
+    });
+  } catch (error) {
+    media.getTracks().forEach(track => track.stop());
+    throw new Error('Could not connect to /voice/stream');
+  }
+  socket.send(JSON.stringify({ type: 'start', emotion }));
+
+  const context = new AudioContext({ sampleRate: SAMPLE_RATE });
+  const source = context.createMediaStreamSource(media);
+  const processor = context.createScriptProcessor(4096, 1, 1);
+  processor.onaudioprocess = (event) => {
+    if (socket.readyState === WebSocket.OPEN) {
+      socket.send(toPcm16(event.inputBuffer.getChannelData(0), context.sampleRate));
+    }
+  };
+  source.connect(processor);
+  processor.connect(context.destination);
+
+  let recording = true;
+  const release = () => {
+    if (!recording) return;
+    recording = false;
+    processor.disconnect();
+    source.disconnect();
+    context.close();
+    media.getTracks().forEach(track => track.stop());
+  };
+
+  socket.onmessage = (message) => {
+    const { event, data } = JSON.parse(message.data);
+    if (event === 'transcription' && recording) {
+      // The server heard the end of speech before the button was released
+      release();
+      onEvent('speech_end', {});
+    }
+    onEvent(event, data);
+  };
+  socket.onclose = () => {
+    release();
+    onEvent('closed', {});
+  };
+
+  return {
+    stop() {
+      if (!recording) return;
+      release();
+      if (socket.readyState === WebSocket.OPEN) {
+        socket.send(JSON.stringify({ type: 'stop' }));
+      }
+    }
+  };
+}